@@ -0,0 +1,76 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+
+"""
+    Content negotiation for the Accept request header.  The header is a list
+    of media ranges ("type/subtype", "type/*" or "*/*"), each with an optional
+    q value (default 1).  A media type gets the q value of the most specific
+    range that matches it, or 0 if none match.
+"""
+
+"""
+    Return list of (type, subtype, q) for the media ranges of an Accept header
+"""
+def parseAccept(accept):
+    ranges = []
+    for item in accept.split(','):
+        fields = item.split(';')
+        mediaRange = fields[0].strip().lower()
+        npos = mediaRange.find('/')
+        if npos < 1:
+            continue  # not a media range
+        q = 1.0
+        for param in fields[1:]:
+            param = param.strip()
+            if param[:2] == 'q=':
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        ranges.append((mediaRange[:npos], mediaRange[npos+1:], q))
+    return ranges
+    
+"""
+    Return (q, specificity) for the given media type: specificity is 2 for an
+    exact match, 1 for "type/*", 0 for "*/*", and -1 if no range matches.
+"""
+def getMediaTypeQuality(ranges, mediaType):
+    (mainType, subType) = mediaType.split('/')
+    best = (0.0, -1)
+    for (rangeType, rangeSubType, q) in ranges:
+        if rangeType == mainType and rangeSubType == subType:
+            specificity = 2
+        elif rangeType == mainType and rangeSubType == '*':
+            specificity = 1
+        elif rangeType == '*' and rangeSubType == '*':
+            specificity = 0
+        else:
+            continue
+        if specificity > best[1]:
+            best = (q, specificity)
+    return best
+    
+"""
+    Return True if the Accept header value prefers binary data
+    (application/octet-stream) to JSON: the binary type must be acceptable
+    (q > 0) and have a higher q value than application/json, or the same q 
+    value from a more specific range (e.g. "application/octet-stream, */*").
+    JSON is used if neither is preferred.
+"""
+def prefersBinary(accept):
+    if not accept:
+        return False
+    ranges = parseAccept(accept)
+    binary = getMediaTypeQuality(ranges, 'application/octet-stream')
+    if binary[0] <= 0.0:
+        return False
+    return binary > getMediaTypeQuality(ranges, 'application/json')
@@ -15,19 +15,191 @@ import logging
 import os
 import os.path as op
 import json
+import errno
+import hashlib
+import datetime
+import calendar
+import email.utils
+from concurrent.futures import ThreadPoolExecutor
 import tornado.httpserver
-from tornado.ioloop import IOLoop
+import tornado.netutil
+import tornado.process
+from tornado import gen
+from tornado.ioloop import IOLoop, PeriodicCallback
 from tornado.web import RequestHandler, Application, url, HTTPError
 from tornado.escape import json_encode, json_decode, url_escape, url_unescape
 from urlparse import urlparse
 from sets import Set
 import config
 from hdf5db import Hdf5db
+from dbPool import getDb, getPool
 import hdf5dtype
 from timeUtil import unixTimeToUTC
 from fileUtil import getFilePath, getDomain, getFileModCreateTimes, makeDirs, verifyFile
 from httpErrorUtil import errNoToHttpStatus
+from responseCache import ResponseCacheTransform, writeCachedResponse
+from contentEncoding import CompressContentEncoding
+from domainExport import DomainExport
+from acceptUtil import prefersBinary
 
+_executor = None
+
+def getExecutor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=int(config.get('io_threads')))
+    return _executor
+    
+"""
+ dbCall - return result of op(db) for the pooled db of the given file.  
+   Intended to be submitted to the executor.  If writable is given, the file 
+   is first checked with verifyFile (is_hdf5 reads the file, so this is done 
+   on the I/O thread pool as well).  Pass update=False if op only reads the
+   db, so other server processes can read the file at the same time.
+"""
+def dbCall(filePath, op, writable=None, update=True):
+    log = logging.getLogger("h5serv")
+    if writable is not None:
+        verifyFile(filePath, writable)
+    with getDb(filePath, app_logger=log, update=update) as db:
+        return op(db)
+        
+"""
+ runDb - coroutine returning op(db) for the pooled db of the given file.  
+   op is run on the I/O thread pool so the IOLoop can serve other requests 
+   meanwhile; calls on the same file are serialized by the db pool.  
+   RequestHandler is not thread-safe, so op should only do the HDF5 work and
+   return what the handler needs: headers and the response body are written 
+   on the IOLoop.  IOErrors raised by op are raised as the equivalent 
+   HTTPError.
+"""
+@gen.coroutine
+def runDb(filePath, op, writable=False, update=True):
+    try:
+        result = yield getExecutor().submit(dbCall, filePath, op, writable, update)
+    except IOError as e:
+        log = logging.getLogger("h5serv")
+        # errors raised by h5py have no errno or strerror
+        log.info("IOError: " + str(e))
+        status = errNoToHttpStatus(e.errno)
+        raise HTTPError(status, reason=e.strerror or str(e)) 
+    raise gen.Return(result)
+        
+"""
+ getNextHref - href for the next page of a paged collection
+"""
+def getNextHref(href, limit, cursor):
+    return href + '?Limit=' + str(limit) + '&Cursor=' + url_escape(cursor)
+    
+"""
+ writeValueBlocks - write the JSON list of dataset values for the selection
+   one block of rows (along the first dimension) at a time, flushing each 
+   block to the client so that the complete value list is never held in 
+   memory.  Blocks are read (and serialized) on the I/O thread pool.
+   
+   Each block is read with its own db call, so the file isn't held (and 
+   other requests for it blocked) while blocks are sent to a slow client.  
+   If the dataset is modified or deleted between blocks the stream is 
+   aborted (an IOError is raised after the response has started, so the 
+   client gets an incomplete response) rather than mixing values from 
+   before and after the update.
+"""
+@gen.coroutine
+def writeValueBlocks(handler, filePath, reqUuid, slices):
+    log = logging.getLogger("h5serv")
+    # (shape, mtime, db, modify count) of the dataset, or None if it has been
+    # deleted.  The modify count is only comparable for the same db instance
+    # (the pool re-opens files modified by other processes).
+    def getVersion(db):
+        dset = db.getDatasetObjByUuid(reqUuid)
+        if dset is None:
+            return None
+        return (dset.shape, db.getModifiedTime(reqUuid, useRoot=False), db, 
+            db.getModifyCount(reqUuid))
+    def getShapes(db):
+        dset = db.getDatasetObjByUuid(reqUuid)
+        return (getVersion(db), db.getSelectionShape(dset, slices), dset.dtype.itemsize)
+    (version, shape, itemSize) = yield getExecutor().submit(dbCall, filePath, getShapes, update=False)
+    dsetShape = version[0]
+    rowSize = itemSize
+    for extent in shape[1:]:
+        rowSize *= extent
+    blockRows = max(1, int(config.get('stream_block_size')) // max(rowSize, 1))
+    (start, stop, step) = slices[0].indices(dsetShape[0])
+    nrows = shape[0]
+    log.info("streaming " + str(nrows) + " rows, " + str(blockRows) + " rows per block")
+    
+    handler.write('[')
+    row = 0
+    while row < nrows:
+        count = min(blockRows, nrows - row)
+        blockStart = start + row * step
+        blockStop = min(start + (row + count) * step, stop)
+        blockSlices = (slice(blockStart, blockStop, step),) + tuple(slices[1:])
+        def getBlock(db):
+            current = getVersion(db)
+            if (current is None or current[:2] != version[:2] or 
+                    (current[2] is version[2] and current[3] != version[3])):
+                msg = "Dataset: " + reqUuid + " was modified while its values were sent"
+                log.warning(msg)
+                raise IOError(errno.EIO, msg)
+            values = db.getDatasetValuesByUuid(reqUuid, blockSlices)
+            return json_encode(values)[1:-1]  # strip the enclosing brackets
+        text = yield getExecutor().submit(dbCall, filePath, getBlock, update=False)
+        if row > 0:
+            handler.write(', ')
+        handler.write(text)
+        row += count
+        yield handler.flush()  # wait for the block to be sent
+    handler.write(']')
+    
+"""
+ getValidators - return the validators for a GET of a resource last modified
+   at mtime as (etag, mtime, notModified), or None if no validators are to be
+   sent.  The ETag also covers the domain, uri (which includes any selection) 
+   and Accept header.  notModified is True if the client's If-None-Match or 
+   If-Modified-Since header shows its copy is current.  Only reads the 
+   request, so can be used in db ops run on the I/O thread pool.
+   
+   No validators are sent for resources modified in the last second, since 
+   another update within the same second would not change mtime.
+"""
+def getValidators(request, mtime):
+    if mtime is None:
+        return None
+    mtime = int(mtime)
+    if mtime >= int(time.time()) - 1:
+        return None
+    key = ' '.join((str(mtime), request.host, request.uri, request.headers.get('Accept', '')))
+    etag = '"' + hashlib.sha1(key).hexdigest() + '"'
+    notModified = False
+    if 'If-None-Match' in request.headers:
+        inm = request.headers['If-None-Match']
+        notModified = inm.strip() == '*' or inm.find(etag) >= 0
+    elif 'If-Modified-Since' in request.headers:
+        since = email.utils.parsedate(request.headers['If-Modified-Since'])
+        notModified = since is not None and calendar.timegm(since) >= mtime
+    return (etag, mtime, notModified)
+    
+def isNotModified(validators):
+    return validators is not None and validators[2]
+    
+"""
+ setValidators - set the ETag and Last-Modified headers given by 
+   getValidators.  Returns True if the client's copy is current: the status 
+   is then set to 304 and the handler should return without writing a 
+   response body.
+"""
+def setValidators(handler, validators):
+    if validators is None:
+        return False
+    (etag, mtime, notModified) = validators
+    handler.set_header('Etag', etag)
+    handler.set_header('Last-Modified', datetime.datetime.utcfromtimestamp(mtime))
+    if notModified:
+        handler.set_status(304)
+    return notModified
+    
     
 class DefaultHandler(RequestHandler):
     def put(self):
@@ -82,7 +254,10 @@ class LinkCollectionHandler(RequestHandler):
         return id
         
         
+    @gen.coroutine
     def get(self):
+        if writeCachedResponse(self):
+            return
         log = logging.getLogger("h5serv")
         log.info('LinkCollectionHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']') 
         log.info('remote_ip: ' + self.request.remote_ip)      
@@ -101,20 +276,51 @@ class LinkCollectionHandler(RequestHandler):
                 log.info(msg)
                 raise HTTPError(400, reason=msg) 
         marker = self.get_query_argument("Marker", None)
+        cursor = self.get_query_argument("Cursor", None)
+        depth = self.get_query_argument("Depth", None)
+        if depth is not None:
+            try:
+                depth = int(depth)
+            except ValueError:
+                depth = 0
+            if depth < 1:
+                msg = "Bad Request: Depth must be a positive integer"
+                log.info(msg)
+                raise HTTPError(400, reason=msg)
+            if marker or cursor:
+                msg = "Bad Request: Marker and Cursor can not be used with Depth"
+                log.info(msg)
+                raise HTTPError(400, reason=msg)
+            # in traversal mode Limit is the item budget
+            maxItems = int(config.get('link_tree_max_items'))
+            if limit <= 0 or limit > maxItems:
+                limit = maxItems
                 
         response = { }
         
-        verifyFile(filePath)
-        items = None
-        rootUUID = None
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                items = db.getLinkItems(reqUuid, marker=marker, limit=limit)
-                rootUUID = db.getUUIDByPath('/')
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+        request = self.request
+        def getLinks(db):
+            nextCursor = None
+            truncated = False
+            if depth is None:
+                validators = getValidators(request, db.getObjectModifiedTime("groups", reqUuid))
+                if isNotModified(validators):
+                    return (validators, None, None, None, None)
+                (items, nextCursor) = db.getLinkItemsPage(reqUuid, cursor=cursor,
+                    marker=marker, limit=limit)
+            else:
+                # links of sub-groups may have changed, so use the file time
+                db.getObjectModifiedTime("groups", reqUuid)  # check the group exists
+                validators = getValidators(request, db.getFileModifiedTime())
+                if isNotModified(validators):
+                    return (validators, None, None, None, None)
+                (items, truncated) = db.getLinkTree(reqUuid, maxDepth=depth, 
+                    limit=limit)
+            rootUUID = db.getUUIDByPath('/')
+            return (validators, items, nextCursor, truncated, rootUUID)
+        (validators, items, nextCursor, truncated, rootUUID) = yield runDb(filePath, getLinks, update=False)
+        if setValidators(self, validators):
+            return
                              
         # got everything we need, put together the response
         links = []
@@ -126,11 +332,16 @@ class LinkCollectionHandler(RequestHandler):
             links.append(item)
              
         response['links'] = links
+        if depth is not None:
+            response['truncated'] = truncated
         href = self.request.protocol + '://' + domain + '/'
         hrefs.append({'rel': 'self',       'href': href + 'groups/' + reqUuid + '/links'})
         hrefs.append({'rel': 'root',       'href': href + 'groups/' + rootUUID}) 
         hrefs.append({'rel': 'home',       'href': href }) 
         hrefs.append({'rel': 'owner', 'href': href + 'groups/' + reqUuid})  
+        if nextCursor:
+            hrefs.append({'rel': 'next', 'href': getNextHref(href + 'groups/' + reqUuid + 
+                '/links', limit, nextCursor)})
         response['hrefs'] = hrefs      
         self.set_header('Content-Type', 'application/json')
         self.write(json_encode(response))
@@ -183,7 +394,10 @@ class LinkHandler(RequestHandler):
             raise HTTPError(400, reason=msg)
         return linkName
         
+    @gen.coroutine
     def get(self):
+        if writeCachedResponse(self):
+            return
         log = logging.getLogger("h5serv")
         log.info('LinkHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')  
         log.info('remote_ip: ' + self.request.remote_ip)     
@@ -195,17 +409,15 @@ class LinkHandler(RequestHandler):
         
         response = { }
         
-        verifyFile(filePath)
-        items = None
-        rootUUID = None
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                item = db.getLinkItemByUuid(reqUuid, linkName)
-                rootUUID = db.getUUIDByPath('/')
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror)
+        request = self.request
+        def getLink(db):
+            item = db.getLinkItemByUuid(reqUuid, linkName)
+            validators = getValidators(request, db.getObjectModifiedTime("groups", reqUuid))
+            rootUUID = db.getUUIDByPath('/')
+            return (validators, item, rootUUID)
+        (validators, item, rootUUID) = yield runDb(filePath, getLink, update=False)
+        if setValidators(self, validators):
+            return
                          
         # got everything we need, put together the response
         targethref = ''
@@ -245,6 +457,7 @@ class LinkHandler(RequestHandler):
         self.set_header('Content-Type', 'application/json')
         self.write(json_encode(response))
     
+    @gen.coroutine
     def put(self):
         log = logging.getLogger("h5serv")
         log.info('LinkHandler.put host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
@@ -298,22 +511,15 @@ class LinkHandler(RequestHandler):
         
         response = { }
         
-        verifyFile(filePath)
-        items = None
-        rootUUID = None
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                if childUuid:
-                    db.linkObject(reqUuid, childUuid, linkName)
-                elif filename:
-                    db.createExternalLink(reqUuid, h5domain, h5path, linkName)
-                elif h5path:
-                    db.createSoftLink(reqUuid, h5path, linkName)
-                rootUUID = db.getUUIDByPath('/')
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror)   
+        def putLink(db):
+            if childUuid:
+                db.linkObject(reqUuid, childUuid, linkName)
+            elif filename:
+                db.createExternalLink(reqUuid, h5domain, h5path, linkName)
+            elif h5path:
+                db.createSoftLink(reqUuid, h5path, linkName)
+            return db.getUUIDByPath('/')
+        rootUUID = yield runDb(filePath, putLink)
             
         hrefs = []     
         href = self.request.protocol + '://' + domain + '/'
@@ -328,6 +534,7 @@ class LinkHandler(RequestHandler):
         self.write(json_encode(response))
         self.set_status(201) 
         
+    @gen.coroutine
     def delete(self): 
         log = logging.getLogger("h5serv")
         log.info('LinkHandler.delete ' + self.request.host)   
@@ -340,17 +547,11 @@ class LinkHandler(RequestHandler):
            
         domain = self.request.host
         response = { }
-        rootUUID = None
         filePath = getFilePath(domain)
-        verifyFile(filePath, True)
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                db.unlinkItem(reqUuid, linkName)
-                rootUUID = db.getUUIDByPath('/')
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+        def deleteLink(db):
+            db.unlinkItem(reqUuid, linkName)
+            return db.getUUIDByPath('/')
+        rootUUID = yield runDb(filePath, deleteLink, writable=True)
             
         hrefs = []     
         href = self.request.protocol + '://' + domain + '/'
@@ -383,27 +584,28 @@ class TypeHandler(RequestHandler):
     
         return id
         
+    @gen.coroutine
     def get(self):
+        if writeCachedResponse(self):
+            return
         log = logging.getLogger("h5serv")
         log.info('TypeHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
         log.info('remote_ip: ' + self.request.remote_ip)
         reqUuid = self.getRequestId()
         domain = self.request.host
         filePath = getFilePath(domain) 
-        verifyFile(filePath)
         
         response = { }
         hrefs = []
-        rootUUID = None
-        item = None
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                item = db.getCommittedTypeItemByUuid(reqUuid)
-                rootUUID = db.getUUIDByPath('/')
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+        request = self.request
+        def getType(db):
+            item = db.getCommittedTypeItemByUuid(reqUuid)
+            rootUUID = db.getUUIDByPath('/')
+            validators = getValidators(request, db.getObjectModifiedTime("datatypes", reqUuid))
+            return (validators, item, rootUUID)
+        (validators, item, rootUUID) = yield runDb(filePath, getType, update=False)
+        if setValidators(self, validators):
+            return
                          
         # got everything we need, put together the response
         href = self.request.protocol + '://' + domain + '/'
@@ -424,6 +626,7 @@ class TypeHandler(RequestHandler):
         
     
         
+    @gen.coroutine
     def delete(self): 
         log = logging.getLogger("h5serv")
         log.info('TypeHandler.delete ' + self.request.host)   
@@ -431,14 +634,9 @@ class TypeHandler(RequestHandler):
         uuid = self.getRequestId()
         domain = self.request.host
         filePath = getFilePath(domain)
-        verifyFile(filePath, True)
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                db.deleteObjectByUuid('datatype', uuid)
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+        def deleteType(db):
+            db.deleteObjectByUuid('datatype', uuid)
+        yield runDb(filePath, deleteType, writable=True)
                 
 class DatatypeHandler(RequestHandler):
     def getRequestId(self):
@@ -466,7 +664,10 @@ class DatatypeHandler(RequestHandler):
     
         return id
         
+    @gen.coroutine
     def get(self):
+        if writeCachedResponse(self):
+            return
         log = logging.getLogger("h5serv")
         log.info('DatatypeHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
         log.info('remote_ip: ' + self.request.remote_ip)
@@ -474,20 +675,18 @@ class DatatypeHandler(RequestHandler):
         reqUuid = self.getRequestId()
         domain = self.request.host
         filePath = getFilePath(domain) 
-        verifyFile(filePath)
         
         response = { }
         hrefs = []
-        rootUUID = None
-        item = None
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                item = db.getDatasetTypeItemByUuid(reqUuid)
-                rootUUID = db.getUUIDByPath('/')
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+        request = self.request
+        def getType(db):
+            item = db.getDatasetTypeItemByUuid(reqUuid)
+            rootUUID = db.getUUIDByPath('/')
+            validators = getValidators(request, db.getObjectModifiedTime("datasets", reqUuid))
+            return (validators, item, rootUUID)
+        (validators, item, rootUUID) = yield runDb(filePath, getType, update=False)
+        if setValidators(self, validators):
+            return
                          
         # got everything we need, put together the response
         href = self.request.protocol + '://' + domain + '/'
@@ -529,7 +728,10 @@ class ShapeHandler(RequestHandler):
     
         return id
         
+    @gen.coroutine
     def get(self):
+        if writeCachedResponse(self):
+            return
         log = logging.getLogger("h5serv")
         log.info('ShapeHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
         log.info('remote_ip: ' + self.request.remote_ip)
@@ -537,21 +739,18 @@ class ShapeHandler(RequestHandler):
         reqUuid = self.getRequestId()
         domain = self.request.host
         filePath = getFilePath(domain) 
-        verifyFile(filePath)
         
         response = { }
         hrefs = []
-        rootUUID = None
-        item = None
-        
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                item = db.getDatasetItemByUuid(reqUuid)
-                rootUUID = db.getUUIDByPath('/')
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+        request = self.request
+        def getShape(db):
+            item = db.getDatasetItemByUuid(reqUuid)
+            rootUUID = db.getUUIDByPath('/')
+            validators = getValidators(request, db.getObjectModifiedTime("datasets", reqUuid))
+            return (validators, item, rootUUID)
+        (validators, item, rootUUID) = yield runDb(filePath, getShape, update=False)
+        if setValidators(self, validators):
+            return
                          
         # got everything we need, put together the response
         href = self.request.protocol + '://' + domain + '/'
@@ -569,6 +768,7 @@ class ShapeHandler(RequestHandler):
         self.set_header('Content-Type', 'application/json')
         self.write(json_encode(response))
         
+    @gen.coroutine
     def put(self):
         log = logging.getLogger("h5serv")
         log.info('ShapeHandler.put host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
@@ -576,7 +776,6 @@ class ShapeHandler(RequestHandler):
         reqUuid = self.getRequestId()       
         domain = self.request.host
         filePath = getFilePath(domain)
-        verifyFile(filePath, True)
         
         body = None
         try:
@@ -613,14 +812,9 @@ class ShapeHandler(RequestHandler):
                 log.info(msg)
                 raise HTTPError(400, reason=msg) 
         
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                rootUUID = db.getUUIDByPath('/')
-                db.resizeDataset(reqUuid, shape)
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+        def resizeDataset(db):
+            db.resizeDataset(reqUuid, shape)
+        yield runDb(filePath, resizeDataset, writable=True)
                 
         log.info("resize OK")    
         self.set_status(201)  # resource created    
@@ -645,7 +839,10 @@ class DatasetHandler(RequestHandler):
     
         return id
         
+    @gen.coroutine
     def get(self):
+        if writeCachedResponse(self):
+            return
         log = logging.getLogger("h5serv")
         log.info('DatasetHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
         log.info('remote_ip: ' + self.request.remote_ip)
@@ -653,20 +850,18 @@ class DatasetHandler(RequestHandler):
         reqUuid = self.getRequestId()
         domain = self.request.host
         filePath = getFilePath(domain) 
-        verifyFile(filePath)
         
         response = { }
         hrefs = []
-        rootUUID = None
-        item = None
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                item = db.getDatasetItemByUuid(reqUuid)
-                rootUUID = db.getUUIDByPath('/')
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+        request = self.request
+        def getDataset(db):
+            item = db.getDatasetItemByUuid(reqUuid)
+            rootUUID = db.getUUIDByPath('/')
+            validators = getValidators(request, db.getObjectModifiedTime("datasets", reqUuid))
+            return (validators, item, rootUUID)
+        (validators, item, rootUUID) = yield runDb(filePath, getDataset, update=False)
+        if setValidators(self, validators):
+            return
             
         # got everything we need, put together the response
         href = self.request.protocol + '://' + domain + '/'
@@ -681,6 +876,7 @@ class DatasetHandler(RequestHandler):
         response['shape'] = item['shape']
         if 'fillvalue' in item:
             response['fillvalue'] = item['fillvalue']
+        response['creationProperties'] = item['creationProperties']
         response['created'] = unixTimeToUTC(item['ctime'])
         response['lastModified'] = unixTimeToUTC(item['mtime'])
         response['attributeCount'] = item['attributeCount']
@@ -690,6 +886,7 @@ class DatasetHandler(RequestHandler):
         self.write(json_encode(response))
         
         
+    @gen.coroutine
     def delete(self): 
         log = logging.getLogger("h5serv")
         log.info('DatasetHandler.delete host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
@@ -697,20 +894,16 @@ class DatasetHandler(RequestHandler):
         uuid = self.getRequestId()
         domain = self.request.host
         filePath = getFilePath(domain)
-        verifyFile(filePath, True)
         
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                db.deleteObjectByUuid('dataset', uuid)
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+        def deleteDataset(db):
+            db.deleteObjectByUuid('dataset', uuid)
+        yield runDb(filePath, deleteDataset, writable=True)
             
                 
 class ValueHandler(RequestHandler):
     """
-    Helper method - return slice for dim based on query params
+    Helper method - return slice for dim based on query params (raises 
+    IOError EBADMSG for an invalid selection, so can be used in db ops)
     """
     def getSliceQueryParam(self, dim, extent):
         log = logging.getLogger("h5serv")
@@ -723,26 +916,27 @@ class ValueHandler(RequestHandler):
         except ValueError:
             msg ="Bad Request: invalid selection parameter (can't convert to int)"
             log.info(msg)
-            raise HTTPError(400, reason=msg)
+            raise IOError(errno.EBADMSG, msg)
         if start < 0 or start > extent:
             msg = "Bad Request: Invalid selection start parameter for dimension: " + dimQuery
             log.info(msg)
-            raise HTTPError(400, reason=msg)
+            raise IOError(errno.EBADMSG, msg)
         if stop > extent:
             msg = "Bad Request: Invalid selection stop parameter for dimension: " + dimQuery
             log.info(msg)
-            raise HTTPError(400, reason=msg)
+            raise IOError(errno.EBADMSG, msg)
         if step == 0:
             msg = "Bad Request: invalid selection step parameter for dimension: " + dimQuery
             log.info(msg)
-            raise HTTPError(400, reason=msg)
+            raise IOError(errno.EBADMSG, msg)
         s = slice(start, stop, step)
         log.info(dimQuery + " start: " + str(start) + " stop: " + str(stop) + " step: " + 
             str(step)) 
         return s
         
     """
-    Get slices given lists of start, stop, step values
+    Get slices given lists of start, stop, step values (raises IOError EBADMSG
+    for an invalid selection)
     """
     def getHyperslabSelection(self, dsetshape, start, stop, step):
         log = logging.getLogger("h5serv")
@@ -753,12 +947,12 @@ class ValueHandler(RequestHandler):
             if len(start) != rank:
                 msg = "Bad Request: start array length not equal to dataset rank"
                 log.info(msg)
-                raise HTTPError(400, reason=msg)
+                raise IOError(errno.EBADMSG, msg)
             for dim in range(rank):
                 if start[dim] < 0 or start[dim] >= dsetshape[dim]:
                     msg = "Bad Request: start index invalid for dim: " + str(dim)
                     log.info(msg)
-                    raise HTTPError(400, reason=msg)
+                    raise IOError(errno.EBADMSG, msg)
         else:
             start = []
             for dim in range(rank):
@@ -770,12 +964,12 @@ class ValueHandler(RequestHandler):
             if len(stop) != rank:
                 msg = "Bad Request: stop array length not equal to dataset rank"
                 log.info(msg)
-                raise HTTPError(400, reason=msg)
+                raise IOError(errno.EBADMSG, msg)
             for dim in range(rank):
                 if stop[dim] <= start[dim] or stop[dim] > dsetshape[dim]:
                     msg = "Bad Request: stop index invalid for dim: " + str(dim)
                     log.info(msg)
-                    raise HTTPError(400, reason=msg)
+                    raise IOError(errno.EBADMSG, msg)
         else:
             stop = []
             for dim in range(rank):
@@ -787,12 +981,12 @@ class ValueHandler(RequestHandler):
             if len(step) != rank:
                 msg = "Bad Request: step array length not equal to dataset rank"
                 log.info(msg)
-                raise HTTPError(400, reason=msg)
+                raise IOError(errno.EBADMSG, msg)
             for dim in range(rank):
                 if step[dim] <= 0 or step[dim] > dsetshape[dim]:
                     msg = "Bad Request: step index invalid for dim: " + str(dim)
                     log.info(msg)
-                    raise HTTPError(400, reason=msg)
+                    raise IOError(errno.EBADMSG, msg)
         else:
             step = []
             for dim in range(rank):
@@ -805,10 +999,79 @@ class ValueHandler(RequestHandler):
             except ValueError:
                 msg = "Bad Request: invalid start/stop/step value"
                 log.info(msg)
-                raise HTTPError(400, reason=msg)
+                raise IOError(errno.EBADMSG, msg)
             slices.append(s)
         return tuple(slices)
         
+    """
+    Helper method - return hrefs for value responses
+    """
+    def getHrefs(self, domain, reqUuid, rootUUID):
+        href = self.request.protocol + '://' + domain + '/'
+        hrefs = []
+        hrefs.append({'rel': 'self',  'href': href + 'datasets/' + reqUuid + '/value'})
+        hrefs.append({'rel': 'root',  'href': href + 'groups/' + rootUUID}) 
+        hrefs.append({'rel': 'owner', 'href': href + 'datasets/' + reqUuid }) 
+        hrefs.append({'rel': 'home',  'href': href })
+        return hrefs
+        
+    """
+    Helper method - return True if the client will accept binary data
+    """
+    def acceptsBinary(self):
+        return prefersBinary(self.request.headers.get('Accept', ''))
+        
+    """
+    Helper method - write a binary (little-endian) request body to the 
+    selection given by the query parameters
+    """
+    @gen.coroutine
+    def putBinary(self, reqUuid, filePath):
+        log = logging.getLogger("h5serv")
+        body = self.request.body
+        def putValues(db):
+            item = db.getDatasetItemByUuid(reqUuid)
+            shape = item['shape']
+            if shape['class'] == 'H5S_NULL':
+                msg = "Bad Request: dataset has a null dataspace"
+                log.info(msg)
+                raise IOError(errno.EBADMSG, msg)
+            slices = Ellipsis
+            if shape['class'] == 'H5S_SIMPLE':
+                dims = shape['dims']
+                slices = []
+                for dim in range(len(dims)):
+                    slices.append(self.getSliceQueryParam(dim, dims[dim]))
+                slices = tuple(slices)
+            db.setDatasetBinaryValuesByUuid(reqUuid, body, slices)
+        yield runDb(filePath, putValues)
+        
+        log.info("binary value put succeeded")
+        
+    """
+    Helper method - return True if the selection is large enough that the
+    JSON response should be streamed
+    """
+    def isLargeSelection(self, db, reqUuid, slices):
+        if slices is Ellipsis or len(slices) == 0:
+            return False
+        dset = db.getDatasetObjByUuid(reqUuid)
+        nbytes = dset.dtype.itemsize
+        for extent in db.getSelectionShape(dset, slices):
+            nbytes *= extent
+        return nbytes > int(config.get('stream_threshold'))
+        
+    """
+    Helper method - write the JSON response with the values streamed a block
+    at a time (see writeValueBlocks).
+    """
+    @gen.coroutine
+    def streamValues(self, filePath, reqUuid, slices, hrefs):
+        self.set_header('Content-Type', 'application/json')
+        self.write('{"hrefs": ' + json_encode(hrefs) + ', "value": ')
+        yield writeValueBlocks(self, filePath, reqUuid, slices)
+        self.write('}')
+        
     """
     Helper method - get uuid for the dataset
     """    
@@ -832,7 +1095,10 @@ class ValueHandler(RequestHandler):
     
         return id
         
+    @gen.coroutine
     def get(self):
+        if writeCachedResponse(self):
+            return
         log = logging.getLogger("h5serv")
         log.info('ValueHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
         log.info('remote_ip: ' + self.request.remote_ip)
@@ -840,64 +1106,91 @@ class ValueHandler(RequestHandler):
         reqUuid = self.getRequestId()
         domain = self.request.host
         filePath = getFilePath(domain) 
-        verifyFile(filePath)
+        acceptsBinary = self.acceptsBinary()
         
         response = { }
-        hrefs = []
-        rootUUID = None
-        item = None
-        values = None
-        
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                item = db.getDatasetItemByUuid(reqUuid)
-                itemType = item['type']
-                
-                if itemType['class'] == 'H5T_OPAQUE':
-                    #todo - support for returning OPAQUE data...
-                    msg = "Not Implemented: GET OPAQUE data not supported"
-                    log.info(msg)
-                    raise HTTPError(501, reason=msg)  # Not implemented
-                shape = item['shape']
-                if shape['class'] == 'H5S_NULL':
-                    pass   # don't return a value
-                elif shape['class'] == 'H5S_SCALAR':
-                    values = db.getDatasetValuesByUuid(reqUuid, Ellipsis)
-                elif shape['class'] == 'H5S_SIMPLE':
-                    dims = shape['dims']
-                    rank = len(dims)
-                    slices = []
-                    for dim in range(rank):
-                        slice = self.getSliceQueryParam(dim, dims[dim])
-                        slices.append(slice)
-         
-                    values = db.getDatasetValuesByUuid(reqUuid, tuple(slices)) 
-                else:
-                    msg = "Internal Server Error: unexpected shape class: " + shape['class']
-                    log.error(msg)
-                    raise HTTPError(500, reason=msg)
+        request = self.request
+        
+        def getValues(db):
+            # returns (validators, opaque, values, binary, slices, rootUUID), 
+            # values is None if the selection is to be streamed
+            item = db.getDatasetItemByUuid(reqUuid)
+            itemType = item['type']
+            validators = getValidators(request, db.getObjectModifiedTime("datasets", reqUuid))
+            if isNotModified(validators):
+                return (validators, False, None, False, None, None)
+            if itemType['class'] == 'H5T_OPAQUE':
+                return (validators, True, None, False, None, None)
+            shape = item['shape']
+            slices = None
+            if shape['class'] == 'H5S_NULL':
+                pass   # don't return a value
+            elif shape['class'] == 'H5S_SCALAR':
+                slices = Ellipsis
+            elif shape['class'] == 'H5S_SIMPLE':
+                dims = shape['dims']
+                rank = len(dims)
+                slices = []
+                for dim in range(rank):
+                    slice = self.getSliceQueryParam(dim, dims[dim])
+                    slices.append(slice)
+                slices = tuple(slices)
+            else:
+                msg = "Internal Server Error: unexpected shape class: " + shape['class']
+                log.error(msg)
+                raise IOError(errno.EIO, msg)
                 
-                rootUUID = db.getUUIDByPath('/')
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+            values = None
+            binary = False
+            if slices is not None:
+                if acceptsBinary:
+                    # return raw bytes if the type allows it, otherwise
+                    # fall back to JSON
+                    dset = db.getDatasetObjByUuid(reqUuid)
+                    binary = hdf5dtype.isFixedSizeType(dset.dtype)
+                if binary:
+                    values = db.getDatasetArrayByUuid(reqUuid, slices)
+                elif not self.isLargeSelection(db, reqUuid, slices):
+                    values = db.getDatasetValuesByUuid(reqUuid, slices)
+            
+            rootUUID = db.getUUIDByPath('/')
+            return (validators, False, values, binary, slices, rootUUID)
+            
+        (validators, opaque, values, binary, slices, rootUUID) = yield runDb(filePath, getValues, update=False)
+        # selection is part of the uri and the format depends on Accept
+        self.set_header('Vary', 'Accept')
+        if setValidators(self, validators):
+            return
+        if opaque:
+            #todo - support for returning OPAQUE data...
+            msg = "Not Implemented: GET OPAQUE data not supported"
+            log.info(msg)
+            raise HTTPError(501, reason=msg)  # Not implemented
+            
+        if slices is not None and values is None:
+            # large JSON selection, stream the values
+            yield self.streamValues(filePath, reqUuid, slices, 
+                self.getHrefs(domain, reqUuid, rootUUID))
+            return
+            
+        if binary:
+            # raw little-endian values, with type and shape in the headers
+            self.set_header('Content-Type', 'application/octet-stream')
+            self.set_header('X-Dtype', hdf5dtype.getDtypeDescription(values.dtype))
+            self.set_header('X-Shape', json_encode(list(values.shape)))
+            self.write(values.tostring())
+            return
                          
         # got everything we need, put together the response
-        href = self.request.protocol + '://' + domain + '/'
-        
         if values is not None:
             response['value'] = values
         
-        hrefs.append({'rel': 'self',  'href': href + 'datasets/' + reqUuid + '/value'})
-        hrefs.append({'rel': 'root',  'href': href + 'groups/' + rootUUID}) 
-        hrefs.append({'rel': 'owner', 'href': href + 'datasets/' + reqUuid }) 
-        hrefs.append({'rel': 'home',  'href': href })   
-        response['hrefs'] = hrefs
+        response['hrefs'] = self.getHrefs(domain, reqUuid, rootUUID)
         
         self.set_header('Content-Type', 'application/json')
         self.write(json_encode(response)) 
         
+    @gen.coroutine
     def post(self):
         log = logging.getLogger("h5serv")
         log.info('ValueHandler.post host=[' + self.request.host + '] uri=[' +
@@ -907,7 +1200,6 @@ class ValueHandler(RequestHandler):
         reqUuid = self.getRequestId()
         domain = self.request.host
         filePath = getFilePath(domain) 
-        verifyFile(filePath)
         
         body = None
         try:
@@ -930,40 +1222,34 @@ class ValueHandler(RequestHandler):
         
         response = { }
         hrefs = []
-        rootUUID = None
-        item = None
-        values = None
         
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                item = db.getDatasetItemByUuid(reqUuid)
-                shape = item['shape']
-                if shape['class'] == 'H5S_SCALAR':
-                    msg = "Bad Request: point selection is not supported on scalar datasets"
+        def getPoints(db):
+            item = db.getDatasetItemByUuid(reqUuid)
+            shape = item['shape']
+            if shape['class'] == 'H5S_SCALAR':
+                msg = "Bad Request: point selection is not supported on scalar datasets"
+                log.info(msg)
+                raise IOError(errno.EBADMSG, msg)
+            rank = len(shape['dims'])
+            
+            for point in points:
+                if rank == 1 and type(point) != int:
+                    msg = "Bad Request: elements of points should be int type for datasets of rank 1"
                     log.info(msg)
-                    raise HTTPError(400, reason=msg)
-                rank = len(shape['dims'])
-                
-                for point in points:
-                    if rank == 1 and type(point) != int:
-                        msg = "Bad Request: elements of points should be int type for datasets of rank 1"
-                        log.info(msg)
-                        raise HTTPError(400, reason=msg)
-                    elif rank > 1 and type(point) != list:
-                        msg = "Bad Request: elements of points should be list type for datasets of rank >1"
+                    raise IOError(errno.EBADMSG, msg)
+                elif rank > 1 and type(point) != list:
+                    msg = "Bad Request: elements of points should be list type for datasets of rank >1"
+                    log.info(msg)
+                    raise IOError(errno.EBADMSG, msg)
+                    if len(point) != rank:
+                        msg = "Bad Request: one or more points have a missing coordinate value"
                         log.info(msg)
-                        raise HTTPError(400, reason=msg)
-                        if len(point) != rank:
-                            msg = "Bad Request: one or more points have a missing coordinate value"
-                            log.info(msg)
-                            raise HTTPError(400, reason=msg)
-             
-                values = db.getDatasetPointSelectionByUuid(reqUuid, points) 
-                rootUUID = db.getUUIDByPath('/')
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+                        raise IOError(errno.EBADMSG, msg)
+         
+            values = db.getDatasetPointSelectionByUuid(reqUuid, points) 
+            rootUUID = db.getUUIDByPath('/')
+            return (values, rootUUID)
+        (values, rootUUID) = yield runDb(filePath, getPoints, update=False)
                          
         # got everything we need, put together the response
         href = self.request.protocol + '://' + domain + '/'
@@ -978,6 +1264,7 @@ class ValueHandler(RequestHandler):
         self.set_header('Content-Type', 'application/json')
         self.write(json_encode(response))     
     
+    @gen.coroutine
     def put(self):
         log = logging.getLogger("h5serv")
         log.info('ValueHandler.put host=[' + self.request.host + '] uri=[' + 
@@ -987,7 +1274,13 @@ class ValueHandler(RequestHandler):
         reqUuid = self.getRequestId()
         domain = self.request.host
         filePath = getFilePath(domain) 
-        verifyFile(filePath)
+        
+        contentType = self.request.headers.get('Content-Type', '')
+        if contentType.startswith('application/octet-stream'):
+            # raw values - no JSON decoding
+            yield self.putBinary(reqUuid, filePath)
+            return
+            
         points = None
         start = None
         stop = None
@@ -1016,8 +1309,8 @@ class ValueHandler(RequestHandler):
                 msg = "Bad Request: can use hyperslab selection and points selection in one request"
                 log.info(msg)
                 raise HTTPError(400, reason=msg)
-            if len(points) > len(value):
-                msg = "Bad Request: more points provided than values"
+            if type(body['value']) != list or len(points) != len(body['value']):
+                msg = "Bad Request: number of points should match number of values"
                 log.info(msg)
                 raise HTTPError(400, reason=msg)
         else:
@@ -1031,23 +1324,22 @@ class ValueHandler(RequestHandler):
                             
         data = body["value"]
         
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                item = db.getDatasetItemByUuid(reqUuid)
-                dsetshape = item['shape']
-                dims = dsetshape['dims']
-                rank = len(dims) 
-                if points:
-                    for point in points:
-                        pass  # todo        
-                else:
-                    slices = self.getHyperslabSelection(dims, start, stop, step)
-                    # todo - check that the types are compatible
-                    db.setDatasetValuesByUuid(reqUuid, data, slices)
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+        def putValues(db):
+            item = db.getDatasetItemByUuid(reqUuid)
+            dsetshape = item['shape']
+            dims = dsetshape['dims']
+            rank = len(dims) 
+            if points is not None:
+                if dsetshape['class'] != 'H5S_SIMPLE':
+                    msg = "Bad Request: point selection is only supported on simple datasets"
+                    log.info(msg)
+                    raise IOError(errno.EBADMSG, msg)
+                db.setDatasetPointSelectionByUuid(reqUuid, points, data)
+            else:
+                slices = self.getHyperslabSelection(dims, start, stop, step)
+                # todo - check that the types are compatible
+                db.setDatasetValuesByUuid(reqUuid, data, slices)
+        yield runDb(filePath, putValues)
         
         log.info("value post succeeded")   
            
@@ -1136,7 +1428,10 @@ class AttributeHandler(RequestHandler):
         return col_name
         
         
+    @gen.coroutine
     def get(self):
+        if writeCachedResponse(self):
+            return
         log = logging.getLogger("h5serv")
         log.info('AttrbiuteHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
         log.info('remote_ip: ' + self.request.remote_ip)
@@ -1146,12 +1441,9 @@ class AttributeHandler(RequestHandler):
         col_name = self.getRequestCollectionName()
         attr_name = self.getRequestName()
         filePath = getFilePath(domain) 
-        verifyFile(filePath)
         
         response = { }
         hrefs = []
-        rootUUID = None
-        items = []
         # Get optional query parameters
         limit = self.get_query_argument("Limit", 0)
         if type(limit) is not int:
@@ -1161,21 +1453,31 @@ class AttributeHandler(RequestHandler):
                 log.info("expected int type for limit")
                 raise HTTPError(400) 
         marker = self.get_query_argument("Marker", None)
-        
-        
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                if attr_name != None:
-                    item = db.getAttributeItem(col_name, reqUuid, attr_name)
-                    items.append(item)
-                else:
-                    # get all attributes (but without data)
-                    items = db.getAttributeItems(col_name, reqUuid, marker, limit)
-                rootUUID = db.getUUIDByPath('/')
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+        cursor = self.get_query_argument("Cursor", None)
+        includeValues = self.get_query_argument("IncludeValues", "0")
+        includeValues = includeValues.lower() in ('1', 'true', 'yes', 'on')
+        maxDataSize = int(config.get('attribute_value_max_size'))
+        
+        request = self.request
+        def getAttributes(db):
+            validators = getValidators(request, db.getObjectModifiedTime(col_name, reqUuid))
+            if isNotModified(validators):
+                return (validators, None, None, None)
+            items = []
+            nextCursor = None
+            if attr_name != None:
+                item = db.getAttributeItem(col_name, reqUuid, attr_name)
+                items.append(item)
+            else:
+                # get all attributes (with data only if requested)
+                (items, nextCursor) = db.getAttributeItemsPage(col_name, reqUuid,
+                    cursor=cursor, marker=marker, limit=limit, includeData=includeValues,
+                    maxDataSize=maxDataSize)
+            rootUUID = db.getUUIDByPath('/')
+            return (validators, items, nextCursor, rootUUID)
+        (validators, items, nextCursor, rootUUID) = yield runDb(filePath, getAttributes, update=False)
+        if setValidators(self, validators):
+            return
                          
         
         # got everything we need, put together the response
@@ -1206,7 +1508,11 @@ class AttributeHandler(RequestHandler):
         hrefs.append({'rel': 'owner',      'href': owner_href })
         hrefs.append({'rel': 'root',       'href': root_href }) 
         hrefs.append({'rel': 'home',       'href': href }) 
-        
+        if nextCursor:
+            nextHref = getNextHref(self_href, limit, nextCursor)
+            if includeValues:
+                nextHref += '&IncludeValues=1'
+            hrefs.append({'rel': 'next', 'href': nextHref})
             
         if attr_name == None:
             # specific attribute response
@@ -1224,6 +1530,7 @@ class AttributeHandler(RequestHandler):
         self.set_header('Content-Type', 'application/json')
         self.write(json_encode(response))
         
+    @gen.coroutine
     def put(self):
         log = logging.getLogger("h5serv")
         log.info('AttributeHandler.put host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
@@ -1238,7 +1545,6 @@ class AttributeHandler(RequestHandler):
             log.info(msg)
             raise HTTPError(400, reason=msg)
         filePath = getFilePath(domain) 
-        verifyFile(filePath)
         
         body = None
         try:
@@ -1287,14 +1593,10 @@ class AttributeHandler(RequestHandler):
         # convert list values to tuples (otherwise h5py is not happy)
         data = self.convertToTuple(value)
                    
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                db.createAttribute(col_name, reqUuid, attr_name, shape, datatype, data)
-                rootUUID = db.getUUIDByPath('/')
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+        def createAttribute(db):
+            db.createAttribute(col_name, reqUuid, attr_name, shape, datatype, data)
+            return db.getUUIDByPath('/')
+        rootUUID = yield runDb(filePath, createAttribute)
                 
         response = { }
       
@@ -1316,6 +1618,7 @@ class AttributeHandler(RequestHandler):
         self.write(json_encode(response))  
         self.set_status(201)  # resource created
         
+    @gen.coroutine
     def delete(self): 
         log = logging.getLogger("h5serv")
         log.info('AttributeHandler.delete ' + self.request.host)   
@@ -1329,15 +1632,10 @@ class AttributeHandler(RequestHandler):
             log.info(msg)
             raise HTTPError(400, reason=msg)
         filePath = getFilePath(domain)
-        verifyFile(filePath, True)
         
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                db.deleteAttribute(col_name, obj_uuid, attr_name)
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+        def deleteAttribute(db):
+            db.deleteAttribute(col_name, obj_uuid, attr_name)
+        yield runDb(filePath, deleteAttribute, writable=True)
         
         log.info("Attribute delete succeeded")
                 
@@ -1360,29 +1658,28 @@ class GroupHandler(RequestHandler):
     
         return id
             
+    @gen.coroutine
     def get(self):
+        if writeCachedResponse(self):
+            return
         log = logging.getLogger("h5serv")
         log.info('GroupHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
         log.info('remote_ip: ' + self.request.remote_ip)
         reqUuid = self.getRequestId()
         domain = self.request.host
         filePath = getFilePath(domain) 
-        verifyFile(filePath)
         
         response = { }
-             
         hrefs = []
-        rootUUID = None
-        item = None
-        
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                item = db.getGroupItemByUuid(reqUuid)
-                rootUUID = db.getUUIDByPath('/')
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+        request = self.request
+        def getGroup(db):
+            item = db.getGroupItemByUuid(reqUuid)
+            rootUUID = db.getUUIDByPath('/')
+            validators = getValidators(request, db.getObjectModifiedTime("groups", reqUuid))
+            return (validators, item, rootUUID)
+        (validators, item, rootUUID) = yield runDb(filePath, getGroup, update=False)
+        if setValidators(self, validators):
+            return
                          
         # got everything we need, put together the response
         href = self.request.protocol + '://' + domain + '/'
@@ -1401,6 +1698,7 @@ class GroupHandler(RequestHandler):
         self.set_header('Content-Type', 'application/json')
         self.write(json_encode(response))
         
+    @gen.coroutine
     def delete(self): 
         log = logging.getLogger("h5serv")
         log.info('GroupHandler.delete ' + self.request.host)   
@@ -1408,16 +1706,11 @@ class GroupHandler(RequestHandler):
         uuid = self.getRequestId()
         domain = self.request.host
         filePath = getFilePath(domain)
-        verifyFile(filePath, True)
         
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                db.deleteObjectByUuid('group', uuid)
-                rootUUID = db.getUUIDByPath('/') 
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+        def deleteGroup(db):
+            db.deleteObjectByUuid('group', uuid)
+            return db.getUUIDByPath('/') 
+        rootUUID = yield runDb(filePath, deleteGroup, writable=True)
          
         response = {}        
         hrefs = []
@@ -1436,14 +1729,15 @@ class GroupHandler(RequestHandler):
                 
 class GroupCollectionHandler(RequestHandler):
             
+    @gen.coroutine
     def get(self):
+        if writeCachedResponse(self):
+            return
         log = logging.getLogger("h5serv")
         log.info('GroupCollectionHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
         log.info('remote_ip: ' + self.request.remote_ip)
         domain = self.request.host
         filePath = getFilePath(domain) 
-        verifyFile(filePath)
-        rootUUID = None
         
         # Get optional query parameters
         limit = self.get_query_argument("Limit", 0)
@@ -1454,20 +1748,23 @@ class GroupCollectionHandler(RequestHandler):
                 log.info("expected int type for limit")
                 raise HTTPError(400) 
         marker = self.get_query_argument("Marker", None)
+        cursor = self.get_query_argument("Cursor", None)
         
         response = { }
-             
-        items = None
         hrefs = []
         
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                items = db.getCollection("groups", marker, limit)
-                rootUUID = db.getUUIDByPath('/')
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+        request = self.request
+        def getCollection(db):
+            validators = getValidators(request, db.getFileModifiedTime())
+            if isNotModified(validators):
+                return (validators, None, None, None)
+            (items, nextCursor) = db.getCollectionPage("groups", cursor=cursor,
+                marker=marker, limit=limit)
+            rootUUID = db.getUUIDByPath('/')
+            return (validators, items, nextCursor, rootUUID)
+        (validators, items, nextCursor, rootUUID) = yield runDb(filePath, getCollection, update=False)
+        if setValidators(self, validators):
+            return
                          
         # write the response
         response['groups'] = items
@@ -1475,11 +1772,14 @@ class GroupCollectionHandler(RequestHandler):
         hrefs.append({'rel': 'self',       'href': href + 'groups' })
         hrefs.append({'rel': 'root',       'href': href + 'groups/' + rootUUID}) 
         hrefs.append({'rel': 'home',       'href': href }) 
+        if nextCursor:
+            hrefs.append({'rel': 'next', 'href': getNextHref(href + 'groups', limit, nextCursor)})
         response['hrefs'] = hrefs
          
         self.set_header('Content-Type', 'application/json')
         self.write(json_encode(response))
         
+    @gen.coroutine
     def post(self):
         log = logging.getLogger("h5serv")
         log.info('GroupHandlerCollection.post host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
@@ -1513,23 +1813,19 @@ class GroupCollectionHandler(RequestHandler):
                
         domain = self.request.host
         filePath = getFilePath(domain)
-        verifyFile(filePath, True)
               
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                rootUUID = db.getUUIDByPath('/')
-                if parent_group_uuid:
-                    parent_group_item = db.getGroupItemByUuid(parent_group_uuid)
-                grpUUID = db.createGroup()
-                item = db.getGroupItemByUuid(grpUUID)
-                # if link info is provided, link the new group
-                if parent_group_uuid:
-                    # link the new dataset
-                    db.linkObject(parent_group_uuid, grpUUID, link_name) 
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror)      
+        def createGroup(db):
+            rootUUID = db.getUUIDByPath('/')
+            if parent_group_uuid:
+                parent_group_item = db.getGroupItemByUuid(parent_group_uuid)
+            grpUUID = db.createGroup()
+            item = db.getGroupItemByUuid(grpUUID)
+            # if link info is provided, link the new group
+            if parent_group_uuid:
+                # link the new dataset
+                db.linkObject(parent_group_uuid, grpUUID, link_name) 
+            return (rootUUID, grpUUID, item)
+        (rootUUID, grpUUID, item) = yield runDb(filePath, createGroup, writable=True)
            
         href = self.request.protocol + '://' + domain  
         self.set_header('Location', href + '/groups/' + grpUUID)
@@ -1558,13 +1854,15 @@ class GroupCollectionHandler(RequestHandler):
         
 class DatasetCollectionHandler(RequestHandler):
             
+    @gen.coroutine
     def get(self):
+        if writeCachedResponse(self):
+            return
         log = logging.getLogger("h5serv")
         log.info('DatasetCollectionHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
         log.info('remote_ip: ' + self.request.remote_ip)
         domain = self.request.host
         filePath = getFilePath(domain) 
-        verifyFile(filePath)
         
         # Get optional query parameters
         limit = self.get_query_argument("Limit", 0)
@@ -1576,21 +1874,23 @@ class DatasetCollectionHandler(RequestHandler):
                 log.info(msg)
                 raise HTTPError(400, reason=msg) 
         marker = self.get_query_argument("Marker", None)
+        cursor = self.get_query_argument("Cursor", None)
         
         response = { }
         hrefs = []
-        rootUUID = None
-             
-        items = None
         
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                items = db.getCollection("datasets", marker, limit)
-                rootUUID = db.getUUIDByPath('/')
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+        request = self.request
+        def getCollection(db):
+            validators = getValidators(request, db.getFileModifiedTime())
+            if isNotModified(validators):
+                return (validators, None, None, None)
+            (items, nextCursor) = db.getCollectionPage("datasets", cursor=cursor,
+                marker=marker, limit=limit)
+            rootUUID = db.getUUIDByPath('/')
+            return (validators, items, nextCursor, rootUUID)
+        (validators, items, nextCursor, rootUUID) = yield runDb(filePath, getCollection, update=False)
+        if setValidators(self, validators):
+            return
                          
         # write the response
         response['datasets'] = items
@@ -1598,11 +1898,14 @@ class DatasetCollectionHandler(RequestHandler):
         hrefs.append({'rel': 'self',       'href': href + 'datasets' })
         hrefs.append({'rel': 'root',       'href': href + 'groups/' + rootUUID}) 
         hrefs.append({'rel': 'home',       'href': href }) 
+        if nextCursor:
+            hrefs.append({'rel': 'next', 'href': getNextHref(href + 'datasets', limit, nextCursor)})
         response['hrefs'] = hrefs
          
         self.set_header('Content-Type', 'application/json')
         self.write(json_encode(response))
         
+    @gen.coroutine
     def post(self):
         log = logging.getLogger("h5serv")
         log.info('DatasetHandler.post host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
@@ -1614,7 +1917,6 @@ class DatasetCollectionHandler(RequestHandler):
                
         domain = self.request.host
         filePath = getFilePath(domain)
-        verifyFile(filePath, True)
         shape = None
         group_uuid = None
         link_name = None
@@ -1697,20 +1999,21 @@ class DatasetCollectionHandler(RequestHandler):
                     raise HTTPError(400, reason=msg)
                 if maxextent == 0:
                     maxshape[i] = None  # this indicates unlimited
-        
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                if group_uuid:
-                    group_item = db.getGroupItemByUuid(group_uuid)
-                rootUUID = db.getUUIDByPath('/')
-                dsetUUID = db.createDataset(datatype, shape, maxshape)
-                if group_uuid:
-                    # link the new dataset
-                    db.linkObject(group_uuid, dsetUUID, link_name)
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+
+        # optional chunk layout and filters, validated by createDataset
+        creationProps = body.get("creationProperties", None)
+        
+        def createDataset(db):
+            if group_uuid:
+                group_item = db.getGroupItemByUuid(group_uuid)
+            rootUUID = db.getUUIDByPath('/')
+            dsetUUID = db.createDataset(datatype, shape, maxshape, 
+                creation_props=creationProps)
+            if group_uuid:
+                # link the new dataset
+                db.linkObject(group_uuid, dsetUUID, link_name)
+            return (rootUUID, dsetUUID)
+        (rootUUID, dsetUUID) = yield runDb(filePath, createDataset, writable=True)
                 
         response = { }
       
@@ -1731,13 +2034,15 @@ class DatasetCollectionHandler(RequestHandler):
         
 class TypeCollectionHandler(RequestHandler):
             
+    @gen.coroutine
     def get(self):
+        if writeCachedResponse(self):
+            return
         log = logging.getLogger("h5serv")
         log.info('TypeCollectionHandler.get host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
         log.info('remote_ip: ' + self.request.remote_ip)
         domain = self.request.host
         filePath = getFilePath(domain) 
-        verifyFile(filePath)
         
         # Get optional query parameters
         limit = self.get_query_argument("Limit", 0)
@@ -1749,20 +2054,23 @@ class TypeCollectionHandler(RequestHandler):
                 log.info(msg)
                 raise HTTPError(400, reason=msg) 
         marker = self.get_query_argument("Marker", None)
+        cursor = self.get_query_argument("Cursor", None)
         
         response = { }
         hrefs = []
-        rootUUID = None
-             
-        items = None
-        try:
-            with Hdf5db(filePath) as db:
-                items = db.getCollection("datatypes", marker, limit)
-                rootUUID = db.getUUIDByPath('/')
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+        
+        request = self.request
+        def getCollection(db):
+            validators = getValidators(request, db.getFileModifiedTime())
+            if isNotModified(validators):
+                return (validators, None, None, None)
+            (items, nextCursor) = db.getCollectionPage("datatypes", cursor=cursor,
+                marker=marker, limit=limit)
+            rootUUID = db.getUUIDByPath('/')
+            return (validators, items, nextCursor, rootUUID)
+        (validators, items, nextCursor, rootUUID) = yield runDb(filePath, getCollection, update=False)
+        if setValidators(self, validators):
+            return
                          
         # write the response
         response['datatypes'] = items
@@ -1770,11 +2078,14 @@ class TypeCollectionHandler(RequestHandler):
         hrefs.append({'rel': 'self',       'href': href + 'datatypes' })
         hrefs.append({'rel': 'root',       'href': href + 'groups/' + rootUUID}) 
         hrefs.append({'rel': 'home',       'href': href }) 
+        if nextCursor:
+            hrefs.append({'rel': 'next', 'href': getNextHref(href + 'datatypes', limit, nextCursor)})
         response['hrefs'] = hrefs
          
         self.set_header('Content-Type', 'application/json')
         self.write(json_encode(response))
         
+    @gen.coroutine
     def post(self):
         log = logging.getLogger("h5serv")
         log.info('TypeHandler.post host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
@@ -1786,7 +2097,6 @@ class TypeCollectionHandler(RequestHandler):
                
         domain = self.request.host
         filePath = getFilePath(domain)
-        verifyFile(filePath, True)
         
         body = None
         try:
@@ -1816,24 +2126,17 @@ class TypeCollectionHandler(RequestHandler):
             
         datatype = body["type"]     
         
-        typeUUID = None
-        rootUUID = None
-        
-        try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                rootUUID = db.getUUIDByPath('/')
-                if parent_group_uuid:
-                    parent_group_item = db.getGroupItemByUuid(parent_group_uuid)
-                typeUUID = db.createCommittedType(datatype)
-                # if link info is provided, link the new group
-                if parent_group_uuid:
-                    # link the new dataset
-                    db.linkObject(parent_group_uuid, typeUUID, link_name) 
-                            
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+        def createType(db):
+            rootUUID = db.getUUIDByPath('/')
+            if parent_group_uuid:
+                parent_group_item = db.getGroupItemByUuid(parent_group_uuid)
+            typeUUID = db.createCommittedType(datatype)
+            # if link info is provided, link the new group
+            if parent_group_uuid:
+                # link the new dataset
+                db.linkObject(parent_group_uuid, typeUUID, link_name) 
+            return (rootUUID, typeUUID)
+        (rootUUID, typeUUID) = yield runDb(filePath, createType, writable=True)
             
         response = { }
       
@@ -1852,21 +2155,191 @@ class TypeCollectionHandler(RequestHandler):
         self.set_status(201)  # resource created
           
         
-class RootHandler(RequestHandler):
-
-    def getRootResponse(self, filePath):
+"""
+ BatchHandler - POST /batch returns metadata for a list of objects (groups, 
+   datasets, or committed datatypes) from a single db session.  The request
+   body is: {"ids": [<uuid>, ...], "include": [<facet>, ...]} where facets are 
+   "type", "shape", "attributes" (with values), and "links".  Objects that 
+   can't be returned have a "status" and "message" instead of metadata.
+"""
+class BatchHandler(RequestHandler):
+    
+    def getObjectResponse(self, db, objUuid, include):
+        colType = db.getCollectionType(objUuid)
+        if colType is None:
+            if db.getModifiedTime(objUuid, useRoot=False):
+                raise IOError(errno.EIDRM, "Object with uuid: " + objUuid + 
+                    " has been previously deleted")
+            raise IOError(errno.ENXIO, "Object with uuid: " + objUuid + " was not found")
+        response = {'id': objUuid, 'collection': colType}
+        if colType == 'groups':
+            item = db.getGroupItemByUuid(objUuid)
+            response['linkCount'] = item['linkCount']
+        elif colType == 'datasets':
+            item = db.getDatasetItemByUuid(objUuid)
+            if 'type' in include:
+                response['type'] = hdf5dtype.getTypeResponse(item['type'])
+            if 'shape' in include:
+                response['shape'] = item['shape']
+            if 'fillvalue' in item:
+                response['fillvalue'] = item['fillvalue']
+            response['creationProperties'] = item['creationProperties']
+        else:
+            item = db.getCommittedTypeItemByUuid(objUuid)
+            if 'type' in include:
+                response['type'] = hdf5dtype.getTypeResponse(item['type'])
+        response['created'] = unixTimeToUTC(item['ctime'])
+        response['lastModified'] = unixTimeToUTC(item['mtime'])
+        response['attributeCount'] = item['attributeCount']
+        
+        if 'attributes' in include:
+            attributes = []
+            for attrItem in db.getAttributeItems(colType, objUuid, includeData=True):
+                attribute = {}
+                attribute['name'] = attrItem['name']
+                attribute['type'] = hdf5dtype.getTypeResponse(attrItem['type'])
+                attribute['shape'] = attrItem['shape']
+                attribute['created'] = unixTimeToUTC(attrItem['ctime'])
+                attribute['lastModified'] = unixTimeToUTC(attrItem['mtime'])
+                if 'value' in attrItem:
+                    attribute['value'] = attrItem['value']
+                attributes.append(attribute)
+            response['attributes'] = attributes
+        if 'links' in include and colType == 'groups':
+            links = []
+            for linkItem in db.getLinkItems(objUuid):
+                for key in ('mtime', 'ctime', 'type', 'href'):
+                    if key in linkItem:
+                        del linkItem[key]
+                links.append(linkItem)
+            response['links'] = links
+        return response
+    
+    @gen.coroutine
+    def post(self):
         log = logging.getLogger("h5serv")
-        # used by GET / and PUT /
+        log.info('BatchHandler.post host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
+        log.info('remote_ip: ' + self.request.remote_ip)
         domain = self.request.host
         filePath = getFilePath(domain)
         
+        body = None
         try:
-            with Hdf5db(filePath, app_logger=log) as db:
-                rootUUID = db.getUUIDByPath('/')
-        except IOError as e:
-            log.info("IOError: " + str(e.errno) + " " + e.strerror)
-            status = errNoToHttpStatus(e.errno)
-            raise HTTPError(status, reason=e.strerror) 
+            body = json.loads(self.request.body)
+        except ValueError as e:
+            msg = "JSON Parser Error: " + e.message
+            log.info(msg)
+            raise HTTPError(400, reason=msg)
+        if type(body) is not dict or type(body.get("ids")) is not list:
+            msg = "Bad Request: ids list not specified"
+            log.info(msg)
+            raise HTTPError(400, reason=msg)
+        ids = body["ids"]
+        if len(ids) > int(config.get('batch_max_objects')):
+            msg = "Bad Request: more than " + str(config.get('batch_max_objects')) + " ids"
+            log.info(msg)
+            raise HTTPError(400, reason=msg)
+        include = body.get("include", ["type", "shape"])
+        if type(include) is not list:
+            msg = "Bad Request: include must be a list"
+            log.info(msg)
+            raise HTTPError(400, reason=msg)
+        for facet in include:
+            if facet not in ("type", "shape", "attributes", "links"):
+                msg = "Bad Request: unknown facet: " + str(facet)
+                log.info(msg)
+                raise HTTPError(400, reason=msg)
+        
+        def getObjects(db):
+            objects = []
+            rootUUID = db.getUUIDByPath('/')
+            for objUuid in ids:
+                if type(objUuid) not in (str, unicode):
+                    objects.append({'id': objUuid, 'status': 400, 'message': 'Invalid id'})
+                    continue
+                try:
+                    objects.append(self.getObjectResponse(db, objUuid, include))
+                except IOError as e:
+                    log.info("IOError: " + str(e))
+                    objects.append({'id': objUuid, 'status': errNoToHttpStatus(e.errno),
+                        'message': e.strerror or str(e)})
+            return (rootUUID, objects)
+        (rootUUID, objects) = yield runDb(filePath, getObjects, update=False)
+        
+        hrefs = []
+        href = self.request.protocol + '://' + domain + '/'
+        hrefs.append({'rel': 'self', 'href': href + 'batch'})
+        hrefs.append({'rel': 'root', 'href': href + 'groups/' + rootUUID}) 
+        hrefs.append({'rel': 'home', 'href': href })
+        response = {'objects': objects, 'hrefs': hrefs}
+        self.set_header('Content-Type', 'application/json')
+        self.write(json_encode(response))
+        
+        
+class PathHandler(RequestHandler):
+    
+    @gen.coroutine
+    def post(self):
+        log = logging.getLogger("h5serv")
+        log.info('PathHandler.post host=[' + self.request.host + '] uri=[' + self.request.uri + ']')
+        log.info('remote_ip: ' + self.request.remote_ip)
+        domain = self.request.host
+        filePath = getFilePath(domain)
+        
+        body = None
+        try:
+            body = json.loads(self.request.body)
+        except ValueError as e:
+            msg = "JSON Parser Error: " + e.message
+            log.info(msg)
+            raise HTTPError(400, reason=msg)
+        if type(body) is not dict or type(body.get("h5paths")) is not list:
+            msg = "Bad Request: h5paths list not specified"
+            log.info(msg)
+            raise HTTPError(400, reason=msg)
+        h5paths = body["h5paths"]
+        if len(h5paths) > int(config.get('batch_max_objects')):
+            msg = "Bad Request: more than " + str(config.get('batch_max_objects')) + " h5paths"
+            log.info(msg)
+            raise HTTPError(400, reason=msg)
+        
+        def getPaths(db):
+            paths = []
+            rootUUID = db.getUUIDByPath('/')
+            for h5path in h5paths:
+                if type(h5path) not in (str, unicode):
+                    paths.append({'h5path': h5path, 'status': 400, 
+                        'message': 'Invalid h5path'})
+                    continue
+                try:
+                    item = db.getObjectItemByPath(h5path)
+                    item['h5path'] = h5path
+                    paths.append(item)
+                except IOError as e:
+                    log.info("IOError: " + str(e))
+                    paths.append({'h5path': h5path, 'status': errNoToHttpStatus(e.errno),
+                        'message': e.strerror or str(e)})
+            return (rootUUID, paths)
+        (rootUUID, paths) = yield runDb(filePath, getPaths, update=False)
+        
+        hrefs = []
+        href = self.request.protocol + '://' + domain + '/'
+        hrefs.append({'rel': 'self', 'href': href + 'paths'})
+        hrefs.append({'rel': 'root', 'href': href + 'groups/' + rootUUID}) 
+        hrefs.append({'rel': 'home', 'href': href })
+        response = {'paths': paths, 'hrefs': hrefs}
+        self.set_header('Content-Type', 'application/json')
+        self.write(json_encode(response))
+        
+        
+class RootHandler(RequestHandler):
+
+    """
+    Helper method - return the GET / (and PUT /) response given the root 
+    group's uuid and the file's (ctime, mtime)
+    """
+    def getRootResponse(self, rootUUID, fileTimes):
+        domain = self.request.host
          
         # generate response 
         hrefs = [ ]
@@ -1878,21 +2351,155 @@ class RootHandler(RequestHandler):
         hrefs.append({'rel': 'root',     'href': href + 'groups/' + rootUUID})
             
         response = {  }
-        response['created'] = unixTimeToUTC(op.getctime(filePath))
-        response['lastModified'] = unixTimeToUTC(op.getmtime(filePath))
+        response['created'] = unixTimeToUTC(fileTimes[0])
+        response['lastModified'] = unixTimeToUTC(fileTimes[1])
         response['root'] = rootUUID
         response['hrefs'] = hrefs  
       
         return response
         
+    @gen.coroutine
     def get(self):
+        if writeCachedResponse(self):
+            return
+        if self.get_query_argument("Export", None) is not None:
+            yield self.exportDomain()
+        else:
+            yield self.getDomain()
+            
+    """
+    Helper method - export the objects of the domain (see DomainExport),
+    streamed a batch of objects at a time.
+    """
+    @gen.coroutine
+    def exportDomain(self):
+        log = logging.getLogger("h5serv")
+        log.info('RootHandler.exportDomain ' + self.request.host)
+        log.info('remote_ip: ' + self.request.remote_ip)
+        filePath = getFilePath(self.request.host)
+        
+        depth = self.get_query_argument("Depth", None)
+        if depth is not None:
+            try:
+                depth = int(depth)
+            except ValueError:
+                depth = -1
+            if depth < 0:
+                msg = "Bad Request: Depth must be a non-negative integer"
+                log.info(msg)
+                raise HTTPError(400, reason=msg)
+        values = self.get_query_argument("Values", "all")
+        if values not in ("none", "attributes", "all"):
+            msg = "Bad Request: Values must be one of none, attributes, or all"
+            log.info(msg)
+            raise HTTPError(400, reason=msg)
+        exporter = DomainExport(attributeValues=(values != "none"), 
+            datasetValues=(values == "all"), maxDepth=depth)
+        batchSize = int(config.get('export_batch_size'))
+        maxBytes = int(config.get('stream_block_size'))
+        
+        request = self.request
+        def start(db):
+            validators = getValidators(request, db.getFileModifiedTime())
+            if isNotModified(validators):
+                return (validators, None)
+            return (validators, exporter.start(db))
+            
+        def getGroups(db):
+            groups = []
+            for (uuid, item) in exporter.nextGroups(db, batchSize):
+                groups.append(json_encode(uuid) + ': ' + json_encode(item))
+            return groups
+            
+        def getDatasets(db):
+            # returns list of (uuid, json, slices), slices is set if the value
+            # is to be streamed
+            datasets = []
+            nbytes = 0
+            while exporter.datasets and len(datasets) < batchSize and nbytes < maxBytes:
+                uuid = exporter.datasets.popleft()
+                dset = db.getDatasetObjByUuid(uuid)
+                slices = None
+                if exporter.datasetValues and len(dset.shape) > 0:
+                    dsetBytes = dset.dtype.itemsize
+                    for extent in dset.shape:
+                        dsetBytes *= extent
+                    if dsetBytes > maxBytes:
+                        slices = tuple([slice(0, extent) for extent in dset.shape])
+                    else:
+                        nbytes += dsetBytes
+                item = exporter.getDataset(db, uuid, includeValue=(slices is None))
+                datasets.append((uuid, json_encode(item), slices))
+                if slices:
+                    break  # stream the value before reading more
+            return datasets
+            
+        def getDatatypes(db):
+            datatypes = []
+            while exporter.datatypes and len(datatypes) < batchSize:
+                uuid = exporter.datatypes.popleft()
+                item = exporter.getDatatype(db, uuid)
+                datatypes.append(json_encode(uuid) + ': ' + json_encode(item))
+            return datatypes
+        
+        (validators, rootUuid) = yield runDb(filePath, start, update=False)
+        if setValidators(self, validators):
+            return
+        try:
+            self.set_header('Content-Type', 'application/json')
+            self.write('{"root": ' + json_encode(rootUuid) + ', "groups": {')
+            items = yield getExecutor().submit(dbCall, filePath, getGroups, update=False)
+            self.write(', '.join(items))
+            while exporter.groupQueue:
+                items = yield getExecutor().submit(dbCall, filePath, getGroups, update=False)
+                self.write(', ' + ', '.join(items))
+                yield self.flush()
+            self.write('}')
+            
+            if exporter.datasets:
+                self.write(', "datasets": {')
+                first = True
+                while exporter.datasets:
+                    datasets = yield getExecutor().submit(dbCall, filePath, getDatasets, update=False)
+                    for (uuid, text, slices) in datasets:
+                        if not first:
+                            self.write(', ')
+                        first = False
+                        if slices:
+                            self.write(json_encode(uuid) + ': ' + text[:-1] + ', "value": ')
+                            yield writeValueBlocks(self, filePath, uuid, slices)
+                            self.write('}')
+                        else:
+                            self.write(json_encode(uuid) + ': ' + text)
+                    yield self.flush()
+                self.write('}')
+                
+            if exporter.datatypes:
+                self.write(', "datatypes": {')
+                items = yield getExecutor().submit(dbCall, filePath, getDatatypes, update=False)
+                self.write(', '.join(items))
+                while exporter.datatypes:
+                    items = yield getExecutor().submit(dbCall, filePath, getDatatypes, update=False)
+                    self.write(', ' + ', '.join(items))
+                    yield self.flush()
+                self.write('}')
+            self.write('}')
+        except IOError as e:
+            log.info("IOError: " + str(e))
+            status = errNoToHttpStatus(e.errno)
+            raise HTTPError(status, reason=e.strerror or str(e)) 
+        
+    """
+    Helper method - write the GET / response
+    """
+    @gen.coroutine
+    def getDomain(self):
         log = logging.getLogger("h5serv")
         log.info('RootHandler.get ' + self.request.host)
         log.info('remote_ip: ' + self.request.remote_ip)
         # get file path for the domain
         # will raise exception if not found
         filePath = getFilePath(self.request.host)
-        verifyFile(filePath)
         # print 'content-type:', self.request.headers['accept']
         accept_type = ''
         if 'accept' in self.request.headers:
@@ -1902,14 +2509,23 @@ class RootHandler(RequestHandler):
             accept_types = accept_values[0].split(';')
             accept_type = accept_types[0]
             # print 'accept_type:', accept_type
+        request = self.request
+        def getRoot(db):
+            fileTimes = (op.getctime(filePath), db.getFileModifiedTime())
+            validators = getValidators(request, fileTimes[1])
+            return (validators, db.getUUIDByPath('/'), fileTimes)
+        (validators, rootUUID, fileTimes) = yield runDb(filePath, getRoot, update=False)
+        if setValidators(self, validators):
+            return
         if False and accept_type == 'text/html':  # disable for now
             self.set_header('Content-Type', 'text/html') 
             self.write("<html><body>Hello world!</body></html>")
         else:
-            response = self.getRootResponse(filePath)
+            response = self.getRootResponse(rootUUID, fileTimes)
             self.set_header('Content-Type', 'application/json') 
             self.write(json_encode(response)) 
         
+    @gen.coroutine
     def put(self): 
         log = logging.getLogger("h5serv")
         log.info('RootHandler.put ' + self.request.host)  
@@ -1925,23 +2541,27 @@ class RootHandler(RequestHandler):
         log.info("creating file: [" + filePath + "]")
         
         try:
-            Hdf5db.createHDF5File(filePath)
+            yield getExecutor().submit(Hdf5db.createHDF5File, filePath)
         except IOError as e:
-            log.info("IOError creating new HDF5 file: " + str(e.errno) + " " + e.strerror)
+            log.info("IOError creating new HDF5 file: " + str(e))
             raise HTTPError(500, "Unexpected error: unable to create collection") 
             
-        response = self.getRootResponse(filePath)
+        def getRoot(db):
+            rootUUID = db.getUUIDByPath('/')
+            return (rootUUID, (op.getctime(filePath), db.getFileModifiedTime()))
+        (rootUUID, fileTimes) = yield runDb(filePath, getRoot)
+        response = self.getRootResponse(rootUUID, fileTimes)
         
         self.set_header('Content-Type', 'application/json')
         self.write(json_encode(response))
         self.set_status(201)  # resource created
           
+    @gen.coroutine
     def delete(self): 
         log = logging.getLogger("h5serv")
         log.info('RootHandler.delete ' + self.request.host)  
         log.info('remote_ip: ' + self.request.remote_ip) 
         filePath = getFilePath(self.request.host)
-        verifyFile(filePath, True)
         
         if not op.isfile(filePath):
             # file not there
@@ -1955,10 +2575,16 @@ class RootHandler(RequestHandler):
             log.info(msg)
             raise HTTPError(403, reason=msg) # Forbidden
         
+        def removeFile():
+            verifyFile(filePath, True)
+            # close the file if it's held open in the db pool
+            getPool().invalidate(filePath)
+            os.remove(filePath)
+            
         try:    
-            os.remove(filePath)  
-        except IOError as ioe:
-            log.info("IOError deleting HDF5 file: " + str(e.errno) + " " + e.strerror)
+            yield getExecutor().submit(removeFile)
+        except (IOError, OSError) as e:
+            log.info("IOError deleting HDF5 file: " + str(e))
             raise HTTPError(500, "Unexpected error: unable to delete collection") 
               
         
@@ -1988,17 +2614,24 @@ def shutdown():
     stop_loop() 
     
     log.info("closing db")
+    getPool().closeAll()
 
-def make_app():
+def make_app(debug=None):
+    if debug is None:
+        debug = config.getBool('debug')
     settings = {
         "static_path": os.path.join(os.path.dirname(__file__), "../static"),
         # "cookie_secret": "__TODO:_GENERATE_YOUR_OWN_RANDOM_VALUE_HERE__",
         # "login_url": "/login",
         # "xsrf_cookies": True,
-        "debug": config.get('debug')
+        "debug": debug
     }
     print 'static_path:', settings['static_path']
     print 'isdebug:', settings['debug']
+    # the cache sees responses before they are compressed
+    transforms = [ResponseCacheTransform]
+    if config.getBool('compress_response'):
+        transforms.append(CompressContentEncoding)
     
     app = Application( [
         url(r"/datasets/.*/type", DatatypeHandler),
@@ -2026,10 +2659,12 @@ def make_app():
         url(r"/groups/.*", GroupHandler), 
         url(r"/groups\?.*", GroupCollectionHandler),
         url(r"/groups", GroupCollectionHandler),
+        url(r"/batch", BatchHandler),
+        url(r"/paths", PathHandler),
         url(r"/static/(.*)", tornado.web.StaticFileHandler, {'path', '../static/'}),
         url(r"/", RootHandler),
         url(r".*", DefaultHandler)
-    ],  **settings)
+    ],  transforms=transforms, **settings)
     return app
 
 def main():
@@ -2053,11 +2688,35 @@ def main():
     log.addHandler(handler)
     port = int(config.get('port'))
     global server
-    app = make_app()
-    server = tornado.httpserver.HTTPServer(app)
-    server.listen(port)
+    num_processes = int(config.get('num_processes'))
+    # debug mode enables autoreload, which starts the IOLoop and can't be
+    # used with forked processes
+    app = make_app(debug=config.getBool('debug') and num_processes == 1)
+    sockets = tornado.netutil.bind_sockets(port)
+    if num_processes != 1:
+        # pre-fork worker processes, each with its own db pool and thread pool
+        # (both are created on first use).  The db pool locks data files 
+        # across processes.
+        tornado.process.fork_processes(num_processes)
+    server = tornado.httpserver.HTTPServer(app,
+        max_body_size=int(config.get('max_body_size')))
+    server.add_sockets(sockets)
     signal.signal(signal.SIGTERM, sig_handler)
     signal.signal(signal.SIGINT, sig_handler)
+    # periodically close files that have been idle in the db pool
+    pool_timeout = int(config.get('db_pool_timeout'))
+    if pool_timeout > 0:
+        PeriodicCallback(getPool().evict, pool_timeout * 1000 / 2).start()
+    # complete the UUID index of lazily indexed files in the background
+    if config.getBool('lazy_index'):
+        index_batch_size = int(config.get('index_batch_size'))
+        PeriodicCallback(lambda: getExecutor().submit(getPool().indexStep, index_batch_size),
+            1000).start()
+    # log cache statistics of the open files
+    stats_interval = int(config.get('cache_stats_interval'))
+    if stats_interval > 0:
+        PeriodicCallback(lambda: getExecutor().submit(getPool().logCacheStats),
+            stats_interval * 1000).start()
     log.info("INITIALIZING...")
     print "Starting event loop on port: ", port
     IOLoop.current().start()
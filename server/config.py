@@ -20,7 +20,34 @@ cfg = {
     'domain':  'hdfgroup.org',
     'hdf5_ext': '.h5',
     'local_ip': '127.0.0.1',
-    'default_dns': '8.8.8.8'  # used by local_dns.py
+    'default_dns': '8.8.8.8',  # used by local_dns.py
+    'db_pool_size': 16,        # max number of HDF5 files kept open
+    'db_pool_timeout': 300,    # close files idle for more than this many seconds
+    'lazy_index': False,       # assign object UUIDs on demand rather than at first open (see README)
+    'index_format': 'table',   # uuid index layout for new files: 'table' or 'attrs'
+    'index_cache_size': 1000000, # max in-memory uuid/address entries per open file
+    'index_batch_size': 1000,  # objects indexed per background indexing step
+    'max_body_size': 1024*1024*1024,  # largest request body accepted (bytes)
+    'stream_threshold': 16*1024*1024,  # stream JSON values for selections larger than this
+    'stream_block_size': 4*1024*1024,  # bytes of data read per block when streaming
+    'io_threads': 4,           # threads used for HDF5 calls
+    'num_processes': 1,        # server processes to fork (0 for one per CPU)
+    'response_cache_size': 64*1024*1024,  # bytes of responses cached for read-only domains (0 to disable)
+    'response_cache_dir': '',  # directory for responses evicted from memory (none if empty)
+    'response_cache_disk_size': 1024*1024*1024,  # max bytes in response_cache_dir
+    'compress_response': True,   # gzip/deflate responses if the client accepts it
+    'compress_level': 6,         # zlib compression level (1 fastest - 9 smallest)
+    'compress_min_size': 1024,   # responses smaller than this (bytes) are not compressed
+    'chunk_cache_size': 8*1024*1024,  # raw data chunk cache per open dataset (bytes)
+    'chunk_cache_slots': 10007,  # chunk cache hash slots (prime, ~100x chunks in the cache)
+    'chunk_cache_w0': 0.75,      # chunk cache preemption policy (0-1, 1 evicts fully read chunks first)
+    'dataset_cache_size': 16,    # datasets kept open per file so chunk caches persist
+    'cache_stats_interval': 600, # seconds between logging open files' cache stats (0 to disable)
+    'path_cache_size': 1000,     # resolved h5paths cached per file for POST /paths
+    'batch_max_objects': 1000,   # max ids in a POST /batch request
+    'export_batch_size': 100,    # objects read at a time for GET /?Export
+    'attribute_value_max_size': 64*1024,  # largest value (bytes) returned in attribute listings
+    'link_tree_max_items': 10000  # max links returned by GET /groups/<id>/links?Depth=n
 }
    
 def get(x):     
@@ -37,6 +64,13 @@ def get(x):
         return os.environ[x.upper()]
     # no command line override, just return the cfg value        
     return cfg[x]
+    
+def getBool(x):
+    # overrides are given as strings, so convert to bool
+    value = get(x)
+    if type(value) is str:
+        return value.lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
 
   
   
@@ -0,0 +1,103 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import zlib
+from tornado.web import OutputTransform
+
+import config
+
+"""
+ Response compression - gzip or deflate content encoding negotiated from the 
+ request's Accept-Encoding header.  
+ 
+ Responses smaller than compress_min_size are sent as is.  Streamed responses
+ (e.g. large dataset values) are compressed as they are written, each chunk is
+ flushed so the client can decode what has been received so far.
+"""
+
+# content types that are worth compressing
+COMPRESS_CONTENT_TYPES = set(['application/json', 'application/javascript', 
+    'text/plain', 'text/html', 'text/css', 'text/xml', 'application/xml'])
+# supported encodings in order of preference for equal q values
+ENCODINGS = ('gzip', 'deflate')
+# zlib window bits for each encoding (deflate in HTTP is the zlib format)
+WBITS = {'gzip': 16 + zlib.MAX_WBITS, 'deflate': zlib.MAX_WBITS}
+
+"""
+ getContentEncoding - return the encoding ('gzip', 'deflate') to use for the 
+   given Accept-Encoding header value, or None for no compression
+"""
+def getContentEncoding(acceptEncoding):
+    if not acceptEncoding:
+        return None
+    qvalues = {}
+    for item in acceptEncoding.split(','):
+        fields = item.split(';')
+        coding = fields[0].strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in fields[1:]:
+            param = param.strip()
+            if param[:2] == 'q=':
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        qvalues[coding] = q
+    encoding = None
+    bestq = 0.0
+    for coding in ENCODINGS:
+        q = qvalues.get(coding, qvalues.get('*', 0.0))
+        if q > bestq:
+            encoding = coding
+            bestq = q
+    return encoding
+    
+
+class CompressContentEncoding(OutputTransform):
+    def __init__(self, request):
+        self.encoding = getContentEncoding(request.headers.get('Accept-Encoding'))
+        self.compressor = None
+        
+    def transform_first_chunk(self, status_code, headers, chunk, finishing):
+        if 'Vary' in headers:
+            headers['Vary'] += ', Accept-Encoding'
+        else:
+            headers['Vary'] = 'Accept-Encoding'
+        if self.encoding is None or status_code in (204, 304):
+            return status_code, headers, chunk
+        contentType = headers.get('Content-Type', '').split(';')[0].strip()
+        if contentType not in COMPRESS_CONTENT_TYPES or 'Content-Encoding' in headers:
+            return status_code, headers, chunk
+        if finishing and len(chunk) < int(config.get('compress_min_size')):
+            return status_code, headers, chunk
+            
+        self.compressor = zlib.compressobj(int(config.get('compress_level')), 
+            zlib.DEFLATED, WBITS[self.encoding])
+        headers['Content-Encoding'] = self.encoding
+        chunk = self.transform_chunk(chunk, finishing)
+        if 'Content-Length' in headers:
+            if finishing:
+                headers['Content-Length'] = str(len(chunk))
+            else:
+                del headers['Content-Length']
+        return status_code, headers, chunk
+        
+    def transform_chunk(self, chunk, finishing):
+        if self.compressor is None:
+            return chunk
+        data = self.compressor.compress(chunk)
+        if finishing:
+            data += self.compressor.flush()
+        else:
+            data += self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        return data
@@ -0,0 +1,50 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import base64
+import errno
+
+"""
+    Cursors are opaque strings used to page through link, attribute, and
+    object collections.  A cursor encodes the position following the last
+    item returned and the name of that item, so the next page can be read
+    starting at the position rather than scanning for the name.  The name is 
+    used to check the position is still valid.
+"""
+
+"""
+    Return name as a utf-8 encoded string
+"""
+def getNameKey(name):
+    if type(name) is unicode:
+        return name.encode('utf-8')
+    return str(name)
+    
+"""
+    Create a cursor for the given position and name
+"""    
+def encodeCursor(pos, name):
+    return base64.urlsafe_b64encode(str(pos) + ':' + getNameKey(name))
+    
+"""
+    Return (position, name) for a cursor created by encodeCursor.  Raises
+    IOError (EBADMSG) if the cursor is not valid.
+"""   
+def decodeCursor(cursor):
+    try:
+        text = base64.urlsafe_b64decode(str(cursor))
+        npos = text.index(':')
+        pos = int(text[:npos])
+    except (TypeError, ValueError, UnicodeError):
+        raise IOError(errno.EBADMSG, "Invalid cursor")
+    if pos < 1:
+        raise IOError(errno.EBADMSG, "Invalid cursor")
+    return (pos, text[npos+1:])
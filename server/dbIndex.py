@@ -0,0 +1,746 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+
+"""
+UUID index storage for the "__db__" group (see hdf5db.py).
+
+The index maps each object UUID to its collection ("groups", "datasets", or
+"datatypes") and to a reference (or path for read-only files) of the object,
+and maps each object address back to its UUID.  Anonymous objects (objects
+not linked to from anywhere else) are additionally hard linked as a member
+of the collection group using their UUID as the link name, so that they are
+not freed by the library.
+
+Two layouts are supported:
+
+ AttrIndex - "attrs" layout.  One attribute per object: the UUID->ref map is
+    stored as attributes of "{groups}", "{datasets}", "{datatypes}" (for
+    linked objects only) and the address->UUID map as attributes of "{addr}".
+
+ TableIndex - "table" layout.  Fixed width datasets in the "{index}" group:
+    "uuid", "addr", "col", "ref" hold one row per object, "uuidHash" and
+    "addrHash" are open addressing hash tables (linear probing) whose slots
+    hold row+1 (0 for an empty slot, -1 for a removed entry).  Lookups read
+    a few slots rather than searching HDF5 attribute storage, and the cost
+    does not grow with the number of objects.
+
+IndexCache wraps either layout with in-memory dictionaries so repeated
+lookups of the same objects don't go back to the file.
+
+LinkTable is the reverse link index ("{links}" group): the hard links to
+each object from the root group and the indexed groups, used to count the
+links to an object and to find them when it is deleted.
+"""
+import errno
+import hashlib
+import h5py
+import numpy as np
+
+
+COL_TYPES = ("groups", "datasets", "datatypes")
+
+EMPTY_SLOT = 0
+DELETED_SLOT = -1
+MIN_CAPACITY = 1024
+MASK64 = (1 << 64) - 1
+FIB_MULT = 11400714819323198485  # 2^64 / golden ratio
+
+
+def getColName(col_type):
+    return '{' + col_type + '}'
+
+"""
+  getSlot - initial slot for hash h in a table of nslots slots, using the 
+    high bits of the hash (nslots is a power of 2)
+"""
+def getSlot(h, nslots):
+    return (h * FIB_MULT & MASK64) >> (64 - (nslots.bit_length() - 1))
+
+"""
+  hashKey - 64-bit hash of an address (int) or uuid (string)
+"""
+def hashKey(key):
+    if type(key) in (int, long):
+        return key & MASK64
+    if type(key) is unicode:
+        key = key.encode('utf-8')
+    return int(hashlib.md5(key).hexdigest()[:16], 16)
+
+
+class AttrIndex:
+    format = "attrs"
+
+    def __init__(self, dbGrp, f, readonly, log):
+        self.dbGrp = dbGrp
+        self.f = f
+        self.readonly = readonly
+        self.log = log
+
+    @staticmethod
+    def create(dbGrp):
+        dbGrp.create_group("{addr}") # store object address
+
+    def getUUID(self, addr):
+        if "{addr}" not in self.dbGrp:
+            self.log.error("expected to find {addr} group")
+            return None
+        addrGrp = self.dbGrp["{addr}"]
+        obj_uuid = None
+        if str(addr) in addrGrp.attrs:
+            obj_uuid = addrGrp.attrs[str(addr)]
+        return obj_uuid
+
+    def getAddresses(self):
+        addrGrp = self.dbGrp["{addr}"]
+        return set([int(addr) for addr in addrGrp.attrs.keys()])
+
+    def getObject(self, col_type, obj_uuid):
+        obj = None  # Group, Dataset, or Datatype
+        # get the collection group for this collection type
+        col = self.dbGrp[getColName(col_type)]
+        if obj_uuid in col.attrs:
+            ref = col.attrs[obj_uuid]
+            obj = self.f[ref]  # this works for read-only as well
+        elif obj_uuid in col:
+            # anonymous object
+            obj = col[obj_uuid]
+        return obj
+
+    def getCollectionType(self, obj_uuid):
+        for col_type in COL_TYPES:
+            col = self.dbGrp[getColName(col_type)]
+            if obj_uuid in col or obj_uuid in col.attrs:
+                return col_type
+        return None
+
+    """
+      getEntry - return (col_type, ref) for the uuid, or None if not found.
+        ref is a reference or (for read-only files) a path to the object.
+    """
+    def getEntry(self, obj_uuid):
+        for col_type in COL_TYPES:
+            col = self.dbGrp[getColName(col_type)]
+            if obj_uuid in col.attrs:
+                return (col_type, col.attrs[obj_uuid])
+            if obj_uuid in col:
+                return (col_type, col[obj_uuid].ref)  # anonymous object
+        return None
+
+    def addObject(self, col_type, obj_uuid, obj, addr, anonymous=False):
+        col = self.dbGrp[getColName(col_type)]
+        if not anonymous:
+            if not self.readonly:
+                # storing db in the file itself, so we can link to the object directly
+                col.attrs[obj_uuid] = obj.ref  # save attribute ref to object
+            else:
+                #store path to object
+                col.attrs[obj_uuid] = obj.name
+        # store reverse map as an attribute
+        addrGrp = self.dbGrp["{addr}"]
+        addrGrp.attrs[str(addr)] = obj_uuid
+
+    def removeObject(self, col_type, obj_uuid, addr):
+        addrGrp = self.dbGrp["{addr}"]
+        del addrGrp.attrs[str(addr)]  # remove reverse map
+        col = self.dbGrp[getColName(col_type)]
+        if obj_uuid in col:
+            # should be here (now it is anonymous)
+            del col[obj_uuid]
+            return True
+        self.log.warning("did not find: " + obj_uuid + " in anonymous collection")
+        if obj_uuid in col.attrs:
+            self.log.info("removing: " + obj_uuid + " from non-anonymous collection")
+            del col.attrs[obj_uuid]
+            return True
+        return False
+
+    def setAnonymous(self, col_type, obj_uuid, obj):
+        # remove the attribute UUID key and add a hard link
+        col = self.dbGrp[getColName(col_type)]
+        del col.attrs[obj_uuid]  # remove the object ref
+        col[obj_uuid] = obj      # add a hardlink
+
+    def setLinked(self, col_type, obj_uuid, obj):
+        col = self.dbGrp[getColName(col_type)]
+        if obj_uuid in col:
+            # convert to a ref
+            del col[obj_uuid]  # remove hardlink
+            col.attrs[obj_uuid] = obj.ref # create a ref
+
+    def getUUIDs(self, col_type):
+        col = self.dbGrp[getColName(col_type)]
+        # the non-anonymous ids first, then the anonymous ones
+        return list(col.attrs) + list(col)
+
+    def getCount(self, col_type):
+        col = self.dbGrp[getColName(col_type)]
+        return len(col) + len(col.attrs)
+
+    # positions are indexes into the getUUIDs list
+    def getNumPositions(self, col_type):
+        return self.getCount(col_type)
+
+    def getUUIDRange(self, col_type, start, stop):
+        return self.getUUIDs(col_type)[start:stop]
+
+
+class TableIndex:
+    format = "table"
+
+    def __init__(self, dbGrp, f, readonly, log):
+        self.dbGrp = dbGrp
+        self.f = f
+        self.readonly = readonly
+        self.log = log
+        self.grp = dbGrp["{index}"]
+        self.uuidDset = self.grp["uuid"]
+        self.addrDset = self.grp["addr"]
+        self.colDset = self.grp["col"]
+        self.refDset = self.grp["ref"]
+        self.uuidHash = self.grp["uuidHash"]
+        self.addrHash = self.grp["addrHash"]
+        self.numRows = int(self.grp.attrs["numRows"])
+        self.numSlots = int(self.grp.attrs["numSlots"])  # used slots (incl. removed)
+
+    @staticmethod
+    def create(dbGrp, readonly, capacity=MIN_CAPACITY):
+        grp = dbGrp.create_group("{index}")
+        chunks = (1024,)
+        grp.create_dataset("uuid", (capacity,), maxshape=(None,), chunks=chunks, dtype='S36')
+        grp.create_dataset("addr", (capacity,), maxshape=(None,), chunks=chunks, dtype='u8')
+        grp.create_dataset("col", (capacity,), maxshape=(None,), chunks=chunks, dtype='i1',
+            fillvalue=-1)
+        if readonly:
+            # data file is read-only, so store paths rather than references
+            ref_dt = h5py.special_dtype(vlen=str)
+        else:
+            ref_dt = h5py.special_dtype(ref=h5py.Reference)
+        grp.create_dataset("ref", (capacity,), maxshape=(None,), chunks=chunks, dtype=ref_dt)
+        nslots = MIN_CAPACITY
+        while nslots < capacity * 2:
+            nslots *= 2
+        grp.create_dataset("uuidHash", (nslots,), maxshape=(None,), chunks=chunks, dtype='i8')
+        grp.create_dataset("addrHash", (nslots,), maxshape=(None,), chunks=chunks, dtype='i8')
+        grp.attrs["numRows"] = 0
+        grp.attrs["numSlots"] = 0
+
+    def getSlot(self, h, nslots):
+        return getSlot(h, nslots)
+
+    """
+      findSlot - return (slot, row) for key in the given hash table,
+        row is -1 if the key is not present
+    """
+    def findSlot(self, hashDset, keyDset, key):
+        nslots = hashDset.shape[0]
+        slot = self.getSlot(hashKey(key), nslots)
+        for i in xrange(nslots):
+            value = int(hashDset[slot])
+            if value == EMPTY_SLOT:
+                break
+            if value != DELETED_SLOT and keyDset[value - 1] == key:
+                return (slot, value - 1)
+            slot = (slot + 1) & (nslots - 1)
+        return (-1, -1)
+
+    def insertSlot(self, hashDset, key, row):
+        nslots = hashDset.shape[0]
+        slot = self.getSlot(hashKey(key), nslots)
+        while True:
+            value = int(hashDset[slot])
+            if value == EMPTY_SLOT or value == DELETED_SLOT:
+                hashDset[slot] = row + 1
+                return
+            slot = (slot + 1) & (nslots - 1)
+
+    def getRow(self, obj_uuid):
+        (slot, row) = self.findSlot(self.uuidHash, self.uuidDset, obj_uuid)
+        return row
+
+    def getUUID(self, addr):
+        (slot, row) = self.findSlot(self.addrHash, self.addrDset, int(addr))
+        if row < 0:
+            return None
+        return str(self.uuidDset[row])
+
+    def getAddresses(self):
+        if self.numRows == 0:
+            return set()
+        cols = self.colDset[0:self.numRows]
+        addrs = self.addrDset[0:self.numRows]
+        return set([int(addr) for addr in addrs[cols >= 0]])
+
+    def getObject(self, col_type, obj_uuid):
+        row = self.getRow(obj_uuid)
+        if row < 0 or COL_TYPES.index(col_type) != self.colDset[row]:
+            return None
+        ref = self.refDset[row]
+        return self.f[ref]  # this works for read-only (path) as well
+
+    def getCollectionType(self, obj_uuid):
+        row = self.getRow(obj_uuid)
+        if row < 0:
+            return None
+        return COL_TYPES[self.colDset[row]]
+
+    def getEntry(self, obj_uuid):
+        row = self.getRow(obj_uuid)
+        if row < 0:
+            return None
+        return (COL_TYPES[self.colDset[row]], self.refDset[row])
+
+    """
+      rehash - rebuild the hash tables with room for at least numRows
+        entries (this also drops removed entries)
+    """
+    def rehash(self, numRows):
+        nslots = MIN_CAPACITY
+        while nslots < numRows * 2:
+            nslots *= 2
+        self.log.info("index rehash, slots: " + str(nslots))
+        uuidTable = np.zeros((nslots,), dtype='i8')
+        addrTable = np.zeros((nslots,), dtype='i8')
+        numSlots = 0
+        if self.numRows > 0:
+            uuids = self.uuidDset[0:self.numRows]
+            addrs = self.addrDset[0:self.numRows]
+            cols = self.colDset[0:self.numRows]
+            for row in xrange(self.numRows):
+                if cols[row] < 0:
+                    continue  # removed
+                for (table, key) in ((uuidTable, str(uuids[row])), (addrTable, int(addrs[row]))):
+                    slot = self.getSlot(hashKey(key), nslots)
+                    while table[slot] != EMPTY_SLOT:
+                        slot = (slot + 1) & (nslots - 1)
+                    table[slot] = row + 1
+                numSlots += 1
+        for (dset, table) in ((self.uuidHash, uuidTable), (self.addrHash, addrTable)):
+            dset.resize((nslots,))
+            dset[...] = table
+        self.numSlots = numSlots
+        self.grp.attrs["numSlots"] = numSlots
+
+    def addObject(self, col_type, obj_uuid, obj, addr, anonymous=False):
+        row = self.numRows
+        if row >= self.uuidDset.shape[0]:
+            capacity = self.uuidDset.shape[0] * 2
+            for dset in (self.uuidDset, self.addrDset, self.colDset, self.refDset):
+                dset.resize((capacity,))
+        if (self.numSlots + 1) * 2 > self.uuidHash.shape[0]:
+            self.rehash(self.numRows + 1)
+        self.uuidDset[row] = obj_uuid
+        self.addrDset[row] = addr
+        self.colDset[row] = COL_TYPES.index(col_type)
+        if obj is not None:
+            if self.readonly:
+                self.refDset[row] = obj.name
+            else:
+                self.refDset[row] = obj.ref
+        self.insertSlot(self.uuidHash, obj_uuid, row)
+        self.insertSlot(self.addrHash, int(addr), row)
+        self.numRows += 1
+        self.numSlots += 1
+        self.grp.attrs["numRows"] = self.numRows
+        self.grp.attrs["numSlots"] = self.numSlots
+
+    def removeObject(self, col_type, obj_uuid, addr):
+        (uuidSlot, row) = self.findSlot(self.uuidHash, self.uuidDset, obj_uuid)
+        if row < 0:
+            return False
+        (addrSlot, addrRow) = self.findSlot(self.addrHash, self.addrDset, int(addr))
+        self.uuidHash[uuidSlot] = DELETED_SLOT
+        if addrRow == row:
+            self.addrHash[addrSlot] = DELETED_SLOT
+        self.colDset[row] = -1
+        col = self.dbGrp[getColName(col_type)]
+        if obj_uuid in col:
+            del col[obj_uuid]  # remove anonymous link
+        return True
+
+    def setAnonymous(self, col_type, obj_uuid, obj):
+        col = self.dbGrp[getColName(col_type)]
+        col[obj_uuid] = obj   # add a hardlink
+
+    def setLinked(self, col_type, obj_uuid, obj):
+        col = self.dbGrp[getColName(col_type)]
+        if obj_uuid in col:
+            del col[obj_uuid]  # remove hardlink, object ref is in the table
+
+    def getUUIDs(self, col_type):
+        if self.numRows == 0:
+            return []
+        cols = self.colDset[0:self.numRows]
+        uuids = self.uuidDset[0:self.numRows]
+        return [str(obj_uuid) for obj_uuid in uuids[cols == COL_TYPES.index(col_type)]]
+
+    def getCount(self, col_type):
+        if self.numRows == 0:
+            return 0
+        cols = self.colDset[0:self.numRows]
+        return int(np.count_nonzero(cols == COL_TYPES.index(col_type)))
+
+    # positions are table rows, which don't move when objects are added or 
+    # removed
+    def getNumPositions(self, col_type):
+        return self.numRows
+
+    """
+      getUUIDRange - uuids for rows start to stop, with None for the rows 
+        that are not in the given collection (or have been removed)
+    """
+    def getUUIDRange(self, col_type, start, stop):
+        stop = min(stop, self.numRows)
+        if start >= stop:
+            return []
+        cols = self.colDset[start:stop]
+        uuids = self.uuidDset[start:stop]
+        col = COL_TYPES.index(col_type)
+        return [str(uuids[i]) if cols[i] == col else None for i in range(stop - start)]
+
+
+"""
+  IndexCache - in-memory maps of uuid->(col_type, ref) and address->uuid in
+    front of an AttrIndex or TableIndex.  Entries are added as they are looked
+    up (or created) and removed when objects are deleted.  The cache is only
+    valid as long as this process is the only one updating the file, so it
+    must be discarded if the file is modified elsewhere (the pool does this by
+    re-opening the file).
+"""
+class IndexCache:
+    def __init__(self, index, maxEntries=0):
+        self.index = index
+        self.f = index.f
+        self.readonly = index.readonly
+        self.maxEntries = maxEntries  # 0 for no limit
+        self.uuidMap = {}
+        self.addrMap = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def format(self):
+        return self.index.format
+
+    def clear(self):
+        self.uuidMap = {}
+        self.addrMap = {}
+
+    def checkSize(self):
+        if self.maxEntries > 0 and len(self.uuidMap) + len(self.addrMap) > self.maxEntries:
+            self.clear()  # start over rather than track usage of each entry
+
+    def getUUID(self, addr):
+        addr = int(addr)
+        if addr in self.addrMap:
+            self.hits += 1
+            return self.addrMap[addr]
+        self.misses += 1
+        obj_uuid = self.index.getUUID(addr)
+        if obj_uuid is not None:
+            self.checkSize()
+            self.addrMap[addr] = obj_uuid
+        return obj_uuid
+
+    def getEntry(self, obj_uuid):
+        if obj_uuid in self.uuidMap:
+            self.hits += 1
+            return self.uuidMap[obj_uuid]
+        self.misses += 1
+        entry = self.index.getEntry(obj_uuid)
+        if entry is not None:
+            self.checkSize()
+            self.uuidMap[obj_uuid] = entry
+        return entry
+
+    def getObject(self, col_type, obj_uuid):
+        entry = self.getEntry(obj_uuid)
+        if entry is None or entry[0] != col_type:
+            return None
+        return self.f[entry[1]]  # this works for read-only (path) as well
+
+    def getCollectionType(self, obj_uuid):
+        entry = self.getEntry(obj_uuid)
+        if entry is None:
+            return None
+        return entry[0]
+
+    def addObject(self, col_type, obj_uuid, obj, addr, anonymous=False):
+        self.index.addObject(col_type, obj_uuid, obj, addr, anonymous=anonymous)
+        self.checkSize()
+        if self.readonly:
+            self.uuidMap[obj_uuid] = (col_type, obj.name)
+        else:
+            self.uuidMap[obj_uuid] = (col_type, obj.ref)
+        self.addrMap[int(addr)] = obj_uuid
+
+    def removeObject(self, col_type, obj_uuid, addr):
+        self.uuidMap.pop(obj_uuid, None)
+        self.addrMap.pop(int(addr), None)
+        return self.index.removeObject(col_type, obj_uuid, addr)
+
+    def setAnonymous(self, col_type, obj_uuid, obj):
+        self.index.setAnonymous(col_type, obj_uuid, obj)
+
+    def setLinked(self, col_type, obj_uuid, obj):
+        self.index.setLinked(col_type, obj_uuid, obj)
+
+    def getAddresses(self):
+        return self.index.getAddresses()
+
+    def getUUIDs(self, col_type):
+        return self.index.getUUIDs(col_type)
+
+    def getCount(self, col_type):
+        return self.index.getCount(col_type)
+
+    def getNumPositions(self, col_type):
+        return self.index.getNumPositions(col_type)
+
+    def getUUIDRange(self, col_type, start, stop):
+        return self.index.getUUIDRange(col_type, start, stop)
+
+
+def toUnicode(name):
+    if type(name) is str:
+        return name.decode('utf-8')
+    return name
+
+"""
+  LinkTable - reverse link index.  Fixed width datasets in the "{links}" 
+    group: "target" (address of the linked object, 0 for a removed link), 
+    "parent" (address of the group) and "name" (link name) hold one row per
+    hard link.  "hash" is an open addressing hash table on the target 
+    address whose slots hold row+1 (as for TableIndex).  An object can have 
+    several links, so all the slots from the target's slot up to the next 
+    empty slot are checked: finding the links to an object reads a few slots
+    rather than every group in the file.
+"""
+class LinkTable:
+    def __init__(self, dbGrp, log):
+        self.log = log
+        self.grp = dbGrp["{links}"]
+        self.targetDset = self.grp["target"]
+        self.parentDset = self.grp["parent"]
+        self.nameDset = self.grp["name"]
+        self.hashDset = self.grp["hash"]
+        self.numRows = int(self.grp.attrs["numRows"])
+        self.numSlots = int(self.grp.attrs["numSlots"])  # used slots (incl. removed)
+
+    @staticmethod
+    def create(dbGrp, capacity=MIN_CAPACITY):
+        grp = dbGrp.create_group("{links}")
+        chunks = (1024,)
+        grp.create_dataset("target", (capacity,), maxshape=(None,), chunks=chunks, dtype='u8')
+        grp.create_dataset("parent", (capacity,), maxshape=(None,), chunks=chunks, dtype='u8')
+        grp.create_dataset("name", (capacity,), maxshape=(None,), chunks=chunks, 
+            dtype=h5py.special_dtype(vlen=unicode))
+        grp.create_dataset("hash", (MIN_CAPACITY,), maxshape=(None,), chunks=chunks, dtype='i8')
+        grp.attrs["numRows"] = 0
+        grp.attrs["numSlots"] = 0
+
+    """
+      findLinks - return list of (slot, row) for the links to addr
+    """
+    def findLinks(self, addr):
+        result = []
+        nslots = self.hashDset.shape[0]
+        slot = getSlot(hashKey(addr), nslots)
+        for i in xrange(nslots):
+            value = int(self.hashDset[slot])
+            if value == EMPTY_SLOT:
+                break
+            if value != DELETED_SLOT and int(self.targetDset[value - 1]) == addr:
+                result.append((slot, value - 1))
+            slot = (slot + 1) & (nslots - 1)
+        return result
+
+    """
+      getLinks - return list of (parent address, link name) for the links to
+        the object at addr
+    """
+    def getLinks(self, addr):
+        addr = int(addr)
+        return [(int(self.parentDset[row]), self.nameDset[row]) 
+            for (slot, row) in self.findLinks(addr)]
+
+    def getCount(self, addr):
+        return len(self.findLinks(int(addr)))
+
+    """
+      rehash - rebuild the hash table with room for at least numRows links
+        (this also drops removed links)
+    """
+    def rehash(self, numRows):
+        nslots = MIN_CAPACITY
+        while nslots < numRows * 2:
+            nslots *= 2
+        self.log.info("link table rehash, slots: " + str(nslots))
+        table = np.zeros((nslots,), dtype='i8')
+        numSlots = 0
+        if self.numRows > 0:
+            targets = self.targetDset[0:self.numRows]
+            for row in xrange(self.numRows):
+                if targets[row] == 0:
+                    continue  # removed
+                slot = getSlot(hashKey(int(targets[row])), nslots)
+                while table[slot] != EMPTY_SLOT:
+                    slot = (slot + 1) & (nslots - 1)
+                table[slot] = row + 1
+                numSlots += 1
+        self.hashDset.resize((nslots,))
+        self.hashDset[...] = table
+        self.numSlots = numSlots
+        self.grp.attrs["numSlots"] = numSlots
+
+    def addLink(self, addr, parentAddr, name):
+        row = self.numRows
+        if row >= self.targetDset.shape[0]:
+            capacity = self.targetDset.shape[0] * 2
+            for dset in (self.targetDset, self.parentDset, self.nameDset):
+                dset.resize((capacity,))
+        if (self.numSlots + 1) * 2 > self.hashDset.shape[0]:
+            self.rehash(self.numRows + 1)
+        addr = int(addr)
+        self.targetDset[row] = addr
+        self.parentDset[row] = parentAddr
+        self.nameDset[row] = toUnicode(name)
+        nslots = self.hashDset.shape[0]
+        slot = getSlot(hashKey(addr), nslots)
+        while True:
+            value = int(self.hashDset[slot])
+            if value == EMPTY_SLOT or value == DELETED_SLOT:
+                self.hashDset[slot] = row + 1
+                break
+            slot = (slot + 1) & (nslots - 1)
+        self.numRows += 1
+        self.numSlots += 1
+        self.grp.attrs["numRows"] = self.numRows
+        self.grp.attrs["numSlots"] = self.numSlots
+
+    def removeLink(self, addr, parentAddr, name):
+        name = toUnicode(name)
+        for (slot, row) in self.findLinks(int(addr)):
+            if int(self.parentDset[row]) == parentAddr and self.nameDset[row] == name:
+                self.hashDset[slot] = DELETED_SLOT
+                self.targetDset[row] = 0
+                return True
+        return False
+
+    """
+      build - create the link table from a list of (target address, parent
+        address, link name) tuples
+    """
+    @staticmethod
+    def build(dbGrp, links, log):
+        LinkTable.create(dbGrp, capacity=max(len(links), MIN_CAPACITY))
+        table = LinkTable(dbGrp, log)
+        if links:
+            count = len(links)
+            table.targetDset[0:count] = np.array([link[0] for link in links], dtype='u8')
+            table.parentDset[0:count] = np.array([link[1] for link in links], dtype='u8')
+            for (row, link) in enumerate(links):
+                table.nameDset[row] = toUnicode(link[2])
+            table.numRows = count
+            table.grp.attrs["numRows"] = count
+        table.rehash(table.numRows)
+        return table
+
+"""
+  getGroupLinks - return list of (target address, parent address, link name) 
+    for the hard links in the root group and the indexed groups.  The links'
+    info is read without opening the linked objects.
+"""
+def getGroupLinks(f, index):
+    links = []
+    groups = [f['/']]
+    for obj_uuid in index.getUUIDs("groups"):
+        grp = index.getObject("groups", obj_uuid)
+        if grp is not None:
+            groups.append(grp)
+    for grp in groups:
+        parentAddr = h5py.h5o.get_info(grp.id).addr
+        for name in grp:
+            info = grp.id.links.get_info(name)
+            if info.type == h5py.h5l.TYPE_HARD:
+                # for hard links u is the address of the target object
+                links.append((info.u, parentAddr, name))
+    return links
+
+"""
+  openLinkTable - return the LinkTable of the db group, or None if it hasn't
+    been built
+"""
+def openLinkTable(dbGrp, log):
+    if "{links}" in dbGrp:
+        return LinkTable(dbGrp, log)
+    return None
+
+"""
+  buildLinkTable - build the link table for a db group whose index is 
+    complete.  returns - the new table
+"""
+def buildLinkTable(dbGrp, f, index, log):
+    if "{links}" in dbGrp:
+        log.info("link table already built")
+        return LinkTable(dbGrp, log)
+    log.info("building link table")
+    return LinkTable.build(dbGrp, getGroupLinks(f, index), log)
+
+"""
+  openIndex - return index object for an initialized db group
+"""
+def openIndex(dbGrp, f, readonly, log):
+    if "{index}" in dbGrp:
+        return TableIndex(dbGrp, f, readonly, log)
+    return AttrIndex(dbGrp, f, readonly, log)
+
+"""
+  createIndex - create index storage in a new db group and return the index
+"""
+def createIndex(dbGrp, f, readonly, log, indexFormat="table"):
+    if indexFormat == "table":
+        TableIndex.create(dbGrp, readonly)
+    elif indexFormat == "attrs":
+        AttrIndex.create(dbGrp)
+    else:
+        msg = "Unknown index format: " + indexFormat
+        log.error(msg)
+        raise IOError(errno.EINVAL, msg)
+    return openIndex(dbGrp, f, readonly, log)
+
+"""
+  migrateIndex - convert an "attrs" layout index to the "table" layout.
+    returns - the new index
+"""
+def migrateIndex(dbGrp, f, readonly, log):
+    if "{index}" in dbGrp:
+        log.info("index is already in table format")
+        return openIndex(dbGrp, f, readonly, log)
+    addrGrp = dbGrp["{addr}"]
+    uuidAddr = {}
+    for addr in addrGrp.attrs:
+        uuidAddr[addrGrp.attrs[addr]] = int(addr)
+    TableIndex.create(dbGrp, readonly, capacity=max(len(uuidAddr), MIN_CAPACITY))
+    index = TableIndex(dbGrp, f, readonly, log)
+    for col_type in COL_TYPES:
+        col = dbGrp[getColName(col_type)]
+        for obj_uuid in list(col.attrs):
+            obj = f[col.attrs[obj_uuid]]
+            # attribute names are unicode, the index datasets are fixed width
+            index.addObject(col_type, str(obj_uuid), obj, uuidAddr[obj_uuid])
+            del col.attrs[obj_uuid]
+        for obj_uuid in col:
+            # anonymous objects keep their hard link in the collection group
+            index.addObject(col_type, str(obj_uuid), col[obj_uuid], uuidAddr[obj_uuid])
+    del dbGrp["{addr}"]
+    log.info("migrated " + str(index.numRows) + " objects to table index")
+    return index
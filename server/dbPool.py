@@ -0,0 +1,493 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import os
+import os.path as op
+import errno
+import fcntl
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
+
+import config
+from hdf5db import Hdf5db
+
+"""
+ Pool of open Hdf5db instances shared across requests.
+
+ Opening an HDF5 file (and running initFile) for each request is costly, so
+ instances are kept open between requests and handed out by file path.
+ Entries are evicted least recently used first when more than maxOpen files
+ are open, or when they have not been used for idleTimeout seconds.
+
+ An entry is re-opened if the file has been modified on disk by someone other
+ than the pool (i.e. the inode, size or modification time has changed since
+ the entry was last released).  Entries that are in use are never closed;
+ if they are invalidated they will be closed when released.
+ 
+ The pool can be used from multiple threads.  HDF5 is not thread-safe, so
+ getDb holds a per-file lock while the Hdf5db instance is in use: requests
+ for the same file are serialized, requests for different files are not.
+ Lock order is file lock, entry lock, then pool lock (never the reverse).
+ Changes are flushed holding only the entry lock, so a slow flush doesn't
+ block requests for other files on the pool lock.
+ 
+ When multiple server processes share the data files (multiProcess), getDb
+ also locks the file's FileLock: exclusively for requests that update the 
+ file, shared for requests that only read it (so processes can read a file
+ concurrently).  A read can still write to the file if the file hasn't been
+ initialized or fully indexed yet, in which case the exclusive lock is taken
+ instead.  Files are closed when the last request using them releases them
+ (still holding the FileLock): HDF5 writes its (possibly outdated) view of 
+ the file's size when a read-write file is closed, so a file kept open 
+ while another process modified it would be corrupted on close.  HDF5's own
+ file locking is disabled in this mode so processes can read a file at the
+ same time.  The lock file also holds a counter that is incremented each 
+ time a process has modified the file (see Hdf5db.dirty), and an Hdf5db is 
+ re-opened if the counter has changed since it was last used, so no stale 
+ HDF5 metadata is used.
+"""
+
+def getFileStat(filePath):
+    st = os.stat(filePath)
+    return (st.st_ino, st.st_dev, st.st_size, st.st_mtime)
+
+
+"""
+ FileLock - inter-process lock (flock) for a data file, using the file 
+   ".<filename>.lock" in the same directory.  The lock file holds a 
+   modification counter (see above).
+"""
+class FileLock:
+    def __init__(self, filePath):
+        dirname = op.dirname(filePath)
+        basename = op.basename(filePath)
+        self.lockPath = op.join(dirname, '.' + basename + '.lock')
+        self.fd = None
+        
+    """
+      acquire - wait for the lock, shared or exclusive.  Returns the 
+            modification counter.  The counter can only be set while holding
+            the exclusive lock.
+    """
+    def acquire(self, shared=False):
+        self.fd = os.open(self.lockPath, os.O_RDWR | os.O_CREAT, 0644)
+        try:
+            if shared:
+                fcntl.flock(self.fd, fcntl.LOCK_SH)
+            else:
+                fcntl.flock(self.fd, fcntl.LOCK_EX)
+            os.lseek(self.fd, 0, os.SEEK_SET)
+            data = os.read(self.fd, 32).strip()
+        except:
+            os.close(self.fd)
+            self.fd = None
+            raise
+        if not data:
+            return 0
+        return int(data)
+        
+    def setCount(self, count):
+        os.lseek(self.fd, 0, os.SEEK_SET)
+        os.ftruncate(self.fd, 0)
+        os.write(self.fd, str(count))
+        
+    def release(self):
+        if self.fd is None:
+            return
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self.fd)
+            self.fd = None
+
+
+class PoolEntry:
+    def __init__(self, db, fileStat):
+        self.db = db
+        self.fileStat = fileStat
+        self.lastUsed = time.time()
+        self.refCount = 0
+        self.stale = False   # set when the entry should be closed on release
+        self.lock = threading.RLock()  # held while the db is in use
+        self.lockCount = None  # FileLock count after our last use (multiProcess)
+
+
+class DbPool:
+    def __init__(self, maxOpen=16, idleTimeout=300, lazyIndex=False, indexFormat="table",
+            indexCacheSize=0, multiProcess=False, chunkCache=None, datasetCacheSize=0,
+            pathCacheSize=0, app_logger=None):
+        if app_logger:
+            self.log = app_logger
+        else:
+            self.log = logging.getLogger()
+        self.maxOpen = maxOpen
+        self.idleTimeout = idleTimeout
+        self.lazyIndex = lazyIndex
+        self.indexFormat = indexFormat
+        self.indexCacheSize = indexCacheSize
+        self.multiProcess = multiProcess
+        self.chunkCache = chunkCache  # default chunk cache settings for files
+        self.datasetCacheSize = datasetCacheSize
+        self.pathCacheSize = pathCacheSize
+        self.entries = OrderedDict()   # least recently used first
+        self.lock = threading.RLock()  # protects entries and refCounts
+        # db.isUpdateFree() as of the last use of each file, kept after the
+        # file is closed
+        self.updateFree = {}
+        if multiProcess and 'HDF5_USE_FILE_LOCKING' not in os.environ:
+            # HDF5 (1.10+) locks a file for as long as it is open, which 
+            # would keep other processes out of pooled files.  Access is 
+            # serialized with FileLock instead.
+            os.environ['HDF5_USE_FILE_LOCKING'] = 'FALSE'
+
+    def getKey(self, filePath):
+        return op.normpath(op.abspath(filePath))
+
+    """
+      getChunkCacheSettings - return chunk cache settings for the file: the 
+            pool defaults updated with any settings in the domain's settings 
+            file (.<basename>.json in the same directory as the file), e.g.:
+            {"chunk_cache": {"size": 67108864, "slots": 10007, "w0": 0.75,
+                "datasets": {"/g1/dset": {"size": 268435456}}}}
+    """
+    def getChunkCacheSettings(self, filePath):
+        settings = {}
+        if self.chunkCache:
+            settings.update(self.chunkCache)
+        settingsPath = op.join(op.dirname(filePath), '.' + op.basename(filePath) + '.json')
+        if op.isfile(settingsPath):
+            try:
+                with open(settingsPath) as f:
+                    domainSettings = json.load(f)
+                settings.update(domainSettings.get('chunk_cache', {}))
+            except (IOError, ValueError, AttributeError) as e:
+                self.log.warning("dbPool: ignoring invalid settings file: " + settingsPath + 
+                    " " + str(e))
+        return settings
+
+    """
+      acquire - return PoolEntry for the given file, opening the file if
+            necessary
+    """
+    def acquire(self, filePath, app_logger=None, lockCount=None):
+        with self.lock:
+            return self.acquireEntry(filePath, app_logger, lockCount)
+        
+    def acquireEntry(self, filePath, app_logger, lockCount):
+        key = self.getKey(filePath)
+        fileStat = getFileStat(filePath)   # raises OSError if file is gone
+        entry = None
+        if key in self.entries:
+            entry = self.entries.pop(key)
+            changed = entry.fileStat != fileStat
+            if lockCount is not None and entry.lockCount != lockCount:
+                changed = True  # used by another process
+            if entry.refCount == 0 and changed:
+                # file was changed (or replaced) outside of this pool
+                self.log.info("dbPool: file changed on disk, reopening: " + filePath)
+                self.closeEntry(entry)
+                entry = None
+        if entry is None:
+            self.log.info("dbPool: opening " + filePath)
+            db = Hdf5db(filePath, app_logger=app_logger, lazyIndex=self.lazyIndex,
+                indexFormat=self.indexFormat, indexCacheSize=self.indexCacheSize,
+                chunkCache=self.getChunkCacheSettings(filePath), 
+                datasetCacheSize=self.datasetCacheSize, pathCacheSize=self.pathCacheSize)
+            # opening the file (read-write) can change its modification time
+            entry = PoolEntry(db, getFileStat(filePath))
+        elif app_logger:
+            entry.db.log = app_logger
+
+        self.entries[key] = entry  # (re)insert as most recently used
+        entry.refCount += 1
+        entry.lastUsed = time.time()
+        self.evict()
+        return entry
+
+    """
+      flushEntry - write changes out so the file on disk is consistent, and
+            remember the stat values so that our own use of the file is not 
+            seen as an external modification (HDF5 can touch the file even 
+            if the db wasn't modified).  Called with the entry lock (but not 
+            the pool lock) held, so other files can be used while flushing.
+    """
+    def flushEntry(self, filePath, entry):
+        if entry.stale:
+            return
+        if entry.db.dirty:
+            entry.db.flush()
+        # the entry isn't reopened while refCount > 0, so no pool lock needed
+        entry.fileStat = getFileStat(filePath)
+
+    """
+      updateEntry - update the entry's multiProcess state after use, and 
+            bump the FileLock counter if the db was modified
+    """
+    def updateEntry(self, filePath, entry, fileLock, lockCount, shared):
+        dirty = entry.db.dirty
+        entry.db.dirty = False
+        if fileLock is not None:
+            if dirty and shared:
+                self.log.warning("dbPool: db modified by a read: " + filePath)
+            elif dirty:
+                # let other processes know the file has changed
+                lockCount += 1
+                fileLock.setCount(lockCount)
+            entry.lockCount = lockCount
+        if not entry.stale:
+            updateFree = entry.db.dbGrp is not None and entry.db.isIndexComplete()
+            with self.lock:
+                self.updateFree[self.getKey(filePath)] = updateFree
+
+    """
+      release - return entry to the pool
+    """
+    def release(self, filePath, entry):
+        with self.lock:
+            self.releaseEntry(filePath, entry)
+            
+    def releaseEntry(self, filePath, entry):
+        entry.refCount -= 1
+        entry.lastUsed = time.time()
+        if entry.stale:
+            if entry.refCount == 0:
+                self.closeEntry(entry)
+            return
+        if self.multiProcess and entry.refCount == 0:
+            # close while the file is locked, see above
+            del self.entries[self.getKey(filePath)]
+            self.closeEntry(entry)
+            return
+        self.evict()
+
+    """
+      lockFile - lock the file for use by this process (multiProcess only).
+            Returns (FileLock, counter), or (None, None) if the file isn't 
+            to be locked.
+    """
+    def lockFile(self, filePath, shared):
+        if not self.multiProcess:
+            return (None, None)
+        fileLock = FileLock(filePath)
+        try:
+            lockCount = fileLock.acquire(shared)
+        except (OSError, IOError) as e:
+            if e.errno not in (errno.EACCES, errno.EROFS, errno.EPERM):
+                raise
+            # can't create lock file in a read-only directory, the data
+            # file can't be modified either
+            self.log.warning("dbPool: unable to lock: " + filePath)
+            return (None, None)
+        return (fileLock, lockCount)
+        
+    """
+      isUpdateFree - returns True if the pooled db for the file was
+            initialized and indexed as of its last use, so a read can be done
+            with a shared lock.
+    """
+    def isUpdateFree(self, filePath):
+        with self.lock:
+            return self.updateFree.get(self.getKey(filePath), False)
+        
+    """
+      lockEntry - lock the file and acquire its pool entry.  Returns 
+            (FileLock, counter, shared, entry) with the entry lock held.
+    """
+    def lockEntry(self, filePath, app_logger, update):
+        shared = self.multiProcess and not update and self.isUpdateFree(filePath)
+        while True:
+            (fileLock, lockCount) = self.lockFile(filePath, shared)
+            if fileLock is None:
+                shared = False
+            try:
+                entry = self.acquire(filePath, app_logger, lockCount)
+            except:
+                if fileLock is not None:
+                    fileLock.release()
+                raise
+            entry.lock.acquire()  # one thread at a time for each file
+            if not shared or entry.db.isUpdateFree():
+                return (fileLock, lockCount, shared, entry)
+            # e.g. the file was replaced: the read may need to write
+            entry.lock.release()
+            self.release(filePath, entry)
+            fileLock.release()
+            shared = False
+
+    """
+      getDb - context manager for the pooled Hdf5db for the file
+        update - False if the db will only be read (allows other processes
+            to read the file at the same time)
+    """
+    @contextmanager
+    def getDb(self, filePath, app_logger=None, update=True):
+        (fileLock, lockCount, shared, entry) = self.lockEntry(filePath, app_logger, update)
+        try:
+            try:
+                yield entry.db
+            finally:
+                try:
+                    self.flushEntry(filePath, entry)
+                    self.updateEntry(filePath, entry, fileLock, lockCount, shared)
+                finally:
+                    try:
+                        self.release(filePath, entry)
+                    finally:
+                        entry.lock.release()
+        finally:
+            if fileLock is not None:
+                fileLock.release()
+
+    """
+      invalidate - remove entry for the file from the pool (e.g. when the
+            domain is deleted)
+    """
+    def invalidate(self, filePath):
+        with self.lock:
+            key = self.getKey(filePath)
+            self.updateFree.pop(key, None)
+            if key not in self.entries:
+                return
+            entry = self.entries.pop(key)
+            self.log.info("dbPool: invalidate " + filePath)
+            if entry.refCount > 0:
+                entry.stale = True  # close on release
+            else:
+                self.closeEntry(entry)
+
+    def closeEntry(self, entry):
+        try:
+            self.log.info("dbPool: cache stats: " + str(entry.db.getCacheStats()))
+            entry.db.close()
+        except (IOError, ValueError) as e:
+            # file may have been removed from underneath us
+            self.log.warning("dbPool: error closing db: " + str(e))
+
+    """
+      evict - close least recently used entries above the max open limit and
+            any entries that have been idle longer than idleTimeout
+    """
+    def evict(self):
+        with self.lock:
+            now = time.time()
+            numOpen = len(self.entries)
+            for key in list(self.entries.keys()):
+                entry = self.entries[key]
+                if entry.refCount > 0:
+                    continue
+                expired = self.idleTimeout > 0 and now - entry.lastUsed > self.idleTimeout
+                if numOpen > self.maxOpen or expired:
+                    del self.entries[key]
+                    self.log.info("dbPool: closing " + key)
+                    self.closeEntry(entry)
+                    numOpen -= 1
+
+    """
+      indexStep - add up to maxItems objects to the UUID index of an open 
+            file that was indexed lazily.  Intended to be called periodically
+            so indexes get completed in the background.
+            
+       returns - True if there is more indexing to be done
+    """
+    def indexStep(self, maxItems=1000):
+        with self.lock:
+            keys = []
+            for key in list(self.entries.keys()):
+                entry = self.entries[key]
+                if entry.refCount > 0 or entry.stale:
+                    continue
+                # don't read the file here, indexComplete is None if it
+                # hasn't been checked yet (completeIndex will check it)
+                if entry.db.dbGrp is None or entry.db.indexComplete:
+                    continue
+                keys.append(key)
+        for key in keys:
+            with self.getDb(key) as db:
+                complete = db.completeIndex(maxItems)
+            if not complete:
+                return True  # one batch per call so the file isn't held for long
+        return False
+        
+    def closeAll(self):
+        with self.lock:
+            for key in list(self.entries.keys()):
+                entry = self.entries.pop(key)
+                if entry.refCount > 0:
+                    entry.stale = True
+                else:
+                    self.closeEntry(entry)
+
+    """
+      getCacheStats - return dictionary of cache statistics (see 
+            Hdf5db.getCacheStats) for each open file.  Files are only open
+            while in use in multiProcess mode, so there are no statistics
+            for them (the statistics are logged when a file is closed).
+    """
+    def getCacheStats(self):
+        if self.multiProcess:
+            return {}  # the entries can't be released without the FileLock
+        with self.lock:
+            entries = [(key, entry) for (key, entry) in self.entries.items() 
+                if not entry.stale]
+            for (key, entry) in entries:
+                entry.refCount += 1  # keep the file open
+        stats = {}
+        for (key, entry) in entries:
+            try:
+                with entry.lock:
+                    stats[key] = entry.db.getCacheStats()
+            finally:
+                self.release(key, entry)
+        return stats
+        
+    """
+      logCacheStats - log the cache statistics of each open file.  Intended
+            to be called periodically.
+    """
+    def logCacheStats(self):
+        for (key, stats) in self.getCacheStats().items():
+            self.log.info("dbPool: cache stats: " + key + " " + str(stats))
+
+    def getNumOpen(self):
+        return len(self.entries)
+
+
+_pool = None
+
+def getPool():
+    global _pool
+    if _pool is None:
+        _pool = DbPool(maxOpen=int(config.get('db_pool_size')),
+            idleTimeout=int(config.get('db_pool_timeout')),
+            lazyIndex=config.getBool('lazy_index'),
+            indexFormat=config.get('index_format'),
+            indexCacheSize=int(config.get('index_cache_size')),
+            multiProcess=int(config.get('num_processes')) != 1,
+            chunkCache={'size': int(config.get('chunk_cache_size')),
+                'slots': int(config.get('chunk_cache_slots')),
+                'w0': float(config.get('chunk_cache_w0'))},
+            datasetCacheSize=int(config.get('dataset_cache_size')),
+            pathCacheSize=int(config.get('path_cache_size')),
+            app_logger=logging.getLogger("h5serv"))
+    return _pool
+
+"""
+ getDb - return context manager yielding a (pooled) Hdf5db instance for the
+    given file.  Use as: "with getDb(filePath) as db:"  Pass update=False if
+    the db will only be read.
+"""
+def getDb(filePath, app_logger=None, update=True):
+    return getPool().getDb(filePath, app_logger=app_logger, update=update)
+
@@ -0,0 +1,151 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+from collections import deque
+
+import hdf5dtype
+
+"""
+ DomainExport - JSON representation of the objects of a domain, in the form:
+   {"root": <uuid>, "groups": {<uuid>: {...}, ...}, "datasets": {...}, 
+    "datatypes": {...}}
+ 
+ The get methods return the item for one object (used by util/h5tojson.py).
+ For the server's streamed export, groups are visited breadth first from the
+ root group (optionally to a maximum depth) a few at a time with nextGroups, 
+ and the datasets and datatypes linked from the visited groups are exported
+ after the groups.  Only the uuids of objects still to be exported are kept 
+ between steps, so the db need not stay in use for the whole export.
+"""
+
+class DomainExport:
+    def __init__(self, attributeValues=True, datasetValues=True, maxDepth=None):
+        self.attributeValues = attributeValues
+        self.datasetValues = datasetValues
+        self.maxDepth = maxDepth   # None for no limit
+        self.rootUuid = None
+        self.groupQueue = deque()  # (uuid, depth) of groups to be visited
+        self.visited = set()       # uuids of objects that have been queued
+        self.datasets = deque()    # uuids of datasets to export
+        self.datatypes = deque()   # uuids of datatypes to export
+        
+    """
+      start - queue the root group, returns the root uuid
+    """
+    def start(self, db):
+        self.rootUuid = db.getUUIDByPath('/')
+        self.groupQueue.append((self.rootUuid, 0))
+        self.visited.add(self.rootUuid)
+        return self.rootUuid
+        
+    def getAttributes(self, db, col_name, uuid):
+        items = []
+        for attr in db.getAttributeItems(col_name, uuid, includeData=self.attributeValues):
+            item = { 'name': attr['name'] }
+            item['type'] = hdf5dtype.getTypeResponse(attr['type'])
+            item['shape'] = attr['shape']
+            if 'value' in attr:
+                item['value'] = attr['value']
+            items.append(item)
+        return items
+        
+    def getLinks(self, db, uuid):
+        items = []
+        for item in db.getLinkItems(uuid):
+            for key in ('ctime', 'mtime', 'href'):
+                if key in item:
+                    del item[key]
+            items.append(item)
+        return items
+        
+    def getGroup(self, db, uuid):
+        item = db.getGroupItemByUuid(uuid)
+        for key in ('ctime', 'mtime', 'linkCount', 'attributeCount', 'id'):
+            if key in item:
+                del item[key]
+        attributes = self.getAttributes(db, 'groups', uuid)
+        if attributes:
+            item['attributes'] = attributes
+        links = self.getLinks(db, uuid)
+        if links:
+            item['links'] = links
+        return item
+        
+    """
+      getDataset - returns the dataset item, with the value if datasetValues 
+            is set and includeValue is True (the server streams large values
+            separately)
+    """
+    def getDataset(self, db, uuid, includeValue=True):
+        response = { }
+        item = db.getDatasetItemByUuid(uuid)
+        response['alias'] = item['alias']
+        typeItem = item['type']
+        response['type'] = hdf5dtype.getTypeResponse(typeItem)
+        shapeItem = item['shape']
+        response['shape'] = shapeItem
+        if 'dims' in shapeItem and 'maxdims' in shapeItem:
+            extensible = False
+            dims = shapeItem['dims']
+            maxdims = shapeItem['maxdims']
+            for i in range(len(dims)):
+                if dims[i] < maxdims[i]:
+                    extensible = True
+                    break
+            # dump the fill value
+            if extensible and 'fillvalue' in item:
+                response['fillvalue'] = item['fillvalue']
+        
+        attributes = self.getAttributes(db, 'datasets', uuid)
+        if attributes:
+            response['attributes'] = attributes
+        if self.datasetValues and includeValue:
+            response['value'] = db.getDatasetValuesByUuid(uuid)
+        return response
+        
+    def getDatatype(self, db, uuid):
+        response = { }
+        item = db.getCommittedTypeItemByUuid(uuid)
+        response['alias'] = item['alias']
+        typeItem = item['type']
+        response['type'] = hdf5dtype.getTypeResponse(typeItem)
+        attributes = self.getAttributes(db, 'datatypes', uuid)
+        if attributes:
+            response['attributes'] = attributes
+        return response
+        
+    """
+      nextGroups - visit up to maxCount queued groups, returns list of 
+            (uuid, item).  Groups, datasets, and datatypes hard linked from 
+            the visited groups are queued.
+    """
+    def nextGroups(self, db, maxCount):
+        groups = []
+        while self.groupQueue and len(groups) < maxCount:
+            (uuid, depth) = self.groupQueue.popleft()
+            item = self.getGroup(db, uuid)
+            groups.append((uuid, item))
+            for link in item.get('links', ()):
+                if link['class'] != 'H5L_TYPE_HARD' or link['uuid'] in self.visited:
+                    continue
+                collection = link.get('collection')
+                if collection == 'groups':
+                    if self.maxDepth is not None and depth >= self.maxDepth:
+                        continue
+                    self.groupQueue.append((link['uuid'], depth + 1))
+                elif collection == 'datasets':
+                    self.datasets.append(link['uuid'])
+                elif collection == 'datatypes':
+                    self.datatypes.append(link['uuid'])
+                else:
+                    continue
+                self.visited.add(link['uuid'])
+        return groups
@@ -47,7 +47,22 @@ This class is used to manage UUID lookup tables for primary HDF objects (Groups,
     description: contains map of file offset to UUID.
     members: none
     attrs: map of file offset to UUID
-        
+    
+ The attributes described above are the "attrs" index layout.  Files created
+ with the "table" layout (the default) instead keep the UUID, address and
+ reference maps in datasets of the "{index}" group, and only use the collection
+ groups for the hard links to anonymous objects.  See dbIndex.py.
+ 
+"{links}"
+    description: reverse link index - the hard links to each object from the 
+        root group and the indexed groups (see dbIndex.LinkTable).  Added the 
+        first time an object is deleted or unlinked.
+        
+ Objects are assigned UUIDs either all at once when the file is first opened,
+ or (with lazyIndex) as they are reached through links or paths.  In the
+ latter case the "indexComplete" attribute of the db group is False until
+ completeIndex() has visited every object in the file.  completeIndex can be
+ called repeatedly with a budget of objects, and picks up where it left off.
     
     
  
@@ -62,20 +77,17 @@ import uuid
 import os.path as op
 import os
 import logging
+from collections import OrderedDict, deque
 
 import hdf5dtype
+from dbIndex import openIndex, createIndex, IndexCache, openLinkTable, buildLinkTable
+from timeStamps import openTimeStamps, createTimeStamps
+from cursorUtil import getNameKey, encodeCursor, decodeCursor
 
 
-# global dictionary to direct back to the Hdf5db instance by filename
-# (needed for visititems callback)
-# Will break in multi-threaded context
-_db = { }
-
 UUID_LEN = 36  # length for uuid strings
-
-def visitObj(path, obj):   
-    hdf5db = _db[obj.file.filename]
-    hdf5db.visit(path, obj)
+INDEX_BATCH_ROWS = 1024  # rows of the uuid index read at a time when paging
+READ_BLOCK_BYTES = 16 * 1024 * 1024  # max bytes read at a time by readDatasetSelection
     
     
 class Hdf5db:
@@ -91,7 +103,9 @@ class Hdf5db:
             
            
         
-    def __init__(self, filePath, readonly=False, app_logger=None):
+    def __init__(self, filePath, readonly=False, app_logger=None, lazyIndex=False,
+            indexFormat="table", indexCacheSize=0, chunkCache=None, datasetCacheSize=0,
+            pathCacheSize=0):
         if app_logger:
             self.log = app_logger
         else:
@@ -107,7 +121,13 @@ class Hdf5db:
                 self.readonly = True
         self.log.info("init -- filePath: " + filePath + " mode: " + mode)
         
-        self.f = h5py.File(filePath, mode)
+        # chunk cache settings: 'size' (bytes), 'slots', 'w0', and optionally 
+        # 'datasets' - dictionary of settings for datasets by uuid or path
+        self.chunkCache = chunkCache
+        if chunkCache:
+            self.f = self.openFileWithChunkCache(filePath, mode, chunkCache)
+        else:
+            self.f = h5py.File(filePath, mode)
         
         if self.readonly:
             # for read-only files, add a dot in front of the name to be used as the 
@@ -126,9 +146,31 @@ class Hdf5db:
             self.dbf = h5py.File(dbFilePath, dbMode)
         else:
             self.dbf = None # for read only
-        # create a global reference to this class
-        # so visitObj can call back
-        _db[filePath] = self 
+        self.dbGrp = None  # set by initFile
+        self.index = None  # set by initFile
+        self.timeStamps = None  # set by initFile
+        self.indexFormat = indexFormat  # layout used for newly initialized files
+        self.indexCacheSize = indexCacheSize  # max cached index entries, 0 for no limit
+        self.lazyIndex = lazyIndex
+        self.indexComplete = None  # cached value of dbGrp "indexComplete" attribute
+        self.indexedAddrs = None   # set of indexed addresses used by completeIndex
+        self.indexBudget = 0
+        self.linkIndex = None      # reverse link index (LinkTable), see getLinkIndex
+        self.rootAddr = None       # address of the root group, see getRootAddress
+        self.dirty = False         # set when the file (or db file) is modified
+        # datasets are kept open (most recently used last) so their chunk 
+        # caches are kept between requests
+        self.datasetCacheSize = datasetCacheSize
+        self.openDatasets = OrderedDict()
+        self.datasetCacheHits = 0
+        self.datasetCacheMisses = 0
+        # resolved h5paths (most recently used last), cleared when links change
+        self.pathCacheSize = pathCacheSize
+        self.pathCache = OrderedDict()
+        self.pathCacheHits = 0
+        self.pathCacheMisses = 0
+        # number of times each object was modified through this instance
+        self.modifyCounts = {}
         
     
     def __enter__(self):
@@ -137,13 +179,63 @@ class Hdf5db:
 
     def __exit__(self, type, value, traceback):
         self.log.info('Hdf5db __exit')
-        filename = self.f.filename
+        self.close()
+        
+    """
+      flush - write any pending changes to the data file (and db file for
+            read-only files)
+    """
+    def flush(self):
         self.f.flush()
-        self.f.close()
         if self.dbf:
             self.dbf.flush()
+            
+    """
+      openFileWithChunkCache - return h5py File opened with the given raw data 
+            chunk cache settings as the default for its datasets
+    """
+    def openFileWithChunkCache(self, filePath, mode, chunkCache):
+        fapl = h5py.h5p.create(h5py.h5p.FILE_ACCESS)
+        fapl.set_fclose_degree(h5py.h5f.CLOSE_STRONG)  # same as h5py.File
+        (mdcNelmts, nslots, nbytes, w0) = fapl.get_cache()
+        fapl.set_cache(mdcNelmts, int(chunkCache.get('slots', nslots)), 
+            int(chunkCache.get('size', nbytes)), float(chunkCache.get('w0', w0)))
+        if mode == 'r':
+            flags = h5py.h5f.ACC_RDONLY
+        else:
+            flags = h5py.h5f.ACC_RDWR
+        fid = h5py.h5f.open(filePath, flags, fapl=fapl)
+        return h5py.File(fid)
+        
+    """
+      getCacheStats - return dictionary of cache statistics for the file.  
+            HDF5 doesn't report raw data chunk cache hits, so these are not 
+            available.  datasetHits counts reads using a dataset that was 
+            kept open (so any chunks cached by earlier reads could be reused),
+            and datasetReuseRatio is the fraction of reads that did.
+    """
+    def getCacheStats(self):
+        stats = {}
+        stats['datasetHits'] = self.datasetCacheHits
+        stats['datasetMisses'] = self.datasetCacheMisses
+        total = self.datasetCacheHits + self.datasetCacheMisses
+        if total > 0:
+            stats['datasetReuseRatio'] = float(self.datasetCacheHits) / total
+        stats['pathHits'] = self.pathCacheHits
+        stats['pathMisses'] = self.pathCacheMisses
+        stats['metadataHitRate'] = self.f.id.get_mdc_hit_rate()
+        return stats
+            
+    """
+      close - flush and close the data file (and db file for read-only files)
+    """
+    def close(self):
+        self.openDatasets.clear()
+        self.pathCache.clear()
+        self.flush()
+        self.f.close()
+        if self.dbf:
             self.dbf.close()
-        del _db[filename]
         
         
     def getTimeStampName(self, uuid, objType="object", name=None):
@@ -180,13 +272,10 @@ class Hdf5db:
        Note - should only be called once per object
     """    
     def setCreateTime(self, uuid, objType="object", name=None, timestamp=None):
-        ctime_grp = self.dbGrp["{ctime}"]
         ts_name = self.getTimeStampName(uuid, objType, name) 
         if timestamp == None:
             timestamp = time.time()
-        if ts_name in ctime_grp.attrs:
-            self.log.warn("modifying create time for object: " + ts_name)
-        ctime_grp.attrs.create(ts_name, timestamp, dtype='int64')
+        self.timeStamps.setCreateTime(ts_name, timestamp)
     
     """
       getCreateTime - gets the create time timestamp for the
@@ -199,16 +288,7 @@ class Hdf5db:
        returns - create time for object, or create time for root if not set 
     """    
     def getCreateTime(self, uuid, objType="object", name=None, useRoot=True):
-        ctime_grp = self.dbGrp["{ctime}"]
-        ts_name = self.getTimeStampName(uuid, objType, name) 
-        timestamp = None
-        if ts_name in ctime_grp.attrs:
-            timestamp = ctime_grp.attrs[ts_name]
-        elif useRoot:
-            # return root timestamp
-            root_uuid = self.dbGrp.attrs["rootUUID"] 
-            timestamp = ctime_grp.attrs[root_uuid]
-        return timestamp
+        return self.getTimeStamps(uuid, objType, [name], useRoot)[0][0]
      
     """
       setModifiedTime - sets the modified time timestamp for the
@@ -222,11 +302,31 @@ class Hdf5db:
        
     """         
     def setModifiedTime(self, uuid, objType="object", name=None, timestamp=None):
-        mtime_grp = self.dbGrp["{mtime}"]
         ts_name = self.getTimeStampName(uuid, objType, name) 
         if timestamp == None:
             timestamp = time.time()
-        mtime_grp.attrs.create(ts_name, timestamp, dtype='int64')
+        self.timeStamps.setModifiedTime(ts_name, timestamp)
+        if objType == "object":
+            self.modifyCounts[uuid] = self.modifyCounts.get(uuid, 0) + 1
+        
+    """
+      getModifyCount - number of times the object was modified through this
+            instance.  Timestamps have a resolution of one second, this can 
+            be used to tell if an object was modified in the meantime.
+    """
+    def getModifyCount(self, uuid):
+        return self.modifyCounts.get(uuid, 0)
+        
+    """
+      setDeleteTime - sets the modified time timestamp for a deleted
+            object, link, or attribute.  The timestamp is kept (until
+            compacted) so that the item can be reported as deleted.
+    """
+    def setDeleteTime(self, uuid, objType="object", name=None, timestamp=None):
+        ts_name = self.getTimeStampName(uuid, objType, name) 
+        if timestamp == None:
+            timestamp = time.time()
+        self.timeStamps.setDeleted(ts_name, timestamp)
      
     """
       getModifiedTime - gets the modified time timestamp for the
@@ -239,94 +339,293 @@ class Hdf5db:
        returns - create time for object, or create time for root if not set 
     """     
     def getModifiedTime(self, uuid, objType="object", name=None, useRoot=True):
-        mtime_grp = self.dbGrp["{mtime}"]
-        ts_name = self.getTimeStampName(uuid, objType, name) 
-        timestamp = None
-        if ts_name in mtime_grp.attrs:
-            timestamp = mtime_grp.attrs[ts_name]
-        else:
-            # return create time if no modified time has been set
-            ctime_grp = self.dbGrp["{ctime}"]
-            if ts_name in ctime_grp.attrs:
-                timestamp = ctime_grp.attrs[ts_name]
-            elif useRoot:
-                # return root timestamp
-                root_uuid = self.dbGrp.attrs["rootUUID"] 
-                timestamp = mtime_grp.attrs[root_uuid]
-        return timestamp
+        return self.getTimeStamps(uuid, objType, [name], useRoot)[0][1]
+        
+    """
+      getFileModifiedTime - return the last modification time of the data 
+            file, or of the db file for read-only files if that is later 
+            (e.g. objects added to the index).
+    """
+    def getFileModifiedTime(self):
+        mtime = op.getmtime(self.f.filename)
+        if self.dbf:
+            mtime = max(mtime, op.getmtime(self.dbf.filename))
+        return mtime
+        
+    """
+      getObjectModifiedTime - return the modified time of the given object.
+            Raises IOError ENXIO if the object is not found, or EIDRM if it 
+            has been deleted.  Objects that have not been modified since the
+            file was initialized have no timestamp, the file modification 
+            time is returned for these.
+    """
+    def getObjectModifiedTime(self, col_type, obj_uuid):
+        self.initFile()
+        mtime = self.getModifiedTime(obj_uuid, useRoot=False)
+        if self.getObjectByUuid(col_type, obj_uuid) is None:
+            if mtime:
+                msg = "Object with uuid: " + obj_uuid + " has been previously deleted"
+                self.log.info(msg)
+                raise IOError(errno.EIDRM, msg)
+            msg = "Object with uuid: " + obj_uuid + " was not found"
+            self.log.info(msg)
+            raise IOError(errno.ENXIO, msg)
+        if mtime is None:
+            mtime = self.getFileModifiedTime()
+        return mtime
+        
+    """
+      getTimeStamps - get the create and modified timestamps for a list of
+            links or attributes of an object (or the object itself) with one
+            lookup.
+        names - list of link or attribute names (ignored for objects)
+       
+       returns - list of (ctime, mtime) tuples.  The modified time defaults
+            to the create time, and either defaults to the root group's value
+            if useRoot is true (otherwise None).
+    """
+    def getTimeStamps(self, uuid, objType="object", names=None, useRoot=True):
+        if names is None:
+            names = [None]
+        keys = [self.getTimeStampName(uuid, objType, name) for name in names]
+        times = self.timeStamps.getTimes(keys)
+        result = []
+        rootTimes = None
+        for (ctime, mtime) in times:
+            if mtime is None:
+                # return create time if no modified time has been set
+                mtime = ctime
+            if ctime is None and useRoot:
+                if rootTimes is None:
+                    root_uuid = self.dbGrp.attrs["rootUUID"] 
+                    rootTimes = self.timeStamps.getTimes([root_uuid])[0]
+                ctime = rootTimes[0]
+                if mtime is None:
+                    mtime = rootTimes[1]
+            result.append((ctime, mtime))
+        return result
         
     def initFile(self):
         # self.log.info("initFile")
+        if self.dbGrp is not None:
+            return  # already initialized by this instance
+        initialized = False
         if self.readonly:
             self.dbGrp = self.dbf
             if "{groups}" in self.dbf:
                 # file already initialized
-                return
-            
+                initialized = True
         else:
             if "__db__" in self.f:
                 # file already initialized
                 self.dbGrp = self.f["__db__"]
-                return;  # already initialized 
-            self.dbGrp = self.f.create_group("__db__")
+                initialized = True
+            else:
+                self.dbGrp = self.f.create_group("__db__")
+                
+        if initialized:
+            self.index = IndexCache(openIndex(self.dbGrp, self.f, self.readonly, self.log),
+                self.indexCacheSize)
+            self.timeStamps = openTimeStamps(self.dbGrp, self.log)
+            self.linkIndex = openLinkTable(self.dbGrp, self.log)
+            if not self.lazyIndex and not self.isIndexComplete():
+                # finish indexing started by an earlier (lazy) session
+                self.completeIndex()
+            return
            
         self.log.info("initializing file") 
+        self.dirty = True
         root_uuid = str(uuid.uuid1())
         self.dbGrp.attrs["rootUUID"] = root_uuid
+        self.dbGrp.attrs["indexComplete"] = False
+        self.indexComplete = False
         self.dbGrp.create_group("{groups}")
         self.dbGrp.create_group("{datasets}")
         self.dbGrp.create_group("{datatypes}")
-        self.dbGrp.create_group("{addr}") # store object address
-        self.dbGrp.create_group("{ctime}") # stores create timestamps
-        self.dbGrp.create_group("{mtime}") # store modified timestamps
+        self.index = IndexCache(createIndex(self.dbGrp, self.f, self.readonly, self.log,
+            self.indexFormat), self.indexCacheSize)
+        self.timeStamps = createTimeStamps(self.dbGrp, self.log)
         
         mtime = op.getmtime(self.f.filename)
         ctime = mtime
         self.setCreateTime(root_uuid, timestamp=ctime)
         self.setModifiedTime(root_uuid, timestamp=mtime)
+        
+        if not self.lazyIndex:
+            self.completeIndex()
+            
+    """
+      isUpdateFree - returns True if the file has been initialized and indexed,
+            so that requests that don't update the file won't write to it 
+            either (e.g. to add objects to the index).  Doesn't modify the file.
+    """
+    def isUpdateFree(self):
+        if self.dbGrp is not None:
+            return self.isIndexComplete()
+        if self.readonly:
+            if "{groups}" not in self.dbf:
+                return False
+            dbGrp = self.dbf
+        else:
+            if "__db__" not in self.f:
+                return False
+            dbGrp = self.f["__db__"]
+        if "indexComplete" in dbGrp.attrs:
+            return bool(dbGrp.attrs["indexComplete"])
+        return True
             
-        self.f.visititems(visitObj)
+    """
+      isIndexComplete - returns True if every object in the file has been
+            assigned a UUID.
+    """
+    def isIndexComplete(self):
+        self.initFile()
+        if self.indexComplete is None:
+            if "indexComplete" in self.dbGrp.attrs:
+                self.indexComplete = bool(self.dbGrp.attrs["indexComplete"])
+            else:
+                # file was initialized with a full scan
+                self.indexComplete = True
+        return self.indexComplete
         
-    def visit(self, path, obj):
-        name = obj.__class__.__name__
+    """
+      completeIndex - assign UUIDs to any objects in the file that don't 
+            have one yet.
+        maxItems - if greater than 0, stop after this many objects have
+            been added to the index
+       
+       returns - True if the index is complete
+    """
+    def completeIndex(self, maxItems=0):
+        self.initFile()
+        if self.isIndexComplete():
+            return True
+        self.log.info("completeIndex, maxItems: " + str(maxItems))
+        if self.indexedAddrs is None:
+            self.indexedAddrs = self.index.getAddresses()
+        self.indexBudget = maxItems
+        stopped = h5py.h5o.visit(self.f['/'].id, self.indexVisitor, info=True)
+        if stopped:
+            return False  # budget used up, call again to resume
+        self.dbGrp.attrs["indexComplete"] = True
+        self.dirty = True
+        self.indexComplete = True
+        self.indexedAddrs = None
+        self.log.info("index complete")
+        return True
+        
+    """
+      indexVisitor - h5o.visit callback used by completeIndex.  Returns True
+            to stop the iteration when the budget of objects is used up.
+    """
+    def indexVisitor(self, path, info):
         if len(path) >= 6 and path[:6] == '__db__':
-            return  # don't include the db objects
-        self.log.info('visit: ' + path +' name: ' + name)
-        col = None 
+            return None  # don't include the db objects
+        if info.addr in self.indexedAddrs:
+            return None  # already indexed
+        obj = self.f[path]
+        self.indexObject(obj, info.addr)
+        if self.indexBudget > 0:
+            self.indexBudget -= 1
+            if self.indexBudget == 0:
+                return True
+        return None
+        
+    """
+      indexObject - assign a UUID to an object that is not yet in the index
+        obj - Group, Dataset, or Datatype object
+        addr - object address (will be looked up if not provided)
+        
+       returns - UUID of the object
+    """
+    def indexObject(self, obj, addr=None):
+        name = obj.__class__.__name__
+        self.log.info('indexObject: ' + obj.name +' name: ' + name)
+        col_type = None 
         if name == 'Group':
-            col = self.dbGrp["{groups}"].attrs
+            col_type = "groups"
         elif name == 'Dataset':
-            col = self.dbGrp["{datasets}"].attrs
+            col_type = "datasets"
         elif name == 'Datatype':
-            col = self.dbGrp["{datatypes}"].attrs
+            col_type = "datatypes"
         else:
             msg = "Unknown object type: " + __name__ + " found during scan of HDF5 file"
             self.log.error(msg)
             raise IOError(errno.EIO, msg)
         uuid1 = uuid.uuid1()  # create uuid
         id = str(uuid1)
-        addrGrp = self.dbGrp["{addr}"]
-        if not self.readonly:
-            # storing db in the file itself, so we can link to the object directly
-            col[id] = obj.ref  # save attribute ref to object
-        else:
-            #store path to object
-            col[id] = obj.name
+        if addr is None:
+            addr = h5py.h5o.get_info(obj.id).addr
+        self.index.addObject(col_type, id, obj, addr)
+        self.dirty = True
+        if self.indexedAddrs is not None:
+            self.indexedAddrs.add(addr)
+        return id
+        
+    """
+      getUUIDByObj - get UUID for the given object, adding it to the index
+            if needed.
+    """
+    def getUUIDByObj(self, obj):
         addr = h5py.h5o.get_info(obj.id).addr
-        # store reverse map as an attribute
-        addrGrp.attrs[str(addr)] = id       
+        if addr == self.getRootAddress():
+            # the root group isn't in the index (e.g. reached by a back link)
+            return self.dbGrp.attrs["rootUUID"]
+        obj_uuid = self.getUUIDByAddress(addr)
+        if obj_uuid is None and not self.isIndexComplete():
+            # not reached yet - index it now
+            obj_uuid = self.indexObject(obj, addr)
+        return obj_uuid
         
     def getUUIDByAddress(self, addr):
-        if "{addr}" not in self.dbGrp:
-            self.log.error("expected to find {addr} group") 
-            return None
-        addrGrp = self.dbGrp["{addr}"]
-        obj_uuid = None
-        if str(addr) in addrGrp.attrs:
-            obj_uuid = addrGrp.attrs[str(addr)] 
-        return obj_uuid
+        return self.index.getUUID(addr)
+        
+    def getRootAddress(self):
+        if self.rootAddr is None:
+            self.rootAddr = h5py.h5o.get_info(self.f['/'].id).addr
+        return self.rootAddr
     
         
+    """
+      getLinkIndex - return the reverse link index: a LinkTable of the hard 
+            links to each object from the root group and the indexed groups.
+            The table is stored in the db group.  It is built by scanning 
+            every group the first time it is needed (or by migrateindex), 
+            and is then kept up to date as links are added and removed.
+    """
+    def getLinkIndex(self):
+        self.initFile()
+        if self.linkIndex is None:
+            self.completeIndex()  # need all the groups
+            self.linkIndex = buildLinkTable(self.dbGrp, self.f, self.index, self.log)
+            self.dirty = True
+        return self.linkIndex
+                
+    """
+      removeLinkFromIndex - update the reverse link index (if built) before 
+            the given link is deleted from the parent group
+    """
+    def removeLinkFromIndex(self, parentGrp, link_name):
+        if self.linkIndex is None:
+            return
+        info = parentGrp.id.links.get_info(link_name)
+        if info.type != h5py.h5l.TYPE_HARD:
+            return
+        parentAddr = h5py.h5o.get_info(parentGrp.id).addr
+        self.linkIndex.removeLink(info.u, parentAddr, link_name)
+            
+    """
+      getGroupByAddress - return the root group or indexed group at the 
+            given address
+    """
+    def getGroupByAddress(self, addr):
+        if addr == self.getRootAddress():
+            return self.f['/']
+        grpUuid = self.getUUIDByAddress(addr)
+        if grpUuid is None:
+            return None
+        return self.index.getObject("groups", grpUuid)
+        
     """
      Get the number of links in a group to an object
     """
@@ -351,30 +650,8 @@ class Hdf5db:
      Get the number of links to the given object
     """
     def getNumLinksToObject(self, obj):
-        self.initFile()
-        groups = self.dbGrp["{groups}"]
-        numLinks = 0
-        # iterate through each group in the file and unlink tgt if it is linked
-        # by the group
-        for uuidName in groups:
-            # iterate through anonymous groups
-            grp = groups[uuidName]
-            nLinks = self.getNumLinksToObjectInGroup(grp, obj)
-            if nLinks > 0:
-                numLinks += nLinks
-        for uuidName in groups.attrs:
-            # now non anonymous groups
-            grpRef = groups.attrs[uuidName]
-            grp = self.f[grpRef]  # dereference
-            nLinks = self.getNumLinksToObjectInGroup(grp, obj)
-            if nLinks > 0:
-                numLinks += nLinks
-        # finally, check the root group
-        root = self.getObjByPath("/")
-        nLinks = self.getNumLinksToObjectInGroup(root, obj)
-        numLinks += nLinks
-            
-        return numLinks   
+        addr = h5py.h5o.get_info(obj.id).addr
+        return self.getLinkIndex().getCount(addr)
         
     def getUUIDByPath(self, path):
         self.initFile()
@@ -388,10 +665,63 @@ class Hdf5db:
             return self.dbGrp.attrs["rootUUID"]
             
         obj = self.f[path]  # will throw KeyError if object doesn't exist
-        addr = h5py.h5o.get_info(obj.id).addr
-        obj_uuid = self.getUUIDByAddress(addr)
+        obj_uuid = self.getUUIDByObj(obj)
         return obj_uuid
                      
+    """
+      getObjectItemByPath - resolve an h5path (following any soft links) and 
+            return a dictionary with the 'id' and 'collection' of the object.
+            Resolved paths are cached (up to pathCacheSize entries) until a 
+            link in the file is created or removed.
+    """
+    def getObjectItemByPath(self, h5path):
+        self.initFile()
+        self.log.info("getObjectItemByPath: [" + h5path + "]")
+        if not h5path.startswith('/'):
+            msg = "h5path: [" + h5path + "] must be an absolute path"
+            self.log.info(msg)
+            raise IOError(errno.EBADMSG, msg)
+        if h5path in self.pathCache:
+            item = self.pathCache.pop(h5path)
+            self.pathCache[h5path] = item  # most recently used
+            self.pathCacheHits += 1
+            return item.copy()
+        
+        names = [name for name in h5path.split('/') if name]
+        if len(names) == 0:
+            item = {'id': self.dbGrp.attrs["rootUUID"], 'collection': 'groups'}
+        else:
+            if names[0] == '__db__':
+                obj = None  # don't include the db objects
+            else:
+                try:
+                    obj = self.f['/' + '/'.join(names)]
+                except KeyError:
+                    obj = None
+            if obj is None:
+                msg = "Object with h5path: [" + h5path + "] not found"
+                self.log.info(msg)
+                raise IOError(errno.ENXIO, msg)
+            if obj.file.filename != self.f.filename:
+                msg = "h5path: [" + h5path + "] resolves to an external file"
+                self.log.info(msg)
+                raise IOError(errno.ENXIO, msg)
+            class_name = obj.__class__.__name__
+            if class_name == 'Group':
+                collection = 'groups'
+            elif class_name == 'Dataset':
+                collection = 'datasets'
+            else:
+                collection = 'datatypes'
+            item = {'id': self.getUUIDByObj(obj), 'collection': collection}
+            
+        if self.pathCacheSize > 0:
+            self.pathCacheMisses += 1
+            self.pathCache[h5path] = item
+            if len(self.pathCache) > self.pathCacheSize:
+                self.pathCache.popitem(last=False)
+        return item.copy()
+                     
     def getObjByPath(self, path):
         if len(path) >= 6 and path[:6] == '__db__':
             return None # don't include the db objects
@@ -408,16 +738,7 @@ class Hdf5db:
         if col_type == "groups" and obj_uuid == self.dbGrp.attrs["rootUUID"]:
             return self.f['/']  # returns root group
             
-        obj = None  # Group, Dataset, or Datatype
-        col_name = '{' + col_type + '}'
-        # get the collection group for this collection type
-        col = self.dbGrp[col_name]
-        if obj_uuid in col.attrs:
-            ref = col.attrs[obj_uuid]
-            obj = self.f[ref]  # this works for read-only as well
-        elif obj_uuid in col: 
-            # anonymous object
-            obj = col[obj_uuid]
+        obj = self.index.getObject(col_type, obj_uuid)  # Group, Dataset, or Datatype
                 
         return obj
         
@@ -425,10 +746,54 @@ class Hdf5db:
         self.initFile()
         self.log.info("getDatasetObjByUuid(" + obj_uuid + ")")
         
-        obj = self.getObjectByUuid("datasets", obj_uuid)
+        if obj_uuid in self.openDatasets:
+            obj = self.openDatasets.pop(obj_uuid)
+            self.openDatasets[obj_uuid] = obj  # most recently used
+            self.datasetCacheHits += 1
+            return obj
+        
+        obj = None
+        if self.datasetCacheSize > 0:
+            obj = self.openDatasetWithChunkCache(obj_uuid)
+        if obj is None:
+            obj = self.getObjectByUuid("datasets", obj_uuid)
+        if obj is not None and self.datasetCacheSize > 0:
+            self.datasetCacheMisses += 1
+            self.openDatasets[obj_uuid] = obj
+            if len(self.openDatasets) > self.datasetCacheSize:
+                self.openDatasets.popitem(last=False)  # closed when no longer used
                                  
         return obj
         
+    """
+      openDatasetWithChunkCache - return the dataset opened with its own 
+            chunk cache settings if any are configured for it, otherwise 
+            return None.  HDF5 sets up the chunk cache when a dataset is 
+            first opened (opening it again returns the same dataset), so 
+            the dataset is opened by path rather than through the index.
+    """
+    def openDatasetWithChunkCache(self, obj_uuid):
+        if not self.chunkCache or not self.chunkCache.get('datasets'):
+            return None
+        entry = self.index.getEntry(obj_uuid)
+        if entry is None or entry[0] != "datasets":
+            return None
+        ref = entry[1]
+        if isinstance(ref, h5py.Reference):
+            path = h5py.h5r.get_name(ref, self.f.id)  # doesn't open the dataset
+        else:
+            path = ref  # read-only files index paths
+        dsetSettings = self.chunkCache['datasets']
+        settings = dsetSettings.get(obj_uuid, dsetSettings.get(path))
+        if not settings:
+            return None
+        dapl = h5py.h5p.create(h5py.h5p.DATASET_ACCESS)
+        (nslots, nbytes, w0) = dapl.get_chunk_cache()
+        dapl.set_chunk_cache(int(settings.get('slots', nslots)), 
+            int(settings.get('size', nbytes)), float(settings.get('w0', w0)))
+        dsid = h5py.h5d.open(self.f.id, path, dapl=dapl)
+        return h5py.Dataset(dsid)
+        
     def getGroupObjByUuid(self, obj_uuid):
         self.initFile()
         self.log.info("getGroupObjByUuid(" + obj_uuid + ")")
@@ -514,9 +879,7 @@ class Hdf5db:
         typeid = h5py.h5d.DatasetID.get_type(dset.id)
         typeItem = None
         if h5py.h5t.TypeID.committed(typeid):
-            type_uuid = None
-            addr = h5py.h5o.get_info(typeid).addr
-            type_uuid = self.getUUIDByAddress(addr)
+            type_uuid = self.getUUIDByObj(h5py.Datatype(typeid))
             committedType = self.getCommittedTypeItemByUuid(type_uuid)
             typeItem = committedType['type']
             typeItem['uuid'] = type_uuid
@@ -538,6 +901,8 @@ class Hdf5db:
                 # exception is thrown if fill value is not set
                 pass   # nop
             
+        item['creationProperties'] = self.getCreationPropertiesItem(dset)
+            
         item['ctime'] = self.getCreateTime(obj_uuid)
         item['mtime'] = self.getModifiedTime(obj_uuid)      
         
@@ -575,6 +940,7 @@ class Hdf5db:
             msg = "Can't create committed type (updates are not allowed)"
             self.log.info(msg)
             raise IOError(errno.EPERM, msg)
+        self.dirty = True
         datatypes = self.dbGrp["{datatypes}"]
         obj_uuid = str(uuid.uuid1())
         dt = self.createTypeFromItem(datatype)
@@ -586,10 +952,9 @@ class Hdf5db:
             self.log.error(msg)
             raise IOError(errno.EIO, msg)
         newType = datatypes[obj_uuid] # this will be a h5py Datatype class 
-        # store reverse map as an attribute
+        # add to the index (the type is anonymous until linked)
         addr = h5py.h5o.get_info(newType.id).addr
-        addrGrp = self.dbGrp["{addr}"]
-        addrGrp.attrs[str(addr)] = obj_uuid
+        self.index.addObject("datatypes", obj_uuid, newType, addr, anonymous=True)
         # set timestamp
         now = time.time()
         self.setCreateTime(obj_uuid, timestamp=now)
@@ -603,15 +968,8 @@ class Hdf5db:
     def getCommittedTypeObjByUuid(self, obj_uuid):
         self.log.info("getCommittedTypeObjByUuid(" + obj_uuid + ")")
         self.initFile()
-        datatype = None
-        datatypesGrp = self.dbGrp["{datatypes}"]
-        if obj_uuid in datatypesGrp.attrs:
-            typeRef = datatypesGrp.attrs[obj_uuid]
-            # typeRef could be a reference or (for read-only) a path
-            datatype = self.f[typeRef]
-        elif obj_uuid in datatypesGrp:
-            datatype = datatypesGrp[obj_uuid]  # non-linked type
-        else:
+        datatype = self.index.getObject("datatypes", obj_uuid)
+        if datatype is None:
             msg = "Committed datatype: " + obj_uuid + " not found"
             self.log.info(msg)
      
@@ -649,10 +1007,11 @@ class Hdf5db:
         return item
        
     """
-      Get attribute given an object and name
+      Get attribute given an object and name.  If maxDataSize is set, the 
+      value is only included if the attribute's data is at most that many bytes.
       returns: JSON object 
     """ 
-    def getAttributeItemByObj(self, obj, name, includeData=True):
+    def getAttributeItemByObj(self, obj, name, includeData=True, maxDataSize=0):
         if name not in obj.attrs:
             msg = "Attribute: [" + name + "] not found in object: " + obj.name
             self.log.info(msg)
@@ -668,9 +1027,7 @@ class Hdf5db:
         typeid = attrObj.get_type()
         typeItem = None
         if h5py.h5t.TypeID.committed(typeid):
-            type_uuid = None
-            addr = h5py.h5o.get_info(typeid).addr
-            type_uuid = self.getUUIDByAddress(addr)
+            type_uuid = self.getUUIDByObj(h5py.Datatype(typeid))
             committedType = self.getCommittedTypeItemByUuid(type_uuid)
             typeItem = committedType['type']
             typeItem['uuid'] = type_uuid
@@ -687,6 +1044,16 @@ class Hdf5db:
                 attr = obj.attrs[name]  # returns a numpy array
             except TypeError:
                 self.log.warning("type error reading attribute") 
+        if includeData and maxDataSize > 0 and attr is not None:
+            if isinstance(typeid, h5py.h5t.TypeVlenID) or (
+                    isinstance(typeid, h5py.h5t.TypeStringID) and typeid.is_variable_str()):
+                # only the vlen descriptors are in the attribute's storage
+                dataSize = self.getVlenDataSize(attr, len(attrObj.shape) == 0)
+            else:
+                dataSize = attrObj.get_storage_size()
+            if dataSize > maxDataSize:
+                self.log.info("value of attribute: [" + name + "] exceeds max size, not included")
+                includeData = False
         item['shape'] = self.getShapeItemByAttrObj(attrObj)
         if includeData and attr is not None:
             if typeItem['class'] == 'H5T_VLEN':
@@ -702,7 +1069,37 @@ class Hdf5db:
         # timestamps will be added by getAttributeItem()
         return item
             
-    def getAttributeItems(self, col_type, obj_uuid, marker=None, limit=0):
+    """
+      getVlenDataSize - return the number of bytes of variable length data 
+            (strings or sequences) in an attribute value.  Variable length 
+            members of compound types are not counted.
+    """
+    def getVlenDataSize(self, value, isScalar):
+        if isScalar:
+            elements = [value]
+        else:
+            elements = value.flat
+        dataSize = 0
+        for element in elements:
+            if type(element) is unicode:
+                dataSize += len(element.encode('utf-8'))
+            elif type(element) is str:
+                dataSize += len(element)
+            else:
+                dataSize += np.asarray(element).nbytes
+        return dataSize
+            
+    def getAttributeItems(self, col_type, obj_uuid, marker=None, limit=0, includeData=False,
+            maxDataSize=0):
+        return self.getAttributeItemsPage(col_type, obj_uuid, marker=marker, limit=limit,
+            includeData=includeData, maxDataSize=maxDataSize)[0]
+        
+    """
+      getAttributeItemsPage - returns (items, cursor) where cursor can be 
+            used to get the next page of items (None if there are no more).
+    """
+    def getAttributeItemsPage(self, col_type, obj_uuid, cursor=None, marker=None, limit=0,
+            includeData=False, maxDataSize=0):
         self.log.info("db.getAttributeItems(" + obj_uuid + ")")
         if marker:
             self.log.info("...marker: " + marker)
@@ -716,28 +1113,92 @@ class Hdf5db:
             self.log.info(msg)
             raise IOError(errno.ENXIO, msg)
             
+        def getNames(start, stop):
+            names = []
+            def visitor(name, *args):
+                names.append(self.decodeName(name))
+                if len(names) == stop - start:
+                    return True  # stop iteration
+                return None
+            h5py.h5a.iterate(obj.id, visitor, index=start)
+            return names
+            
+        (names, nextCursor) = self.getPage(getNames, len(obj.attrs), cursor=cursor,
+            marker=marker, limit=limit)
         items = []
-        gotMarker = True
-        if marker != None:
-            gotMarker = False
-        count = 0
-        for name in obj.attrs:
-            if not gotMarker:
-                if name == marker:
-                    gotMarker = True
-                    continue  # start filling in result on next pass
-                else:
-                    continue  # keep going!
-            item = self.getAttributeItemByObj(obj, name, False)
+        times = self.getTimeStamps(obj_uuid, objType="attribute", names=names)
+        for (name, (ctime, mtime)) in zip(names, times):
+            item = self.getAttributeItemByObj(obj, name, includeData, maxDataSize)
             # mix-in timestamps
-            item['ctime'] = self.getCreateTime(obj_uuid, objType="attribute", name=name)
-            item['mtime'] = self.getModifiedTime(obj_uuid, objType="attribute", name=name)
+            item['ctime'] = ctime
+            item['mtime'] = mtime
                            
             items.append(item)
-            count += 1
-            if limit > 0 and count == limit:
-                break  # return what we got
-        return items
+        return (items, nextCursor)
+        
+    """
+      decodeName - link and attribute names are returned by the low-level 
+            iterate functions as utf-8 encoded strings
+    """
+    def decodeName(self, name):
+        try:
+            return name.decode('utf-8')
+        except UnicodeDecodeError:
+            return name
+        
+    """
+      getPage - return (names, cursor) with up to limit names from an ordered
+            listing and a cursor for the next page (None if there are no more
+            names).
+        getNames - function(start, stop) that returns the names at positions
+            start to stop, with None for positions to be skipped
+        count - number of positions in the listing
+        cursor - cursor returned with the previous page.  Reading resumes at
+            the position in the cursor if the name before it still matches,
+            otherwise (e.g. items have been removed) the listing is scanned 
+            for the name.
+        marker - name of the last item of the previous page (if no cursor)
+        batchSize - positions requested from getNames at a time (default is
+            limit)
+    """
+    def getPage(self, getNames, count, cursor=None, marker=None, limit=0, batchSize=0):
+        start = 0
+        if cursor:
+            (pos, marker) = decodeCursor(cursor)
+            if pos <= count:
+                names = getNames(pos - 1, pos)
+                if len(names) == 1 and names[0] is not None and \
+                        getNameKey(names[0]) == marker:
+                    start = pos
+                    marker = None  # position is valid
+        elif marker is not None:
+            marker = getNameKey(marker)
+        if batchSize <= 0:
+            batchSize = limit
+        names = []
+        pos = start
+        while pos < count and (limit <= 0 or len(names) < limit):
+            if batchSize > 0:
+                batch = getNames(pos, min(pos + batchSize, count))
+            else:
+                batch = getNames(pos, count)
+            if len(batch) == 0:
+                break
+            for name in batch:
+                pos += 1
+                if name is None:
+                    continue
+                if marker is not None:
+                    if getNameKey(name) == marker:
+                        marker = None  # start with the next name
+                    continue 
+                names.append(name)
+                if len(names) == limit:
+                    break  # return what we got
+        nextCursor = None
+        if limit > 0 and len(names) == limit and pos < count:
+            nextCursor = encodeCursor(pos, names[-1])
+        return (names, nextCursor)
             
     def getAttributeItem(self, col_type, obj_uuid, name):
         self.log.info("getAttributeItemByUuid(" + col_type + ", " + obj_uuid + ", " + 
@@ -772,6 +1233,7 @@ class Hdf5db:
             msg = "Unable to create attribute (updates are not allowed)"
             self.log.info(msg)
             raise IOError(errno.EPERM, msg)
+        self.dirty = True
         obj = self.getObjectByUuid(col_name, obj_uuid)
         
         dt = None
@@ -804,6 +1266,7 @@ class Hdf5db:
             msg = "Unable to delete attribute (updates are not allowed)"
             self.log.info(msg)
             raise IOError(errno.EPERM, msg)
+        self.dirty = True
         obj = self.getObjectByUuid(col_name, obj_uuid)
         
         if attr_name not in obj.attrs:
@@ -813,7 +1276,8 @@ class Hdf5db:
         
         del obj.attrs[attr_name]
         now = time.time()
-        self.setModifiedTime(obj_uuid, objType="attribute", name=attr_name, timestamp=now)
+        self.setDeleteTime(obj_uuid, objType="attribute", name=attr_name, timestamp=now)
+        self.setModifiedTime(obj_uuid, timestamp=now)  # owner entity is modified
         
         return True
         
@@ -851,7 +1315,7 @@ class Hdf5db:
         item = {}
         objid = h5py.h5r.dereference(regionRef, self.f.file.file.id)
         if objid:
-            item['id'] = self.getUUIDByAddress(h5py.h5o.get_info(objid).addr)
+            item['id'] = self.getUUIDByObj(self.f[regionRef])
             
         sel = h5py.h5r.get_region(regionRef, objid)  
         select_type = sel.get_select_type()
@@ -882,8 +1346,7 @@ class Hdf5db:
         if type(data) is h5py.h5r.Reference:
             if bool(data):
                 grpref = self.f[data]
-                addr = h5py.h5o.get_info(grpref.id).addr
-                uuid = self.getUUIDByAddress(addr)
+                uuid = self.getUUIDByObj(grpref)
                 if self.getGroupObjByUuid(uuid):
                     out = "/groups/" + uuid
                 elif self.getDatasetObjByUuid(uuid):
@@ -958,9 +1421,37 @@ class Hdf5db:
             values = "????"
         else:
             # just use tolist to dump
-            values = dset[slices].tolist()
+            values = self.readDatasetSelection(dset, slices).tolist()
         return values 
         
+    """
+    Get values from dataset identified by obj_uuid as a little-endian numpy 
+    array (for binary transfers).  Only supported for fixed size types.
+    Returns None for datasets with a null dataspace.
+    """
+    def getDatasetArrayByUuid(self, obj_uuid, slices=Ellipsis):
+        dset = self.getDatasetObjByUuid(obj_uuid)
+        if dset == None:
+            msg = "Dataset: " + obj_uuid + " not found"
+            self.log.info(msg)
+            raise IOError(errno.ENXIO, msg)
+        if not hdf5dtype.isFixedSizeType(dset.dtype):
+            msg = "Binary transfer is not supported for the type of dataset: " + obj_uuid
+            self.log.info(msg)
+            raise IOError(errno.EBADMSG, msg)
+        if len(dset.shape) == 0:
+            # check for null dataspace
+            try:
+                val = dset[...]
+            except IOError:
+                # assume null dataspace, return none
+                return None
+        arr = np.asarray(self.readDatasetSelection(dset, slices))
+        dt = hdf5dtype.getLittleEndianType(arr.dtype)
+        if arr.dtype != dt or not arr.flags['C_CONTIGUOUS']:
+            arr = arr.astype(dt, order='C')  # returns a new array
+        return arr
+        
     """
     Get values from dataset identified by obj_uuid using the given
     point selection.
@@ -971,27 +1462,86 @@ class Hdf5db:
             msg = "Dataset: " + obj_uuid + " not found"
             self.log.info(msg)
             raise IOError(errno.ENXIO, msg)
-        rank = len(dset.shape)
         values = np.zeros(len(points), dtype=dset.dtype)
+        if len(points) == 0:
+            return values.tolist()
+        # read all the points with one element selection, values are 
+        # returned in the order the points are given
+        fspace = self.getPointSelection(dset, points)
+        mspace = h5py.h5s.create_simple((len(points),))
+        mtype = h5py.h5t.py_create(dset.dtype)
+        dset.id.read(mspace, fspace, values, mtype)
+        return values.tolist()
+        
+    """
+    Write values to the dataset identified by obj_uuid using the given
+    point selection.  All the points are written with one element selection.
+    """
+    def setDatasetPointSelectionByUuid(self, obj_uuid, points, data):
+        if self.readonly:
+            msg = "Unable to write dataset (Updates are not allowed)"
+            self.log.info(msg)
+            raise IOError(errno.EPERM, msg)
+        self.dirty = True
+        dset = self.getDatasetObjByUuid(obj_uuid)
+        if dset == None:
+            msg = "Dataset: " + obj_uuid + " not found"
+            self.log.info(msg)
+            raise IOError(errno.ENXIO, msg)
+        if type(data) not in (list, tuple) or len(data) != len(points):
+            msg = "Number of values should match the number of points"
+            self.log.info(msg)
+            raise IOError(errno.EBADMSG, msg)
+        if len(points) > 0:
+            dt = dset.dtype
+            if len(dt) > 1:
+                # compound values need to be tuples
+                data = [tuple(value) for value in data]
+            try:
+                values = np.asarray(data, dtype=dt)
+            except (ValueError, TypeError):
+                msg = "Unable to convert values to dataset type"
+                self.log.info(msg)
+                raise IOError(errno.EBADMSG, msg)
+            fspace = self.getPointSelection(dset, points)
+            mspace = h5py.h5s.create_simple((len(points),))
+            mtype = h5py.h5t.py_create(dt)
+            dset.id.write(mspace, fspace, values.reshape((len(points),)), mtype)
+        
+        # update modified time
+        self.setModifiedTime(obj_uuid)
+        return True
+        
+    """
+    Get dataspace of the dataset with the given points selected.  Points is 
+    a list of ints (datasets of rank 1) or a list of coordinate lists.
+    """
+    def getPointSelection(self, dset, points):
+        rank = len(dset.shape)
         try:
-            i = 0
-            for point in points:
-                # need to convert to strings so result can be JSON serializable
-                #values.append(dset[[point]].tolist())
-                if rank == 1:
-                    values[i] = dset[[point]]
-                else:
-                    values[i] = dset[tuple(point)]
-                i += 1
-        except ValueError:
+            coords = np.asarray(points, dtype='i8')
+        except (ValueError, TypeError):
+            msg = "Invalid point selection"
+            self.log.info(msg)
+            raise IOError(errno.EBADMSG, msg)
+        if rank == 1 and len(coords.shape) == 1:
+            coords = coords.reshape((len(points), 1))
+        if len(coords.shape) != 2 or coords.shape[1] != rank:
+            msg = "Invalid point selection, points should have " + str(rank) + " coordinates"
+            self.log.info(msg)
+            raise IOError(errno.EBADMSG, msg)
+        if (coords < 0).any() or (coords >= np.asarray(dset.shape)).any():
             # out of range error
             msg = "getDatasetPointSelection, out of range error"
             self.log.info(msg)
             raise IOError(errno.EBADMSG, msg)
-        return values.tolist()
+        fspace = dset.id.get_space()
+        fspace.select_elements(coords.astype('u8'))
+        return fspace
                  
         
     def setDatasetValuesByUuid(self, obj_uuid, data, slices=None):
+        self.dirty = True
         dset = self.getDatasetObjByUuid(obj_uuid)
         if dset == None:
             msg = "Dataset: " + obj_uuid + " not found"
@@ -1020,16 +1570,252 @@ class Hdf5db:
         self.setModifiedTime(obj_uuid)
         return True
     
+    """
+    Get the shape of the selection given by slices (a tuple of slice
+    objects, one per dimension, or Ellipsis for the entire dataset)
+    """
+    def getSelectionShape(self, dset, slices):
+        if slices is Ellipsis:
+            return dset.shape
+        shape = []
+        for dim in range(len(slices)):
+            (start, stop, step) = slices[dim].indices(dset.shape[dim])
+            shape.append(len(xrange(start, stop, step)))
+        return tuple(shape)
+        
+    """
+    readDatasetSelection - return numpy array of dset[slices].  For strided
+    selections on chunked datasets, whole chunks covering the selection are
+    read (and decompressed) once and the stride is applied in numpy.  Each 
+    dimension with a step smaller than the chunk extent is read densely; 
+    dimensions with larger steps only touch one element per chunk anyway, so
+    HDF5 applies those strides.  Reads are done in blocks of chunk-aligned 
+    rows of at most READ_BLOCK_BYTES.
+    """
+    def readDatasetSelection(self, dset, slices):
+        if slices is Ellipsis or dset.chunks is None:
+            return dset[slices]
+        if dset.dtype.kind == 'O' or dset.dtype.subdtype is not None:
+            return dset[slices]  # vlen, reference, or array types
+        rank = len(dset.shape)
+        ranges = []
+        useDense = False
+        for dim in range(rank):
+            if type(slices[dim]) is not slice:
+                return dset[slices]
+            (start, stop, step) = slices[dim].indices(dset.shape[dim])
+            if step < 1:
+                return dset[slices]
+            if step > 1 and step < dset.chunks[dim]:
+                useDense = True
+            ranges.append((start, stop, step))
+        shape = self.getSelectionShape(dset, slices)
+        if not useDense or 0 in shape:
+            return dset[slices]   # nothing to gain
+            
+        # per dimension, the slice to read and the stride to apply to what's read
+        readSlices = []
+        localSlices = []
+        for dim in range(rank):
+            (start, stop, step) = ranges[dim]
+            last = start + (shape[dim] - 1) * step
+            if step < dset.chunks[dim]:
+                readSlices.append(slice(start, last + 1))
+                localSlices.append(slice(None, None, step))
+            else:
+                readSlices.append(slice(start, last + 1, step))
+                localSlices.append(slice(None))
+        rowBytes = dset.dtype.itemsize
+        for dim in range(1, rank):
+            rowBytes *= len(xrange(*readSlices[dim].indices(dset.shape[dim])))
+        maxRows = max(1, READ_BLOCK_BYTES // max(rowBytes, 1))
+        
+        values = np.empty(shape, dtype=dset.dtype)
+        buf = None
+        (start, stop, step) = ranges[0]
+        dense = localSlices[0].step is not None
+        if dense:
+            # block boundaries are multiples of the chunk extent so each chunk
+            # is read in one block
+            chunkRows = dset.chunks[0]
+            blockRows = max(1, maxRows // chunkRows) * chunkRows
+            last = readSlices[0].stop - 1
+        row = 0   # first row of values for the block
+        while row < shape[0]:
+            first = start + row * step   # first selected row of the dataset
+            if dense:
+                blockEnd = min((first // blockRows + 1) * blockRows, last + 1)
+                count = len(xrange(first, blockEnd, step))
+                readSlices[0] = slice(first, blockEnd)
+            else:
+                count = min(maxRows, shape[0] - row)
+                readSlices[0] = slice(first, first + (count - 1) * step + 1, step)
+            readShape = []
+            for dim in range(rank):
+                readShape.append(len(xrange(*readSlices[dim].indices(dset.shape[dim]))))
+            readShape = tuple(readShape)
+            if buf is None or buf.shape != readShape:
+                buf = np.empty(readShape, dtype=dset.dtype)
+            dset.read_direct(buf, source_sel=tuple(readSlices))
+            values[row:row + count] = buf[tuple(localSlices)]
+            row += count
+        return values
+        
+    """
+    Write a buffer of little-endian values (e.g. a binary request body) to
+    the dataset identified by obj_uuid.  The buffer must hold exactly the 
+    number of elements in the selection.  Only supported for fixed size types.
+    """
+    def setDatasetBinaryValuesByUuid(self, obj_uuid, data, slices=Ellipsis):
+        if self.readonly:
+            msg = "Unable to write dataset (Updates are not allowed)"
+            self.log.info(msg)
+            raise IOError(errno.EPERM, msg)
+        self.dirty = True
+        dset = self.getDatasetObjByUuid(obj_uuid)
+        if dset == None:
+            msg = "Dataset: " + obj_uuid + " not found"
+            self.log.info(msg)
+            raise IOError(errno.ENXIO, msg)
+        if not hdf5dtype.isFixedSizeType(dset.dtype):
+            msg = "Binary transfer is not supported for the type of dataset: " + obj_uuid
+            self.log.info(msg)
+            raise IOError(errno.EBADMSG, msg)
+        shape = self.getSelectionShape(dset, slices)
+        dt = hdf5dtype.getLittleEndianType(dset.dtype)
+        nelements = 1
+        for extent in shape:
+            nelements *= extent
+        if len(data) != nelements * dt.itemsize:
+            msg = "Expected " + str(nelements * dt.itemsize) + " bytes for selection, but got: " + str(len(data))
+            self.log.info(msg)
+            raise IOError(errno.EBADMSG, msg)
+        # array view of the data (no copy)
+        arr = np.frombuffer(data, dtype=dt).reshape(shape)
+        dset[slices] = arr
+        
+        # update modified time
+        self.setModifiedTime(obj_uuid)
+        return True
+    
+    """
+    getCreationPropertiesItem - return dictionary of the layout and filters 
+    used by the dataset
+    """
+    def getCreationPropertiesItem(self, dset):
+        item = {}
+        if dset.chunks:
+            item['layout'] = {'class': 'H5D_CHUNKED', 'dims': list(dset.chunks)}
+        else:
+            item['layout'] = {'class': 'H5D_CONTIGUOUS'}
+        # filters in the order h5py applies them 
+        filters = []
+        if dset.scaleoffset is not None:
+            filters.append({'class': 'H5Z_FILTER_SCALEOFFSET', 'id': h5py.h5z.FILTER_SCALEOFFSET,
+                'scaleOffset': dset.scaleoffset})
+        if dset.shuffle:
+            filters.append({'class': 'H5Z_FILTER_SHUFFLE', 'id': h5py.h5z.FILTER_SHUFFLE})
+        if dset.compression == 'gzip':
+            filters.append({'class': 'H5Z_FILTER_DEFLATE', 'id': h5py.h5z.FILTER_DEFLATE,
+                'level': dset.compression_opts})
+        elif dset.compression == 'lzf':
+            filters.append({'class': 'H5Z_FILTER_LZF', 'id': h5py.h5z.FILTER_LZF})
+        elif dset.compression == 'szip':
+            filters.append({'class': 'H5Z_FILTER_SZIP', 'id': h5py.h5z.FILTER_SZIP})
+        if dset.fletcher32:
+            filters.append({'class': 'H5Z_FILTER_FLETCHER32', 'id': h5py.h5z.FILTER_FLETCHER32})
+        if filters:
+            item['filters'] = filters
+        return item
+        
+    """
+    getCreateDatasetArgs - return dictionary of create_dataset keyword arguments
+    for the given creation properties item
+    """
+    def getCreateDatasetArgs(self, creation_props, rank):
+        kwargs = {}
+        if type(creation_props) is not dict:
+            msg = "Unable to create dataset, creationProperties must be an object"
+            self.log.info(msg)
+            raise IOError(errno.EBADMSG, msg)
+        if 'layout' in creation_props:
+            layout = creation_props['layout']
+            layoutClass = None
+            if type(layout) is dict:
+                layoutClass = layout.get('class')
+            if layoutClass == 'H5D_CHUNKED':
+                dims = layout.get('dims')
+                if type(dims) is int:
+                    dims = [dims]
+                if type(dims) not in (list, tuple) or len(dims) != rank:
+                    msg = "Unable to create dataset, chunk dims must have the same rank as the shape"
+                    self.log.info(msg)
+                    raise IOError(errno.EBADMSG, msg)
+                for extent in dims:
+                    if type(extent) is not int or extent < 1:
+                        msg = "Unable to create dataset, invalid chunk dims"
+                        self.log.info(msg)
+                        raise IOError(errno.EBADMSG, msg)
+                kwargs['chunks'] = tuple(dims)
+            elif layoutClass != 'H5D_CONTIGUOUS':
+                msg = "Unable to create dataset, unsupported layout: " + str(layoutClass)
+                self.log.info(msg)
+                raise IOError(errno.EBADMSG, msg)
+                
+        filters = creation_props.get('filters', [])
+        if type(filters) is not list:
+            msg = "Unable to create dataset, filters must be a list"
+            self.log.info(msg)
+            raise IOError(errno.EBADMSG, msg)
+        for filterItem in filters:
+            if type(filterItem) is not dict or 'class' not in filterItem:
+                msg = "Unable to create dataset, filter class not specified"
+                self.log.info(msg)
+                raise IOError(errno.EBADMSG, msg)
+            filterClass = filterItem['class']
+            if filterClass == 'H5Z_FILTER_DEFLATE':
+                level = filterItem.get('level', 4)
+                if type(level) is not int or level < 0 or level > 9:
+                    msg = "Unable to create dataset, deflate level must be 0-9"
+                    self.log.info(msg)
+                    raise IOError(errno.EBADMSG, msg)
+                kwargs['compression'] = 'gzip'
+                kwargs['compression_opts'] = level
+            elif filterClass == 'H5Z_FILTER_LZF':
+                if not h5py.h5z.filter_avail(h5py.h5z.FILTER_LZF):
+                    msg = "Unable to create dataset, LZF filter is not available"
+                    self.log.info(msg)
+                    raise IOError(errno.EBADMSG, msg)
+                kwargs['compression'] = 'lzf'
+            elif filterClass == 'H5Z_FILTER_SHUFFLE':
+                kwargs['shuffle'] = True
+            elif filterClass == 'H5Z_FILTER_FLETCHER32':
+                kwargs['fletcher32'] = True
+            elif filterClass == 'H5Z_FILTER_SCALEOFFSET':
+                scaleOffset = filterItem.get('scaleOffset', 0)
+                if type(scaleOffset) is not int or scaleOffset < 0:
+                    msg = "Unable to create dataset, invalid scaleOffset value"
+                    self.log.info(msg)
+                    raise IOError(errno.EBADMSG, msg)
+                kwargs['scaleoffset'] = scaleOffset
+            else:
+                msg = "Unable to create dataset, unsupported filter: " + str(filterClass)
+                self.log.info(msg)
+                raise IOError(errno.EBADMSG, msg)
+        return kwargs
+    
     """
     createDataset - creates new dataset given shape and datatype
     Returns UUID
     """   
-    def createDataset(self, datatype, datashape, max_shape=None, fill_value=None):
+    def createDataset(self, datatype, datashape, max_shape=None, fill_value=None, 
+            creation_props=None):
         self.initFile()
         if self.readonly:
             msg = "Unable to create dataset (Updates are not allowed)"
             self.log.info(msg)
             raise IOError(errno.EPERM, msg)
+        self.dirty = True
         datasets = self.dbGrp["{datasets}"]
         obj_uuid = str(uuid.uuid1())
         dt = None
@@ -1048,16 +1834,24 @@ class Hdf5db:
             self.log.error(msg)
             raise IOError(errno.EIO, msg)
             
-        newDataset = datasets.create_dataset(obj_uuid, shape=datashape, dtype=dt, 
-            maxshape=max_shape, fillvalue=fill_value)
+        kwargs = {}
+        if creation_props is not None:
+            kwargs = self.getCreateDatasetArgs(creation_props, len(datashape))
+        try:
+            newDataset = datasets.create_dataset(obj_uuid, shape=datashape, dtype=dt, 
+                maxshape=max_shape, fillvalue=fill_value, **kwargs)
+        except (ValueError, TypeError) as e:
+            # e.g. chunk dims larger than a fixed extent or filter not valid for the type
+            msg = "Unable to create dataset: " + str(e)
+            self.log.info(msg)
+            raise IOError(errno.EBADMSG, msg)
         if newDataset == None:
             msg = 'Unexpected failure to create dataset'
             self.log.error(msg)
             raise IOError(errno.EIO, msg)
-        # store reverse map as an attribute
+        # add to the index (the dataset is anonymous until linked)
         addr = h5py.h5o.get_info(newDataset.id).addr
-        addrGrp = self.dbGrp["{addr}"]
-        addrGrp.attrs[str(addr)] = obj_uuid
+        self.index.addObject("datasets", obj_uuid, newDataset, addr, anonymous=True)
         
         # set timestamp
         now = time.time()
@@ -1075,6 +1869,7 @@ class Hdf5db:
             msg = "Unable to resize dataset (Updates are not allowed)"
             self.log.info(msg)
             raise IOError(errno.EACESS, msg)  
+        self.dirty = True
         dset = self.getDatasetObjByUuid(obj_uuid)  # will throw exception if not found
         if len(shape) != len(dset.shape):
             msg = "Unable to resize dataset, shape has wrong number of dimensions"
@@ -1125,11 +1920,13 @@ class Hdf5db:
             self.log.error(msg)
             raise IOError(errno.EIO, msg)
         self.initFile()
+        self.completeIndex()  # need all the groups to find links to the object
         self.log.info("delete uuid: " + obj_uuid)
         if self.readonly:
             msg = "Unable to delete object (Updates are not allowed)"
             self.log.info(msg)
             raise IOError(errno.EPERM, msg)
+        self.dirty = True
             
         if obj_uuid == self.dbGrp.attrs["rootUUID"] and objtype == 'group':
             # can't delete root group
@@ -1137,61 +1934,40 @@ class Hdf5db:
             self.log.info(msg)
             raise IOError(errno.EPERM, msg)
             
-        dbCol = None
-        tgt = None
-        if objtype == 'dataset':
-            tgt = self.getDatasetObjByUuid(obj_uuid)
-            dbCol = self.dbGrp["{datasets}"]  
-        elif objtype == 'group':
-            tgt = self.getGroupObjByUuid(obj_uuid)
-            dbCol = self.dbGrp["{groups}"]
-        else:  # datatype
-            tgt = self.getCommittedTypeObjByUuid(obj_uuid)
-            dbCol = self.dbGrp["{datatypes}"]
+        col_type = objtype + 's'
+        tgt = self.getObjectByUuid(col_type, obj_uuid)
             
         if tgt == None:
             msg = "Unable to delete " + objtype + ", uuid: " + obj_uuid + " not found"
             self.log.error(msg)
             raise IOError(errno.ENXIO, msg)
             
-        # unlink from root (if present)     
-        self.unlinkObject(self.f['/'], tgt) 
-         
-        groups = self.dbGrp["{groups}"]
-        # iterate through each group in the file and unlink tgt if it is linked
-        # by the group.
-        # We'll store a list of links to be removed as we go, and then actually
-        # remove the links after the iteration is done (otherwise we can run into issues
-        # where the key has become invalid)
-        linkList = []  # this is our list
-        for uuidName in groups.attrs:
-            grpRef = groups.attrs[uuidName]
-            # de-reference handle
-            grp = self.f[grpRef]
-            for linkName in grp:
-                if self.isObjectHardLinked(grp, tgt, linkName):
-                    linkList.append({'group': grp, 'link': linkName})
-        for item in linkList:
-            self.unlinkObjectItem(item['group'], tgt, item['link'])
-                  
         addr = h5py.h5o.get_info(tgt.id).addr
-        addrGrp = self.dbGrp["{addr}"] 
-        del addrGrp.attrs[str(addr)]  # remove reverse map
-        dbRemoved = False
-          
-        # finally, remove the dataset from db
-        if obj_uuid in dbCol:
-            # should be here (now it is anonymous)
-            del dbCol[obj_uuid]
-            dbRemoved = True
         
-        if not dbRemoved:
-            self.log.warning("did not find: " + obj_uuid + " in anonymous collection")
-                
-            if obj_uuid in dbCol.attrs:
-                self.log.info("removing: " + obj_uuid + " from non-anonymous collection")
-                del dbCol.attrs[obj_uuid]
-                dbRemoved = True
+        # unlink tgt from each group that links to it.
+        linkList = self.getLinkIndex().getLinks(addr)
+        for (parentAddr, linkName) in linkList:
+            grp = self.getGroupByAddress(parentAddr)
+            if grp is None:
+                self.log.warning("deleteObjectByUuid: parent group not found for link: " 
+                    + linkName)
+                continue
+            self.unlinkObjectItem(grp, tgt, linkName)
+            if grp == self.f['/']:
+                parentUuid = self.dbGrp.attrs["rootUUID"]
+            else:
+                parentUuid = self.getUUIDByAddress(parentAddr)
+            self.setModifiedTime(parentUuid)  # parent group is modified
+            
+        if objtype == 'group':
+            # links from the deleted group no longer count
+            for linkName in tgt:
+                self.removeLinkFromIndex(tgt, linkName)
+          
+        self.openDatasets.pop(obj_uuid, None)
+          
+        # finally, remove the object from db
+        dbRemoved = self.index.removeObject(col_type, obj_uuid, addr)
              
         if not dbRemoved:
             msg = "Unexpected Error, did not find reference to: " + obj_uuid
@@ -1199,7 +1975,7 @@ class Hdf5db:
             raise IOError(errno.EIO, msg)
         
         # note when the object was deleted
-        self.setModifiedTime(obj_uuid)
+        self.setDeleteTime(obj_uuid)
                
         return True
           
@@ -1268,9 +2044,8 @@ class Hdf5db:
             # Hardlink doesn't have any properties itself, just get the linked
             # object
             obj = parent[link_name]
-            addr = h5py.h5o.get_info(obj.id).addr
             item['class'] = 'H5L_TYPE_HARD'
-            item['uuid'] = self.getUUIDByAddress(addr)
+            item['uuid'] = self.getUUIDByObj(obj)
             class_name = obj.__class__.__name__ 
             if class_name == 'Dataset':
                 item['href'] = 'datasets/' + item['uuid']
@@ -1317,6 +2092,13 @@ class Hdf5db:
         return item
         
     def getLinkItems(self, grpUuid, marker=None, limit=0):
+        return self.getLinkItemsPage(grpUuid, marker=marker, limit=limit)[0]
+        
+    """
+      getLinkItemsPage - returns (items, cursor) where cursor can be used to
+            get the next page of items (None if there are no more).
+    """
+    def getLinkItemsPage(self, grpUuid, cursor=None, marker=None, limit=0):
         self.log.info("db.getLinkItems(" + grpUuid + ")")
         if marker:
             self.log.info("...marker: " + marker)
@@ -1329,33 +2111,89 @@ class Hdf5db:
             msg = "Parent group: " + grpUuid + " not found, no links returned"
             self.log.info(msg)
             raise IOError(errno.ENXIO, msg)
-        items = []
-        gotMarker = True
-        if marker != None:
-            gotMarker = False
-        count = 0
-        for link_name in parent:
-            if link_name == "__db__":
-                continue
-            if not gotMarker:
-                if link_name == marker:
-                    gotMarker = True
-                    continue  # start filling in result on next pass
+            
+        def getNames(start, stop):
+            names = []
+            def visitor(name):
+                if name == "__db__":
+                    names.append(None)
                 else:
-                    continue  # keep going!
+                    names.append(self.decodeName(name))
+                if len(names) == stop - start:
+                    return True  # stop iteration
+                return None
+            h5py.h5g.iterate(parent.id, visitor, start)
+            return names
+            
+        (names, nextCursor) = self.getPage(getNames, len(parent), cursor=cursor,
+            marker=marker, limit=limit)
+        items = []
+        for link_name in names:
             item = self.getLinkItemByObj(parent, link_name)
             items.append(item)
-                
-            count += 1
-            if limit > 0 and count == limit:
-                break  # return what we got
-        return items
+        return (items, nextCursor)
+        
+    """
+      getLinkTree - walk hard links breadth-first from the given group and
+            return the links found as (items, truncated).  Each item is a link
+            item with 'parent' (uuid of the group holding the link) and 'depth'
+            (1 for the links of the starting group) added.  A group reachable
+            by more than one path is only expanded once (objects are compared
+            by address).  
+        maxDepth - number of levels of links to return
+        limit - maximum number of items to return (0 for no limit), 
+            truncated is True if the walk stopped early because of this
+    """
+    def getLinkTree(self, grpUuid, maxDepth=1, limit=0):
+        self.log.info("db.getLinkTree(" + grpUuid + ", maxDepth=" + str(maxDepth) + 
+            ", limit=" + str(limit) + ")")
+        
+        self.initFile()
+        grp = self.getGroupObjByUuid(grpUuid)
+        if grp == None:
+            msg = "Group: " + grpUuid + " not found, no links returned"
+            self.log.info(msg)
+            raise IOError(errno.ENXIO, msg)
+            
+        visited = set([h5py.h5o.get_info(grp.id).addr])
+        queue = deque([(grpUuid, grp, 1)])
+        items = []
+        while queue:
+            (parentUuid, parent, depth) = queue.popleft()
+            names = []
+            def visitor(name):
+                if name != "__db__":
+                    names.append(self.decodeName(name))
+                return None
+            h5py.h5g.iterate(parent.id, visitor, 0)
+            for link_name in names:
+                if limit and len(items) >= limit:
+                    return (items, True)
+                item = self.getLinkItemByObj(parent, link_name)
+                if item is None:
+                    continue
+                for key in ('ctime', 'mtime', 'href'):
+                    if key in item:
+                        del item[key]
+                item['parent'] = parentUuid
+                item['depth'] = depth
+                items.append(item)
+                if depth >= maxDepth or item.get('collection') != 'groups':
+                    continue
+                child = parent[link_name]
+                addr = h5py.h5o.get_info(child.id).addr
+                if addr in visited:
+                    continue
+                visited.add(addr)
+                queue.append((item['uuid'], child, depth + 1))
+        return (items, False)
         
     def unlinkItem(self, grpUuid, link_name):
         if self.readonly:
             msg = "Unable to unlink item (Updates are not allowed)"
             self.log.info(msg)
             raise IOError(errno.EPERM, msg) 
+        self.dirty = True
         grp = self.getGroupObjByUuid(grpUuid)
         if grp == None:
             msg = "Parent group: " + grpUuid + " not found, cannot remove link"
@@ -1391,15 +2229,25 @@ class Hdf5db:
         else:
             # SoftLink or External Link - we can just remove the key
             del grp[link_name]
+            self.pathCache.clear()
             linkDeleted = True
             
         if linkDeleted:
             # update timestamp
-            self.setModifiedTime(grpUuid, objType="link", name=link_name)
+            now = time.time()
+            self.setDeleteTime(grpUuid, objType="link", name=link_name, timestamp=now)
+            self.setModifiedTime(grpUuid, timestamp=now)  # parent group is modified
             
         return linkDeleted
         
     def getCollection(self, col_type, marker=None, limit=None):
+        return self.getCollectionPage(col_type, marker=marker, limit=limit)[0]
+        
+    """
+      getCollectionPage - returns (uuids, cursor) where cursor can be used to
+            get the next page of uuids (None if there are no more).
+    """
+    def getCollectionPage(self, col_type, cursor=None, marker=None, limit=None):
         self.log.info("db.getCollection(" + col_type + ")")
         #col_type should be either "datasets", "groups", or "datatypes"
         if col_type not in ("datasets", "groups", "datatypes"):
@@ -1407,40 +2255,15 @@ class Hdf5db:
             self.log.error(msg)
             raise IOError(errno.EIO, msg)
         self.initFile()
-        col = None  # Group, Dataset, or Datatype
-        if col_type == "datasets":
-            col = self.dbGrp["{datasets}"]
-        elif col_type == "groups":
-            col = self.dbGrp["{groups}"]
-        else:  # col_type == "datatypes" 
-            col = self.dbGrp["{datatypes}"] 
-        
-        uuids = []
-        count = 0;
-        # gather the non-anonymous ids first
-        for uuid in col.attrs:
-            if marker:
-                if uuid == marker:
-                    marker = None  # clear and pick up next item
-                continue
-            uuids.append(uuid)
-            count += 1
-            if limit > 0 and count == limit:
-                break
-                
-        if limit == 0 or count < limit:
-            # grab any anonymous obj ids next
-            for uuid in col:
-                if marker:
-                    if uuid == marker:
-                        marker = None  # clear and pick up next item
-                    continue
-                uuids.append(uuid)
-                count += 1
-                if limit > 0 and count == limit:
-                    breakn             
-                
-        return uuids
+        self.completeIndex()
+        
+        if not limit:
+            limit = 0
+        def getNames(start, stop):
+            return self.index.getUUIDRange(col_type, start, stop)
+            
+        return self.getPage(getNames, self.index.getNumPositions(col_type), cursor=cursor,
+            marker=marker, limit=limit, batchSize=max(limit, INDEX_BATCH_ROWS))
 
     
     """
@@ -1449,16 +2272,24 @@ class Hdf5db:
     def getDBCollections(self):
         return ("{groups}", "{datasets}", "{datatypes}")
     
+    """
+        Return the collection type ("groups", "datasets", or "datatypes") of
+        the uuid, or None if not found
+    """
+    def getCollectionType(self, obj_uuid):
+        self.initFile()
+        if obj_uuid == self.dbGrp.attrs["rootUUID"]:
+            return "groups"
+        return self.index.getCollectionType(obj_uuid)
+    
     """
         Return the db collection the uuid belongs to
     """
     def getDBCollection(self, obj_uuid):
-        dbCollections = self.getDBCollections()
-        for dbCollectionName in dbCollections:
-            col = self.dbGrp[dbCollectionName]
-            if obj_uuid in col or obj_uuid in col.attrs:
-                return col;
-        return None
+        col_type = self.index.getCollectionType(obj_uuid)
+        if col_type is None:
+            return None
+        return self.dbGrp['{' + col_type + '}']
          
     
     def unlinkObjectItem(self, parentGrp, tgtObj, link_name):
@@ -1466,6 +2297,7 @@ class Hdf5db:
             msg = "Unexpected attempt to unlink object"
             self.log.error(msg)
             raise IOError(errno.EIO, msg)
+        self.dirty = True
         if link_name not in parentGrp:
             msg = "Unexpected: did not find link_name: [" + link_name + "]" 
             self.log.error(msg)
@@ -1488,15 +2320,14 @@ class Hdf5db:
                 if numlinks == 1:
                     # last link to this object - convert to anonymous object
                     # by creating link under {datasets} or {groups} or {datatypes}
-                    # also remove the attribute UUID key
-                    addr = h5py.h5o.get_info(obj.id).addr  
-                    obj_uuid = self.getUUIDByAddress(addr)
+                    obj_uuid = self.getUUIDByObj(obj)
                     self.log.info("converting: " + obj_uuid + " to anonymous obj")
-                    dbCol = self.getDBCollection(obj_uuid)
-                    del dbCol.attrs[obj_uuid]  # remove the object ref
-                    dbCol[obj_uuid] = obj      # add a hardlink        
+                    col_type = self.index.getCollectionType(obj_uuid)
+                    self.index.setAnonymous(col_type, obj_uuid, obj)
                 self.log.info("deleting link: [" + link_name + "] from: " + parentGrp.name)
+                self.removeLinkFromIndex(parentGrp, link_name)
                 del parentGrp[link_name]  
+                self.pathCache.clear()
                 linkDeleted = True    
         else:
             self.log.info("unlinkObjectItem: link is not a hardlink, ignoring")           
@@ -1514,6 +2345,7 @@ class Hdf5db:
             msg = "Unable to create link (Updates are not allowed)"
             self.log.info(msg)
             raise IOError(errno.EPERM, msg)  
+        self.dirty = True
               
         parentObj = self.getGroupObjByUuid(parentUUID)
         if parentObj == None:
@@ -1537,18 +2369,23 @@ class Hdf5db:
             self.log.info("linkname already exists, deleting")
             self.unlinkObjectItem(parentObj, None, link_name)
         parentObj[link_name] = childObj
-        
-        # convert this from an anonymous object to ref if needed
-        dbCol = self.getDBCollection(childUUID)
-        if childUUID in dbCol:
-            # convert to a ref
-            del dbCol[childUUID]  # remove hardlink
-            dbCol.attrs[childUUID] = childObj.ref # create a ref
+        self.pathCache.clear()
+        if self.linkIndex is not None:
+            parentAddr = h5py.h5o.get_info(parentObj.id).addr
+            childAddr = h5py.h5o.get_info(childObj.id).addr
+            self.linkIndex.addLink(childAddr, parentAddr, link_name)
+        
+        # convert this from an anonymous object to ref if needed (the root 
+        # group isn't in the index)
+        if childUUID != self.dbGrp.attrs["rootUUID"]:
+            col_type = self.index.getCollectionType(childUUID)
+            self.index.setLinked(col_type, childUUID, childObj)
         
         # set link timestamps
         now = time.time()
         self.setCreateTime(parentUUID, objType="link", name=link_name, timestamp=now)
         self.setModifiedTime(parentUUID, objType="link", name=link_name, timestamp=now)
+        self.setModifiedTime(parentUUID, timestamp=now)  # parent group is modified
         return True
         
     def createSoftLink(self, parentUUID, linkPath, link_name):
@@ -1557,6 +2394,7 @@ class Hdf5db:
             msg = "Unable to create link (Updates are not allowed)"
             self.log.info(msg)
             raise IOError(errno.EPERM, msg)  
+        self.dirty = True
         parentObj = self.getGroupObjByUuid(parentUUID)
         if parentObj == None:
             msg = "Unable to create link, parent UUID: " + parentUUID + " not found"
@@ -1565,12 +2403,15 @@ class Hdf5db:
         if link_name in parentObj:
             # link already exists
             self.log.info("linkname already exists, deleting")
+            self.removeLinkFromIndex(parentObj, link_name)
             del parentObj[link_name]  # delete old link
         parentObj[link_name] = h5py.SoftLink(linkPath)
+        self.pathCache.clear()
         
         now = time.time()
         self.setCreateTime(parentUUID, objType="link", name=link_name, timestamp=now)
         self.setModifiedTime(parentUUID, objType="link", name=link_name, timestamp=now)
+        self.setModifiedTime(parentUUID, timestamp=now)  # parent group is modified
         
         return True
         
@@ -1580,6 +2421,7 @@ class Hdf5db:
             msg = "Unable to create link (Updates are not allowed)"
             self.log.info(msg)
             raise IOError(errno.EPERM, msg)    
+        self.dirty = True
         parentObj = self.getGroupObjByUuid(parentUUID)
         if parentObj == None:
             msg = "Unable to create link, parent UUID: " + parentUUID + " not found"
@@ -1588,12 +2430,15 @@ class Hdf5db:
         if link_name in parentObj:
             # link already exists
             self.log.info("linkname already exists, deleting")
+            self.removeLinkFromIndex(parentObj, link_name)
             del parentObj[link_name]  # delete old link
         parentObj[link_name] = h5py.ExternalLink(extPath, linkPath)
+        self.pathCache.clear()
         
         now = time.time()
         self.setCreateTime(parentUUID, objType="link", name=link_name, timestamp=now)
         self.setModifiedTime(parentUUID, objType="link", name=link_name, timestamp=now)
+        self.setModifiedTime(parentUUID, timestamp=now)  # parent group is modified
         
         return True
         
@@ -1604,13 +2449,13 @@ class Hdf5db:
             msg = "Unable to create group (Updates are not allowed)"
             self.log.info(msg)
             raise IOError(errno.EPERM, msg)    
+        self.dirty = True
         groups = self.dbGrp["{groups}"]
         obj_uuid = str(uuid.uuid1())
         newGroup = groups.create_group(obj_uuid)
-        # store reverse map as an attribute
+        # add to the index (the group is anonymous until linked)
         addr = h5py.h5o.get_info(newGroup.id).addr
-        addrGrp = self.dbGrp["{addr}"]
-        addrGrp.attrs[str(addr)] = obj_uuid
+        self.index.addObject("groups", obj_uuid, newGroup, addr, anonymous=True)
         
         #set timestamps
         now = time.time()
@@ -1622,10 +2467,8 @@ class Hdf5db:
     
     def getNumberOfGroups(self):
         self.initFile()
-        count = 0
-        groups = self.dbGrp["{groups}"]
-        count += len(groups)        #anonymous groups
-        count += len(groups.attrs)  #linked groups
+        self.completeIndex()
+        count = self.index.getCount("groups")
         count += 1                  # add of for root group
         
         return count
@@ -1633,16 +2476,12 @@ class Hdf5db:
         
     def getNumberOfDatasets(self):
         self.initFile()
-        count = 0
-        datasets = self.dbGrp["{datasets}"]
-        count += len(datasets)        #anonymous datasets
-        count += len(datasets.attrs)  #linked datasets
+        self.completeIndex()
+        count = self.index.getCount("datasets")
         return count
         
     def getNumberOfDatatypes(self):
         self.initFile()
-        count = 0
-        datatypes = self.dbGrp["{datatypes}"]
-        count += len(datatypes)        #anonymous datatypes
-        count += len(datatypes.attrs)  #linked datatypes
+        self.completeIndex()
+        count = self.index.getCount("datatypes")
         return count
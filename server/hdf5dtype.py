@@ -15,6 +15,7 @@ This class is used to map between HDF5 type representations and numpy types
  
 """
 import sys
+import json
 import numpy as np
 import h5py
 
@@ -240,6 +241,52 @@ def getBaseType(dt):
     return type_info
  
 
+"""
+Return True if values of the given numpy type can be transferred as raw bytes,
+i.e. fixed size numeric or string types, or arrays and compounds of these.
+"""
+def isFixedSizeType(dt):
+    if dt.names:
+        for name in dt.names:
+            if not isFixedSizeType(dt.fields[name][0]):
+                return False
+        return True
+    if dt.subdtype is not None:
+        return isFixedSizeType(dt.subdtype[0])
+    return dt.kind in ('b', 'i', 'u', 'f', 'c', 'S')
+    
+"""
+Return the little-endian equivalent of the given (fixed size) numpy type.
+For compound types the byte order of each field is converted.
+"""
+def getLittleEndianType(dt):
+    return dt.newbyteorder('<')
+    
+"""
+Return string description of numpy type: the type string (e.g. '<i4') for
+non-compound types, and a JSON list of [name, type] pairs for compound types.
+"""
+def getDtypeDescription(dt):
+    if dt.names:
+        return json.dumps(getPlainDescr(dt.descr))
+    return dt.str
+    
+"""
+Return numpy type description (dtype.descr) without the field metadata 
+(e.g. the string encoding h5py adds) that numpy.dtype() can't parse.
+"""
+def getPlainDescr(descr):
+    fields = []
+    for field in descr:
+        fieldType = field[1]
+        if type(fieldType) is list:
+            fieldType = getPlainDescr(fieldType)  # nested compound
+        elif type(fieldType) is tuple:
+            fieldType = fieldType[0]  # (type, metadata)
+        fields.append((field[0], fieldType) + tuple(field[2:]))
+    return fields
+    
+
 def getNumpyTypename(hdf5TypeName, typeClass=None):
     predefined_int_types = {
           'H5T_STD_I8':   'i1', 
@@ -0,0 +1,253 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import os
+import os.path as op
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from tornado.web import OutputTransform, HTTPError
+
+import config
+from fileUtil import getFilePath
+
+"""
+ ResponseCache - LRU cache of complete GET responses for read-only domains 
+ (domain files that are not writable, so the responses can't change).
+ 
+ Entries are keyed by protocol, domain, uri, Accept header, and the identity
+ (inode, size, and mtime) of the domain file and of its ".<filename>" db 
+ file, so a replaced file or updated db (e.g. objects added to the index) 
+ doesn't return stale responses.  When cacheDir is set, entries evicted from memory are 
+ written to files in the directory and read back on a memory miss.  The disk 
+ cache may be shared by multiple server processes.
+ 
+ Responses are added by ResponseCacheTransform, which sees the complete 
+ body of responses that are not streamed, and served by writeCachedResponse.
+"""
+
+# response headers that are saved with a cached body
+CACHED_HEADERS = ('Content-Type', 'Etag', 'Last-Modified', 'Vary', 'X-Dtype', 'X-Shape')
+ENTRY_OVERHEAD = 256  # approximate size of an entry, not including the body
+
+
+class ResponseCache:
+    def __init__(self, maxSize, cacheDir=None, maxDiskSize=0, app_logger=None):
+        if app_logger:
+            self.log = app_logger
+        else:
+            self.log = logging.getLogger()
+        self.maxSize = maxSize
+        self.cacheDir = cacheDir
+        self.maxDiskSize = maxDiskSize
+        self.entries = OrderedDict()   # least recently used first
+        self.size = 0
+        self.diskWritten = 0  # bytes written to disk since the last trim
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()  # used from the I/O threads and the IOLoop
+        
+    def getEntrySize(self, entry):
+        (headers, body) = entry
+        return len(body) + ENTRY_OVERHEAD
+        
+    def getFileName(self, key):
+        return op.join(self.cacheDir, hashlib.sha1(repr(key)).hexdigest())
+        
+    """
+      get - return (headers, body) for the key, or None if not in the cache
+    """
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.entries[key] = entry   # most recently used
+                self.hits += 1
+                return entry
+        entry = self.readEntry(key)
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.addEntry(key, entry)
+        return entry
+        
+    def put(self, key, headers, body):
+        if self.getEntrySize((headers, body)) > self.maxSize:
+            return  # too big to cache
+        with self.lock:
+            if key in self.entries:
+                return  # already cached (response was served from the cache)
+            evicted = self.addEntry(key, (headers, body))
+        for (evictedKey, evictedEntry) in evicted:
+            self.writeEntry(evictedKey, evictedEntry)
+            
+    """
+      addEntry - add entry to the memory cache, returns list of (key, entry) 
+            evicted to make room.  Called with lock held.
+    """
+    def addEntry(self, key, entry):
+        self.entries[key] = entry
+        self.size += self.getEntrySize(entry)
+        evicted = []
+        while self.size > self.maxSize and len(self.entries) > 0:
+            (evictedKey, evictedEntry) = self.entries.popitem(last=False)
+            self.size -= self.getEntrySize(evictedEntry)
+            evicted.append((evictedKey, evictedEntry))
+        return evicted
+        
+    def readEntry(self, key):
+        if not self.cacheDir:
+            return None
+        try:
+            with open(self.getFileName(key), 'rb') as f:
+                data = f.read()
+        except IOError:
+            return None
+        npos = data.find('\n')
+        if npos < 0:
+            return None
+        headers = json.loads(data[:npos])
+        return ([tuple(header) for header in headers], data[npos+1:])
+        
+    """
+      writeEntry - save an entry evicted from memory to the disk cache
+    """
+    def writeEntry(self, key, entry):
+        if not self.cacheDir or self.maxDiskSize <= 0:
+            return
+        (headers, body) = entry
+        fileName = self.getFileName(key)
+        tmpName = fileName + '.' + str(os.getpid()) + '.tmp'
+        try:
+            with open(tmpName, 'wb') as f:
+                f.write(json.dumps(headers) + '\n')
+                f.write(body)
+            os.rename(tmpName, fileName)   # readers never see a partial file
+        except (IOError, OSError) as e:
+            self.log.warning("unable to write response cache file: " + str(e))
+            return
+        self.diskWritten += len(body)
+        if self.diskWritten * 10 > self.maxDiskSize:
+            self.trimDisk()
+            
+    """
+      trimDisk - remove the least recently written files from the disk cache
+            until it fits in maxDiskSize
+    """
+    def trimDisk(self):
+        self.diskWritten = 0
+        files = []
+        total = 0
+        for name in os.listdir(self.cacheDir):
+            path = op.join(self.cacheDir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue  # removed by another process
+            files.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        files.sort()
+        for (mtime, size, path) in files:
+            if total <= self.maxDiskSize:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+        
+        
+_cache = None
+        
+def getResponseCache():
+    global _cache
+    if _cache is None:
+        cacheDir = config.get('response_cache_dir')
+        if cacheDir and not op.isdir(cacheDir):
+            os.makedirs(cacheDir)
+        _cache = ResponseCache(int(config.get('response_cache_size')), cacheDir=cacheDir,
+            maxDiskSize=int(config.get('response_cache_disk_size')),
+            app_logger=logging.getLogger("h5serv"))
+    return _cache
+    
+"""
+ getFileId - (inode, size, mtime) of a file, or None if it doesn't exist
+"""
+def getFileId(filePath):
+    try:
+        st = os.stat(filePath)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime)
+    
+"""
+ getCacheKey - cache key for a GET request, or None if the response should 
+   not be cached (caching disabled, conditional request, or the domain is 
+   writable)
+"""
+def getCacheKey(request):
+    if request.method != 'GET' or int(config.get('response_cache_size')) <= 0:
+        return None
+    if 'If-None-Match' in request.headers or 'If-Modified-Since' in request.headers:
+        return None  # let the handler check the validators
+    try:
+        filePath = getFilePath(request.host)
+    except HTTPError:
+        return None
+    fileId = getFileId(filePath)
+    if fileId is None or os.access(filePath, os.W_OK):
+        return None
+    # the db file for read-only files (see Hdf5db)
+    dbFileId = getFileId(op.join(op.dirname(filePath), '.' + op.basename(filePath)))
+    return (request.protocol, request.host, request.uri, request.headers.get('Accept', ''), 
+        fileId, dbFileId)
+    
+"""
+ writeCachedResponse - write the cached response for the request of handler.
+   Returns False if it is not in the cache.
+"""
+def writeCachedResponse(handler):
+    key = getCacheKey(handler.request)
+    if key is None:
+        return False
+    entry = getResponseCache().get(key)
+    if entry is None:
+        return False
+    (headers, body) = entry
+    for (name, value) in headers:
+        handler.set_header(name, value)
+    handler.write(body)
+    return True
+    
+
+"""
+ ResponseCacheTransform - output transform that adds complete (not streamed)
+   200 responses for read-only domains to the cache
+"""
+class ResponseCacheTransform(OutputTransform):
+    def __init__(self, request):
+        self.key = getCacheKey(request)
+        
+    def transform_first_chunk(self, status_code, headers, chunk, finishing):
+        if self.key is not None and status_code == 200 and finishing:
+            cachedHeaders = []
+            for name in CACHED_HEADERS:
+                if name in headers:
+                    cachedHeaders.append((name, headers[name]))
+            getResponseCache().put(self.key, cachedHeaders, chunk)
+        return status_code, headers, chunk
+        
+    def transform_chunk(self, chunk, finishing):
+        return chunk
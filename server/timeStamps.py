@@ -0,0 +1,299 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+
+"""
+Create and modified timestamp storage for the "__db__" group (see hdf5db.py).
+
+Timestamps are kept for objects, links, and attributes, using keys like
+"<uuid>", "<uuid>_link:[<name>]", or "<uuid>_attr:[<name>]".  When an item
+is deleted its modified time is kept (as a "tombstone") so that requests for 
+deleted objects can be distinguished from requests for unknown uuids.
+
+Two layouts are supported:
+
+ AttrTimeStamps - "attrs" layout.  One int64 attribute per key in the 
+    "{ctime}" and "{mtime}" groups.  Used by files initialized by earlier
+    versions.
+
+ TableTimeStamps - "table" layout.  Fixed width datasets in the "{times}"
+    group: "key" (64-bit hash of the key), "ctime", "mtime" (0 if not set)
+    and "deleted" hold one row per key.  Rows are located with a sorted copy
+    of the key hashes kept in memory, so the times for a list of keys are 
+    read with a few dataset reads.  Tombstones are dropped (compacted) once
+    they make up half the table.
+"""
+import errno
+import numpy as np
+
+from dbIndex import hashKey
+
+
+MIN_CAPACITY = 1024
+MAX_NEW_ROWS = 10000        # rows added before the sorted keys are rebuilt
+COMPACT_MIN_DELETED = 1000  # don't compact tables with fewer tombstones
+
+
+class AttrTimeStamps:
+    format = "attrs"
+
+    def __init__(self, dbGrp, log):
+        self.log = log
+        self.ctimeGrp = dbGrp["{ctime}"]
+        self.mtimeGrp = dbGrp["{mtime}"]
+
+    @staticmethod
+    def create(dbGrp):
+        dbGrp.create_group("{ctime}") # stores create timestamps
+        dbGrp.create_group("{mtime}") # store modified timestamps
+
+    """
+      getTimes - return a (ctime, mtime) tuple for each key, with None for
+        values that have not been set
+    """
+    def getTimes(self, keys):
+        times = []
+        for key in keys:
+            ctime = None
+            mtime = None
+            if key in self.ctimeGrp.attrs:
+                ctime = self.ctimeGrp.attrs[key]
+            if key in self.mtimeGrp.attrs:
+                mtime = self.mtimeGrp.attrs[key]
+            times.append((ctime, mtime))
+        return times
+
+    def setCreateTime(self, key, timestamp):
+        if key in self.ctimeGrp.attrs:
+            self.log.warn("modifying create time for object: " + key)
+        self.ctimeGrp.attrs.create(key, timestamp, dtype='int64')
+
+    def setModifiedTime(self, key, timestamp):
+        self.mtimeGrp.attrs.create(key, timestamp, dtype='int64')
+
+    def setDeleted(self, key, timestamp):
+        self.setModifiedTime(key, timestamp)
+
+
+class TableTimeStamps:
+    format = "table"
+
+    def __init__(self, dbGrp, log):
+        self.log = log
+        self.grp = dbGrp["{times}"]
+        self.keyDset = self.grp["key"]
+        self.ctimeDset = self.grp["ctime"]
+        self.mtimeDset = self.grp["mtime"]
+        self.deletedDset = self.grp["deleted"]
+        self.numRows = int(self.grp.attrs["numRows"])
+        self.numDeleted = int(self.grp.attrs["numDeleted"])
+        self.sortedKeys = None  # sorted key hashes, set by loadKeys
+        self.sortedRows = None  # row for each of sortedKeys
+        self.newRows = {}       # key hash -> row for rows added since loadKeys
+
+    @staticmethod
+    def create(dbGrp, capacity=MIN_CAPACITY):
+        grp = dbGrp.create_group("{times}")
+        chunks = (1024,)
+        for (name, dtype) in (("key", 'u8'), ("ctime", 'i8'), ("mtime", 'i8'), ("deleted", 'i1')):
+            grp.create_dataset(name, (capacity,), maxshape=(None,), chunks=chunks, dtype=dtype)
+        grp.attrs["numRows"] = 0
+        grp.attrs["numDeleted"] = 0
+
+    def loadKeys(self):
+        keys = self.keyDset[0:self.numRows]
+        order = np.argsort(keys, kind='mergesort')
+        self.sortedKeys = keys[order]
+        self.sortedRows = order
+        self.newRows = {}
+
+    """
+      getRows - return array with the row for each key hash (-1 if the key
+        is not in the table)
+    """
+    def getRows(self, hashes):
+        if self.sortedKeys is None or len(self.newRows) > MAX_NEW_ROWS:
+            self.loadKeys()
+        rows = np.empty((len(hashes),), dtype='i8')
+        rows.fill(-1)
+        numKeys = self.sortedKeys.shape[0]
+        if numKeys > 0 and len(hashes) > 0:
+            hashArr = np.array(hashes, dtype='u8')
+            pos = np.minimum(np.searchsorted(self.sortedKeys, hashArr), numKeys - 1)
+            found = self.sortedKeys[pos] == hashArr
+            rows[found] = self.sortedRows[pos[found]]
+        if self.newRows:
+            for i in range(len(hashes)):
+                if hashes[i] in self.newRows:
+                    rows[i] = self.newRows[hashes[i]]
+        return rows
+
+    """
+      readRows - return values of dset for the given rows (0 for rows < 0)
+    """
+    def readRows(self, dset, rows):
+        values = np.zeros((rows.shape[0],), dtype=dset.dtype)
+        valid = rows >= 0
+        if not np.any(valid):
+            return values
+        validRows = rows[valid]
+        lo = int(validRows.min())
+        hi = int(validRows.max())
+        if hi - lo + 1 <= max(4 * validRows.shape[0], 1024):
+            # rows are close together, read them in one block
+            block = dset[lo:hi + 1]
+            values[valid] = block[validRows - lo]
+        else:
+            uniqueRows = np.unique(validRows)
+            block = dset[list(uniqueRows)]
+            values[valid] = block[np.searchsorted(uniqueRows, validRows)]
+        return values
+
+    def getTimes(self, keys):
+        rows = self.getRows([hashKey(key) for key in keys])
+        ctimes = self.readRows(self.ctimeDset, rows)
+        mtimes = self.readRows(self.mtimeDset, rows)
+        times = []
+        for i in range(len(keys)):
+            ctime = None
+            mtime = None
+            if ctimes[i] != 0:
+                ctime = int(ctimes[i])
+            if mtimes[i] != 0:
+                mtime = int(mtimes[i])
+            times.append((ctime, mtime))
+        return times
+
+    """
+      getRow - return row for key, adding a row if create is True
+    """
+    def getRow(self, key, create=True):
+        h = hashKey(key)
+        row = int(self.getRows([h])[0])
+        if row >= 0 or not create:
+            return row
+        row = self.numRows
+        if row >= self.keyDset.shape[0]:
+            capacity = self.keyDset.shape[0] * 2
+            for dset in (self.keyDset, self.ctimeDset, self.mtimeDset, self.deletedDset):
+                dset.resize((capacity,))
+        self.keyDset[row] = h
+        self.newRows[h] = row
+        self.numRows += 1
+        self.grp.attrs["numRows"] = self.numRows
+        return row
+
+    def setCreateTime(self, key, timestamp):
+        row = self.getRow(key)
+        if self.deletedDset[row]:
+            # item is being re-created
+            self.deletedDset[row] = 0
+            self.mtimeDset[row] = 0
+            self.numDeleted -= 1
+            self.grp.attrs["numDeleted"] = self.numDeleted
+        elif self.ctimeDset[row] != 0:
+            self.log.warn("modifying create time for object: " + key)
+        self.ctimeDset[row] = timestamp
+
+    def setModifiedTime(self, key, timestamp):
+        row = self.getRow(key)
+        self.mtimeDset[row] = timestamp
+
+    def setDeleted(self, key, timestamp):
+        row = self.getRow(key)
+        self.mtimeDset[row] = timestamp
+        if not self.deletedDset[row]:
+            self.deletedDset[row] = 1
+            self.numDeleted += 1
+            self.grp.attrs["numDeleted"] = self.numDeleted
+            if self.numDeleted >= COMPACT_MIN_DELETED and self.numDeleted * 2 >= self.numRows:
+                self.compact()
+
+    """
+      compact - remove the rows of deleted items
+    """
+    def compact(self):
+        self.log.info("compacting timestamps, deleted: " + str(self.numDeleted) + 
+            " of " + str(self.numRows))
+        keep = self.deletedDset[0:self.numRows] == 0
+        numRows = int(np.count_nonzero(keep))
+        capacity = MIN_CAPACITY
+        while capacity < numRows:
+            capacity *= 2
+        for dset in (self.keyDset, self.ctimeDset, self.mtimeDset, self.deletedDset):
+            values = dset[0:self.numRows][keep]
+            dset.resize((capacity,))
+            dset[...] = 0
+            if numRows > 0:
+                dset[0:numRows] = values
+        self.numRows = numRows
+        self.numDeleted = 0
+        self.grp.attrs["numRows"] = self.numRows
+        self.grp.attrs["numDeleted"] = self.numDeleted
+        self.sortedKeys = None
+
+
+"""
+  openTimeStamps - return timestamp storage for an initialized db group
+"""
+def openTimeStamps(dbGrp, log):
+    if "{times}" in dbGrp:
+        return TableTimeStamps(dbGrp, log)
+    return AttrTimeStamps(dbGrp, log)
+
+"""
+  createTimeStamps - create timestamp storage in a new db group
+"""
+def createTimeStamps(dbGrp, log, timeFormat="table"):
+    if timeFormat == "table":
+        TableTimeStamps.create(dbGrp)
+    elif timeFormat == "attrs":
+        AttrTimeStamps.create(dbGrp)
+    else:
+        msg = "Unknown timestamp format: " + timeFormat
+        log.error(msg)
+        raise IOError(errno.EINVAL, msg)
+    return openTimeStamps(dbGrp, log)
+
+"""
+  migrateTimeStamps - convert "attrs" layout timestamps to the "table" layout.
+    returns - the new timestamp storage
+"""
+def migrateTimeStamps(dbGrp, log):
+    if "{times}" in dbGrp:
+        log.info("timestamps are already in table format")
+        return openTimeStamps(dbGrp, log)
+    ctimeGrp = dbGrp["{ctime}"]
+    mtimeGrp = dbGrp["{mtime}"]
+    keys = list(set(ctimeGrp.attrs.keys()) | set(mtimeGrp.attrs.keys()))
+    numRows = len(keys)
+    capacity = MIN_CAPACITY
+    while capacity < numRows:
+        capacity *= 2
+    TableTimeStamps.create(dbGrp, capacity=capacity)
+    times = TableTimeStamps(dbGrp, log)
+    if numRows > 0:
+        ctimes = np.zeros((numRows,), dtype='i8')
+        mtimes = np.zeros((numRows,), dtype='i8')
+        for i in range(numRows):
+            if keys[i] in ctimeGrp.attrs:
+                ctimes[i] = ctimeGrp.attrs[keys[i]]
+            if keys[i] in mtimeGrp.attrs:
+                mtimes[i] = mtimeGrp.attrs[keys[i]]
+        times.keyDset[0:numRows] = np.array([hashKey(key) for key in keys], dtype='u8')
+        times.ctimeDset[0:numRows] = ctimes
+        times.mtimeDset[0:numRows] = mtimes
+        times.numRows = numRows
+        times.grp.attrs["numRows"] = numRows
+    del dbGrp["{ctime}"]
+    del dbGrp["{mtime}"]
+    log.info("migrated " + str(numRows) + " timestamps to table")
+    return times
@@ -64,6 +64,25 @@ class AttributeTest(unittest.TestCase):
             self.assertEqual(attrsJson[1]['name'], 'attr2')
             self.assertFalse('value' in attrsJson[0])
             
+    def testGetAllWithValues(self):
+        for domain_name in ('tall', 'tall_ro'):
+            domain = domain_name + '.' + config.get('domain') 
+            rootUUID = helper.getRootUUID(domain)
+            req = helper.getEndpoint() + "/groups/" + rootUUID + "/attributes"
+            headers = {'host': domain}
+            params = {'IncludeValues': 1}
+            rsp = requests.get(req, headers=headers, params=params)
+            self.failUnlessEqual(rsp.status_code, 200)
+            rspJson = json.loads(rsp.text)
+            attrsJson = rspJson['attributes']
+            self.assertEqual(len(attrsJson), 2)
+            self.assertEqual(attrsJson[0]['name'], 'attr1')
+            self.assertEqual(attrsJson[0]['shape']['dims'], [10])
+            expected = range(97, 107)
+            expected[9] = 0
+            self.assertEqual(attrsJson[0]['value'], expected)
+            self.assertTrue('value' in attrsJson[1])
+        
     def testGetBatch(self):
         domain = 'attr1k.' + config.get('domain')   
         rootUUID = helper.getRootUUID(domain)     
@@ -0,0 +1,78 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import requests
+import config
+import helper
+import unittest
+import json
+
+class BatchTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(BatchTest, self).__init__(*args, **kwargs)
+        self.endpoint = 'http://' + config.get('server') + ':' + str(config.get('port'))
+        
+    def testPost(self):
+        domain = 'tall.' + config.get('domain')   
+        rootUUID = helper.getRootUUID(domain)
+        g1UUID = helper.getUUID(domain, rootUUID, 'g1')
+        g11UUID = helper.getUUID(domain, g1UUID, 'g1.1')
+        dset111UUID = helper.getUUID(domain, g11UUID, 'dset1.1.1')
+        missingUUID = '00000000-0000-0000-0000-000000000000'
+        req = self.endpoint + "/batch"
+        headers = {'host': domain}
+        payload = {'ids': [rootUUID, dset111UUID, missingUUID], 
+            'include': ['type', 'shape', 'attributes', 'links']}
+        rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.failUnlessEqual(rsp.headers['content-type'], 'application/json')
+        rspJson = json.loads(rsp.text)
+        objects = rspJson['objects']
+        self.assertEqual(len(objects), 3)
+        
+        root = objects[0]
+        self.assertEqual(root['id'], rootUUID)
+        self.assertEqual(root['collection'], 'groups')
+        self.assertEqual(root['linkCount'], 2)
+        self.assertEqual(len(root['links']), 2)
+        self.assertEqual(len(root['attributes']), 2)
+        attrNames = [attr['name'] for attr in root['attributes']]
+        self.assertTrue('attr1' in attrNames)
+        self.assertTrue('value' in root['attributes'][0])
+        
+        dset = objects[1]
+        self.assertEqual(dset['id'], dset111UUID)
+        self.assertEqual(dset['collection'], 'datasets')
+        self.assertEqual(dset['shape']['dims'], [10, 10])
+        self.assertEqual(dset['type']['base'], 'H5T_STD_I32BE')
+        self.assertTrue('links' not in dset)
+        
+        self.assertEqual(objects[2]['id'], missingUUID)
+        self.assertEqual(objects[2]['status'], 404)
+        
+        # default facets
+        payload = {'ids': [dset111UUID]}
+        rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        dset = json.loads(rsp.text)['objects'][0]
+        self.assertTrue('type' in dset)
+        self.assertTrue('attributes' not in dset)
+        
+    def testPostBadRequest(self):
+        domain = 'tall.' + config.get('domain')   
+        req = self.endpoint + "/batch"
+        headers = {'host': domain}
+        for payload in ({}, {'ids': 'abc'}, {'ids': [], 'include': ['bogus']}):
+            rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+            self.failUnlessEqual(rsp.status_code, 400)
+        
+if __name__ == '__main__':
+    unittest.main()
@@ -781,6 +781,43 @@ class DatasetTest(unittest.TestCase):
         rsp = requests.put(req, data=json.dumps(payload), headers=headers)
         self.failUnlessEqual(rsp.status_code, 201)     
         
+    def testPostCreationProperties(self):
+        domain = 'creationprops.datasettest.' + config.get('domain')
+        req = self.endpoint + "/"
+        headers = {'host': domain}
+        rsp = requests.put(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201) # creates domain
+        
+        creationProps = {'layout': {'class': 'H5D_CHUNKED', 'dims': [100, 10]},
+            'filters': [{'class': 'H5Z_FILTER_SHUFFLE'}, 
+                        {'class': 'H5Z_FILTER_DEFLATE', 'level': 9}]}
+        payload = {'type': 'H5T_IEEE_F32LE', 'shape': [1000, 10], 'maxshape': [0, 10],
+            'creationProperties': creationProps}
+        req = self.endpoint + "/datasets"
+        rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201)  # create dataset
+        dset_uuid = json.loads(rsp.text)['id']
+        
+        req = self.endpoint + "/datasets/" + dset_uuid
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rspJson = json.loads(rsp.text)
+        props = rspJson['creationProperties']
+        self.assertEqual(props['layout']['class'], 'H5D_CHUNKED')
+        self.assertEqual(props['layout']['dims'], [100, 10])
+        self.assertEqual(len(props['filters']), 2)
+        self.assertEqual(props['filters'][0]['class'], 'H5Z_FILTER_SHUFFLE')
+        self.assertEqual(props['filters'][1]['class'], 'H5Z_FILTER_DEFLATE')
+        self.assertEqual(props['filters'][1]['level'], 9)
+        
+        # chunk rank doesn't match the dataset rank
+        creationProps = {'layout': {'class': 'H5D_CHUNKED', 'dims': [100]}}
+        payload = {'type': 'H5T_IEEE_F32LE', 'shape': [1000, 10], 
+            'creationProperties': creationProps}
+        req = self.endpoint + "/datasets"
+        rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 400)
+        
     def testPostInvalidType(self):
         domain = 'tall.' + config.get('domain')  
         root_uuid = helper.getRootUUID(domain)
@@ -124,6 +124,48 @@ class LinkTest(unittest.TestCase):
                 self.assertTrue("title" in link)
                 self.assertTrue("class" in link)
                             
+    def testGetDepth(self):
+        logging.info("LinkTest.testGetDepth")
+        for domain_name in ('tall', 'tall_ro'):
+            domain = domain_name + '.' + config.get('domain')   
+            root_uuid = helper.getRootUUID(domain) 
+            g1_uuid = helper.getUUID(domain, root_uuid, 'g1')
+            req = self.endpoint + "/groups/" + root_uuid + "/links"
+            headers = {'host': domain}
+            params = {'Depth': 2}
+            rsp = requests.get(req, headers=headers, params=params)
+            self.failUnlessEqual(rsp.status_code, 200)
+            rspJson = json.loads(rsp.text)
+            self.assertFalse(rspJson['truncated'])
+            links = rspJson["links"]
+            self.assertEqual(len(links), 6)
+            titles = [link['title'] for link in links]
+            self.assertEqual(titles[:2], ['g1', 'g2'])
+            self.assertEqual(links[0]['uuid'], g1_uuid)
+            for link in links[2:]:
+                self.assertEqual(link['depth'], 2)
+                if link['title'] in ('g1.1', 'g1.2'):
+                    self.assertEqual(link['parent'], g1_uuid)
+            
+            # all levels
+            params = {'Depth': 10}
+            rsp = requests.get(req, headers=headers, params=params)
+            self.failUnlessEqual(rsp.status_code, 200)
+            rspJson = json.loads(rsp.text)
+            self.assertEqual(len(rspJson["links"]), 11)
+            
+            # item budget
+            params = {'Depth': 10, 'Limit': 4}
+            rsp = requests.get(req, headers=headers, params=params)
+            self.failUnlessEqual(rsp.status_code, 200)
+            rspJson = json.loads(rsp.text)
+            self.assertEqual(len(rspJson["links"]), 4)
+            self.assertTrue(rspJson['truncated'])
+            
+            params = {'Depth': 0}
+            rsp = requests.get(req, headers=headers, params=params)
+            self.failUnlessEqual(rsp.status_code, 400)
+                            
     def testGetBatch(self):
         logging.info("LinkTest.testGetBatch")
         domain = 'group1k.' + config.get('domain')   
@@ -152,6 +194,33 @@ class LinkTest(unittest.TestCase):
         self.failUnlessEqual(len(names), 1000)  # should get 1000 unique links
     
     
+    def testGetCompressed(self):
+        logging.info("LinkTest.testGetCompressed")
+        domain = 'group1k.' + config.get('domain')   
+        root_uuid = helper.getRootUUID(domain)     
+        req = helper.getEndpoint() + "/groups/" + root_uuid + "/links"
+        params = {'Limit': 100 }
+        # requests decodes the response content
+        headers = {'host': domain, 'Accept-Encoding': 'gzip'}
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.failUnlessEqual(rsp.headers['Content-Encoding'], 'gzip')
+        self.assertTrue('Accept-Encoding' in rsp.headers['Vary'])
+        links = json.loads(rsp.text)['links']
+        self.failUnlessEqual(len(links), 100)
+        
+        headers = {'host': domain, 'Accept-Encoding': 'deflate'}
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.failUnlessEqual(rsp.headers['Content-Encoding'], 'deflate')
+        self.failUnlessEqual(json.loads(rsp.text)['links'], links)
+        
+        headers = {'host': domain, 'Accept-Encoding': 'identity'}
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.assertTrue('Content-Encoding' not in rsp.headers)
+        self.failUnlessEqual(json.loads(rsp.text)['links'], links)
+    
     #Fix - This is crazy slow!
     """    
     def testMoveLinks(self):
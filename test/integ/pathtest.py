@@ -0,0 +1,87 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import requests
+import config
+import helper
+import unittest
+import json
+
+class PathTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(PathTest, self).__init__(*args, **kwargs)
+        self.endpoint = 'http://' + config.get('server') + ':' + str(config.get('port'))
+        
+    def testPost(self):
+        for domain_name in ('tall', 'tall_ro'):
+            domain = domain_name + '.' + config.get('domain')   
+            rootUUID = helper.getRootUUID(domain)
+            g1UUID = helper.getUUID(domain, rootUUID, 'g1')
+            g11UUID = helper.getUUID(domain, g1UUID, 'g1.1')
+            dset111UUID = helper.getUUID(domain, g11UUID, 'dset1.1.1')
+            req = self.endpoint + "/paths"
+            headers = {'host': domain}
+            payload = {'h5paths': ['/', '/g1/g1.1/', '/g1/g1.1/dset1.1.1', '/nosuch', 
+                'g1', '/g1/g1.2/extlink', '/g1/g1.2/g1.2.1/slink']}
+            rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+            self.failUnlessEqual(rsp.status_code, 200)
+            rspJson = json.loads(rsp.text)
+            paths = rspJson['paths']
+            self.assertEqual(len(paths), 7)
+            self.assertEqual(paths[0]['id'], rootUUID)
+            self.assertEqual(paths[0]['collection'], 'groups')
+            self.assertEqual(paths[1]['id'], g11UUID)
+            self.assertEqual(paths[1]['h5path'], '/g1/g1.1/')
+            self.assertEqual(paths[2]['id'], dset111UUID)
+            self.assertEqual(paths[2]['collection'], 'datasets')
+            self.assertEqual(paths[3]['status'], 404)
+            self.assertEqual(paths[4]['status'], 400)
+            self.assertEqual(paths[5]['status'], 404)  # external link
+            self.assertEqual(paths[6]['status'], 404)  # dangling soft link
+            
+    def testPostSoftLink(self):
+        domain = 'tall_updated.' + config.get('domain')
+        rootUUID = helper.getRootUUID(domain)
+        g1UUID = helper.getUUID(domain, rootUUID, 'g1')
+        g11UUID = helper.getUUID(domain, g1UUID, 'g1.1')
+        dset111UUID = helper.getUUID(domain, g11UUID, 'dset1.1.1')
+        req = self.endpoint + "/paths"
+        headers = {'host': domain}
+        payload = {'h5paths': ['/pathtest_link/dset1.1.1']}
+        rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.assertEqual(json.loads(rsp.text)['paths'][0]['status'], 404)
+        
+        # soft links are followed
+        linkReq = self.endpoint + "/groups/" + rootUUID + "/links/pathtest_link"
+        rsp = requests.put(linkReq, data=json.dumps({"h5path": "/g1/g1.1"}), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201)
+        rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.assertEqual(json.loads(rsp.text)['paths'][0]['id'], dset111UUID)
+        
+        # not found once the link is removed
+        rsp = requests.delete(linkReq, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.assertEqual(json.loads(rsp.text)['paths'][0]['status'], 404)
+        
+    def testPostBadRequest(self):
+        domain = 'tall.' + config.get('domain')   
+        req = self.endpoint + "/paths"
+        headers = {'host': domain}
+        for payload in ({}, {'h5paths': '/g1'}, {'ids': ['/g1']}):
+            rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+            self.failUnlessEqual(rsp.status_code, 400)
+        
+if __name__ == '__main__':
+    unittest.main()
@@ -30,6 +30,39 @@ class RootTest(unittest.TestCase):
         rspJson = json.loads(rsp.text)
         helper.validateId(rspJson["root"])
         
+    def testGetExport(self):
+        domain = 'tall.' + config.get('domain')   
+        rootUUID = helper.getRootUUID(domain)
+        req = self.endpoint + "/"
+        headers = {'host': domain}
+        params = {'Export': 1}
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.failUnlessEqual(rsp.headers['content-type'], 'application/json')
+        rspJson = json.loads(rsp.text)
+        self.assertEqual(rspJson['root'], rootUUID)
+        self.assertEqual(len(rspJson['groups']), 6)
+        self.assertEqual(len(rspJson['datasets']), 4)
+        root = rspJson['groups'][rootUUID]
+        self.assertEqual(len(root['links']), 2)
+        self.assertEqual(len(root['attributes']), 2)
+        self.assertTrue('value' in root['attributes'][0])
+        for dset in rspJson['datasets'].values():
+            self.assertTrue('value' in dset)
+        
+        # just the root group, no values
+        params = {'Export': 1, 'Depth': 0, 'Values': 'none'}
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rspJson = json.loads(rsp.text)
+        self.assertEqual(len(rspJson['groups']), 1)
+        self.assertTrue('datasets' not in rspJson)
+        self.assertTrue('value' not in rspJson['groups'][rootUUID]['attributes'][0])
+        
+        params = {'Export': 1, 'Depth': -1}
+        rsp = requests.get(req, headers=headers, params=params)
+        self.failUnlessEqual(rsp.status_code, 400)
+        
     def testGetReadOnly(self):
         domain = 'tall_ro.' + config.get('domain')    
         req = self.endpoint + "/"
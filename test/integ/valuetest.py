@@ -14,6 +14,8 @@ import config
 import helper
 import unittest
 import json
+import time
+import numpy as np
 
 class ValueTest(unittest.TestCase):
     def __init__(self, *args, **kwargs):
@@ -230,6 +232,90 @@ class ValueTest(unittest.TestCase):
         self.assertEqual(data, ["hello",])
         
         
+    def testGetNotModified(self):
+        domain = 'tall.' + config.get('domain') 
+        rootUUID = helper.getRootUUID(domain)
+        g1UUID = helper.getUUID(domain, rootUUID, 'g1')
+        g11UUID = helper.getUUID(domain, g1UUID, 'g1.1')
+        dset112UUID = helper.getUUID(domain, g11UUID, 'dset1.1.2') 
+        # validators aren't sent for resources modified in the last second
+        time.sleep(2)
+        req = helper.getEndpoint() + "/datasets/" + dset112UUID + "/value?select=[0:5]"
+        headers = {'host': domain}
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        etag = rsp.headers['ETag']
+        self.assertTrue('Last-Modified' in rsp.headers)
+        headers = {'host': domain, 'If-None-Match': etag}
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 304)
+        self.assertEqual(len(rsp.content), 0)
+        # different selection
+        req = helper.getEndpoint() + "/datasets/" + dset112UUID + "/value?select=[0:6]"
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        
+        # metadata
+        req = helper.getEndpoint() + "/groups/" + g1UUID
+        headers = {'host': domain}
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        headers['If-Modified-Since'] = rsp.headers['Last-Modified']
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 304)
+        
+        # unknown objects are not found rather than not modified
+        badUUID = 'dff53814-2906-11e3-9e5b-3c15c2da029e'
+        for uri in ("/groups/" + badUUID + "/links", "/groups/" + badUUID + "/attributes"):
+            rsp = requests.get(helper.getEndpoint() + uri, headers=headers)
+            self.failUnlessEqual(rsp.status_code, 404)
+        
+    def testGetBinary(self):
+        domain = 'tall.' + config.get('domain')
+        headers = {'host': domain, 'Accept': 'application/octet-stream'}
+        rootUUID = helper.getRootUUID(domain)
+        g1UUID = helper.getUUID(domain, rootUUID, 'g1')
+        g11UUID = helper.getUUID(domain, g1UUID, 'g1.1')
+        dset111UUID = helper.getUUID(domain, g11UUID, 'dset1.1.1')
+        req = helper.getEndpoint() + "/datasets/" + dset111UUID + "/value"
+        req += "?dim1_start=2&dim1_stop=5"
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.assertEqual(rsp.headers['Content-Type'], 'application/octet-stream')
+        self.assertEqual(rsp.headers['X-Dtype'], '<i4')
+        shape = json.loads(rsp.headers['X-Shape'])
+        self.assertEqual(shape, [3, 10])
+        data = np.frombuffer(rsp.content, dtype='<i4').reshape(shape)
+        for i in range(3):
+            for j in range(10):
+                self.assertEqual(data[i, j], (i+2)*j)
+                
+        # compound type
+        domain = 'compound.' + config.get('domain')
+        headers['host'] = domain
+        root_uuid = helper.getRootUUID(domain)
+        dset_uuid = helper.getUUID(domain, root_uuid, 'dset')
+        req = helper.getEndpoint() + "/datasets/" + dset_uuid + "/value"
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.assertEqual(rsp.headers['Content-Type'], 'application/octet-stream')
+        descr = json.loads(rsp.headers['X-Dtype'])
+        dt = np.dtype([(str(field[0]), str(field[1])) for field in descr])
+        data = np.frombuffer(rsp.content, dtype=dt)
+        self.failUnlessEqual(len(data), 72)
+        self.failUnlessEqual(data[0][0], 24)
+        self.failUnlessEqual(data[0][1], "13:53")
+        
+        # vlen strings are returned as JSON
+        domain = 'vlen_string_dset.' + config.get('domain')
+        headers['host'] = domain
+        root_uuid = helper.getRootUUID(domain)
+        dset_uuid = helper.getUUID(domain, root_uuid, 'DS1')
+        req = helper.getEndpoint() + "/datasets/" + dset_uuid + "/value"
+        rsp = requests.get(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        self.assertEqual(rsp.headers['Content-Type'], 'application/json')
+        
     def testGetCompound(self):
         domain = 'compound.' + config.get('domain')  
         root_uuid = helper.getRootUUID(domain)
@@ -527,6 +613,52 @@ class ValueTest(unittest.TestCase):
         readData = helper.readDataset(domain, dset2UUID)
         self.failUnlessEqual(readData, data)  # verify we got back what we started with
         
+    def testPutPoints(self):
+        # create domain
+        domain = 'valueputpoints.datasettest.' + config.get('domain')
+        req = self.endpoint + "/"
+        headers = {'host': domain}
+        rsp = requests.put(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201) # creates domain
+        
+        #create 2d dataset
+        payload = {'type': 'H5T_STD_I32LE', 'shape': [10, 10]}
+        req = self.endpoint + "/datasets"
+        rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201)  # create dataset
+        rspJson = json.loads(rsp.text)
+        dsetUUID = rspJson['id']
+        self.assertTrue(helper.validateId(dsetUUID))
+        
+        # write the diagonal in one request
+        req = self.endpoint + "/datasets/" + dsetUUID + "/value"
+        points = []
+        values = []
+        for i in range(10):
+            points.append([i, i])
+            values.append(i + 1)
+        payload = {'points': points, 'value': values}
+        rsp = requests.put(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        
+        # number of values doesn't match number of points
+        payload = {'points': points, 'value': values[1:]}
+        rsp = requests.put(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 400)
+        
+        # out of range point
+        payload = {'points': [[10, 0]], 'value': [1]}
+        rsp = requests.put(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 400)
+        
+        readData = helper.readDataset(domain, dsetUUID)
+        for i in range(10):
+            for j in range(10):
+                if i == j:
+                    self.failUnlessEqual(readData[i][j], i + 1)
+                else:
+                    self.failUnlessEqual(readData[i][j], 0)
+        
     def testPutSelection(self):
         # create domain
         domain = 'valueputsel.datasettest.' + config.get('domain')
@@ -566,6 +698,78 @@ class ValueTest(unittest.TestCase):
         # read back the data
         readData = helper.readDataset(domain, dset1UUID)
         self.failUnlessEqual(readData, data)  # verify we got back what we started with
+        
+    def testPutBinary(self):
+        # create domain
+        domain = 'valueputbinary.datasettest.' + config.get('domain')
+        req = self.endpoint + "/"
+        headers = {'host': domain}
+        rsp = requests.put(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201) # creates domain
+        
+        #create 2d dataset (big-endian, to check byte order conversion)
+        payload = {'type': 'H5T_IEEE_F64BE', 'shape': [4, 6]}
+        req = self.endpoint + "/datasets"
+        rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201)  # create dataset
+        rspJson = json.loads(rsp.text)
+        dset1UUID = rspJson['id']
+        self.assertTrue(helper.validateId(dset1UUID))
+        
+        # write rows 1-2
+        req = self.endpoint + "/datasets/" + dset1UUID + "/value"
+        data = np.arange(12, dtype='<f8').reshape((2, 6))
+        headers = {'host': domain, 'Content-Type': 'application/octet-stream'}
+        rsp = requests.put(req + "?dim1_start=1&dim1_stop=3", data=data.tostring(),
+            headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        
+        # wrong number of bytes for the selection
+        rsp = requests.put(req + "?dim1_start=0&dim1_stop=3", data=data.tostring(),
+            headers=headers)
+        self.failUnlessEqual(rsp.status_code, 400)
+        
+        # read back the data
+        readData = helper.readDataset(domain, dset1UUID)
+        self.failUnlessEqual(readData[0], [0.0,]*6)
+        self.failUnlessEqual(readData[1], data[0].tolist())
+        self.failUnlessEqual(readData[2], data[1].tolist())
+        self.failUnlessEqual(readData[3], [0.0,]*6)
+        
+    def testGetStreaming(self):
+        # create domain
+        domain = 'valuestream.datasettest.' + config.get('domain')
+        req = self.endpoint + "/"
+        headers = {'host': domain}
+        rsp = requests.put(req, headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201) # creates domain
+        
+        # create dataset larger than the server's stream_threshold (16MB)
+        nrows = 3000
+        ncols = 1000
+        payload = {'type': 'H5T_IEEE_F64LE', 'shape': [nrows, ncols]}
+        req = self.endpoint + "/datasets"
+        rsp = requests.post(req, data=json.dumps(payload), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 201)  # create dataset
+        rspJson = json.loads(rsp.text)
+        dsetUUID = rspJson['id']
+        
+        req = self.endpoint + "/datasets/" + dsetUUID + "/value"
+        data = np.arange(nrows * ncols, dtype='<f8').reshape((nrows, ncols))
+        headers = {'host': domain, 'Content-Type': 'application/octet-stream'}
+        rsp = requests.put(req, data=data.tostring(), headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        
+        # read back as JSON (streamed in blocks)
+        headers = {'host': domain}
+        rsp = requests.get(req + "?dim1_step=2", headers=headers)
+        self.failUnlessEqual(rsp.status_code, 200)
+        rspJson = json.loads(rsp.text)
+        self.assertTrue('hrefs' in rspJson)
+        value = rspJson['value']
+        self.failUnlessEqual(len(value), nrows // 2)
+        for i in (0, 1, 749, nrows // 2 - 1):
+            self.failUnlessEqual(value[i], data[2*i].tolist())
              
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
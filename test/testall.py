@@ -12,9 +12,12 @@
 
 import os
 
-unit_tests = ('timeUtilTest', 'fileUtilTest', 'hdf5dtypeTest', 'hdf5dbTest')
+unit_tests = ('timeUtilTest', 'fileUtilTest', 'hdf5dtypeTest', 'hdf5dbTest', 'dbPoolTest',
+    'dbIndexTest', 'cursorUtilTest', 'timeStampsTest', 'responseCacheTest',
+    'contentEncodingTest', 'acceptUtilTest')
 integ_tests = ('roottest', 'grouptest', 'linktest', 'datasettest', 'valuetest',
-    'attributetest', 'datatypetest', 'shapetest', 'datasettypetest', 'spidertest')
+    'attributetest', 'datatypetest', 'shapetest', 'datasettypetest', 'spidertest',
+    'batchtest', 'pathtest')
 #
 # Run all h5serv tests
 #
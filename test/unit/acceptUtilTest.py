@@ -0,0 +1,51 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import sys
+ 
+
+sys.path.append('../../server')
+from acceptUtil import parseAccept, prefersBinary
+
+
+class AcceptUtilTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(AcceptUtilTest, self).__init__(*args, **kwargs)
+        # main
+        
+    def testParseAccept(self):
+        ranges = parseAccept('application/json; q=0.5, Application/Octet-Stream, */*;q=0.1')
+        self.assertEqual(ranges, [('application', 'json', 0.5), 
+            ('application', 'octet-stream', 1.0), ('*', '*', 0.1)])
+        self.assertEqual(parseAccept('bogus, text/*'), [('text', '*', 1.0)])
+        
+    def testPrefersBinary(self):
+        self.assertFalse(prefersBinary(''))
+        self.assertFalse(prefersBinary('*/*'))
+        self.assertFalse(prefersBinary('application/json'))
+        self.assertTrue(prefersBinary('application/octet-stream'))
+        self.assertTrue(prefersBinary('application/octet-stream, */*'))
+        self.assertTrue(prefersBinary('application/*, application/json;q=0.5'))
+        # not acceptable
+        self.assertFalse(prefersBinary('application/octet-stream;q=0'))
+        self.assertFalse(prefersBinary('application/octet-stream;q=0, */*'))
+        # json preferred, or no preference
+        self.assertFalse(prefersBinary('application/octet-stream;q=0.5, application/json'))
+        self.assertFalse(prefersBinary('application/octet-stream, application/json'))
+        self.assertFalse(prefersBinary('application/*, */*'))
+        self.assertTrue(prefersBinary('application/octet-stream;q=0.9, application/json;q=0.8'))
+                                    
+    
+if __name__ == '__main__':
+    #setup test files
+    
+    unittest.main()
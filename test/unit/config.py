@@ -13,7 +13,9 @@ cfg = {
     'testfiledir': '../../testfiles/',
     'domain':  'unit.hdf.io',
     'datapath': '../data/',
-    'uuidlen':  36 
+    'uuidlen':  36,
+    'compress_level': 6,
+    'compress_min_size': 1024
 }
    
 def get(x):
@@ -0,0 +1,86 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import sys
+import zlib
+from tornado.httputil import HTTPHeaders, HTTPServerRequest
+
+sys.path.append('../../server')
+from contentEncoding import getContentEncoding, CompressContentEncoding
+
+
+class ContentEncodingTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(ContentEncodingTest, self).__init__(*args, **kwargs)
+
+    def getTransform(self, acceptEncoding):
+        headers = HTTPHeaders({'Accept-Encoding': acceptEncoding})
+        request = HTTPServerRequest(method='GET', uri='/', headers=headers)
+        return CompressContentEncoding(request)
+
+    def testGetContentEncoding(self):
+        self.assertEqual(getContentEncoding(None), None)
+        self.assertEqual(getContentEncoding(''), None)
+        self.assertEqual(getContentEncoding('gzip'), 'gzip')
+        self.assertEqual(getContentEncoding('deflate, gzip'), 'gzip')
+        self.assertEqual(getContentEncoding('deflate'), 'deflate')
+        self.assertEqual(getContentEncoding('gzip;q=0.5, deflate'), 'deflate')
+        self.assertEqual(getContentEncoding('gzip;q=0, deflate;q=0'), None)
+        self.assertEqual(getContentEncoding('*'), 'gzip')
+        self.assertEqual(getContentEncoding('identity'), None)
+        self.assertEqual(getContentEncoding('br, GZIP'), 'gzip')
+
+    def testCompress(self):
+        # e.g. a dataset value with repeated rows
+        row = '[' + ', '.join([str(i) for i in range(10)]) + ']'
+        body = '{"value": [' + ', '.join([row] * 1000) + ']}'
+        transform = self.getTransform('gzip')
+        headers = HTTPHeaders({'Content-Type': 'application/json', 
+            'Content-Length': str(len(body))})
+        (status, headers, chunk) = transform.transform_first_chunk(200, headers, body, True)
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Content-Length'], str(len(chunk)))
+        self.assertTrue('Accept-Encoding' in headers['Vary'])
+        self.assertTrue(len(chunk) < len(body) / 3)
+        self.assertEqual(zlib.decompress(chunk, 16 + zlib.MAX_WBITS), body)
+
+        # small responses aren't compressed
+        transform = self.getTransform('gzip')
+        headers = HTTPHeaders({'Content-Type': 'application/json'})
+        (status, headers, chunk) = transform.transform_first_chunk(200, headers, '{}', True)
+        self.assertTrue('Content-Encoding' not in headers)
+        self.assertEqual(chunk, '{}')
+
+        # binary responses aren't compressed
+        transform = self.getTransform('gzip')
+        headers = HTTPHeaders({'Content-Type': 'application/octet-stream'})
+        (status, headers, chunk) = transform.transform_first_chunk(200, headers, body, True)
+        self.assertTrue('Content-Encoding' not in headers)
+
+    def testStream(self):
+        transform = self.getTransform('deflate')
+        headers = HTTPHeaders({'Content-Type': 'application/json'})
+        parts = ['{"value": [', '1, 2, 3', ', 4, 5', ']}']
+        (status, headers, chunk) = transform.transform_first_chunk(200, headers, parts[0], False)
+        self.assertEqual(headers['Content-Encoding'], 'deflate')
+        decompressor = zlib.decompressobj()
+        # each chunk can be decoded as soon as it is received
+        self.assertEqual(decompressor.decompress(chunk), parts[0])
+        self.assertEqual(decompressor.decompress(transform.transform_chunk(parts[1], False)), parts[1])
+        self.assertEqual(decompressor.decompress(transform.transform_chunk(parts[2], False)), parts[2])
+        self.assertEqual(decompressor.decompress(transform.transform_chunk(parts[3], True)), parts[3])
+
+
+if __name__ == '__main__':
+    #setup test files
+
+    unittest.main()
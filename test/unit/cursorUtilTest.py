@@ -0,0 +1,47 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import errno
+import sys
+ 
+
+sys.path.append('../../server')
+from cursorUtil import encodeCursor, decodeCursor
+
+
+class CursorUtilTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(CursorUtilTest, self).__init__(*args, **kwargs)
+        # main
+        
+    def testEncodeDecode(self):
+        cursor = encodeCursor(1000, 'dset:1000')
+        self.assertEqual(decodeCursor(cursor), (1000, 'dset:1000'))
+        cursor = encodeCursor(2, u'\u03b1')
+        self.assertEqual(decodeCursor(cursor), (2, u'\u03b1'.encode('utf-8')))
+        
+    def testBadCursor(self):
+        for cursor in ('xyz', encodeCursor(0, 'a'), 'bm9jb2xvbg=='):
+            got_exception = False
+            try:
+                decodeCursor(cursor)
+            except IOError as ioe:
+                got_exception = True
+                self.assertEqual(ioe.errno, errno.EBADMSG)
+            self.assertTrue(got_exception)
+        
+            
+             
+if __name__ == '__main__':
+    #setup test files
+    
+    unittest.main()
@@ -0,0 +1,144 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import sys
+import os
+import uuid
+import logging
+import h5py
+
+sys.path.append('../../server')
+from dbIndex import createIndex, openIndex, migrateIndex, IndexCache
+
+
+class DbIndexTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(DbIndexTest, self).__init__(*args, **kwargs)
+        self.logger = logging.getLogger()
+        self.logger.setLevel(logging.INFO)
+
+    def createFile(self, filePath, indexFormat):
+        f = h5py.File(filePath, 'w')
+        dbGrp = f.create_group("__db__")
+        for col_name in ("{groups}", "{datasets}", "{datatypes}"):
+            dbGrp.create_group(col_name)
+        index = createIndex(dbGrp, f, False, self.logger, indexFormat)
+        return (f, index)
+
+    def testTableIndex(self):
+        (f, index) = self.createFile('index_table.h5', 'table')
+        target = f.create_group('g1')
+        addr = h5py.h5o.get_info(target.id).addr
+        ids = []
+        # add more entries than the initial hash table size to force rehashes
+        for i in range(3000):
+            obj_uuid = str(uuid.uuid1())
+            ids.append(obj_uuid)
+            index.addObject("groups", obj_uuid, target, addr + 1000 + i)
+        self.assertEqual(index.getCount("groups"), 3000)
+        self.assertEqual(index.getCount("datasets"), 0)
+        for i in (0, 1, 1234, 2999):
+            self.assertEqual(index.getUUID(addr + 1000 + i), ids[i])
+            self.assertEqual(index.getCollectionType(ids[i]), "groups")
+            self.assertEqual(index.getObject("groups", ids[i]), target)
+            self.assertEqual(index.getObject("datasets", ids[i]), None)
+        self.assertEqual(index.getUUID(addr), None)
+        self.assertEqual(index.getCollectionType(str(uuid.uuid1())), None)
+        self.assertEqual(index.getCollectionType('not-a-uuid'), None)
+
+        self.assertTrue(index.removeObject("groups", ids[5], addr + 1005))
+        self.assertFalse(index.removeObject("groups", ids[5], addr + 1005))
+        self.assertEqual(index.getUUID(addr + 1005), None)
+        self.assertEqual(index.getCollectionType(ids[5]), None)
+        self.assertEqual(index.getUUID(addr + 1006), ids[6])
+        self.assertEqual(index.getCount("groups"), 2999)
+        uuids = index.getUUIDs("groups")
+        self.assertEqual(len(uuids), 2999)
+        self.assertTrue(ids[5] not in uuids)
+        f.close()
+
+        # re-open
+        f = h5py.File('index_table.h5', 'r+')
+        index = openIndex(f['__db__'], f, False, self.logger)
+        self.assertEqual(index.format, "table")
+        self.assertEqual(index.getUUID(addr + 2000), ids[1000])
+        f.close()
+
+    def testIndexCache(self):
+        (f, index) = self.createFile('index_cache.h5', 'table')
+        cache = IndexCache(index)
+        g1 = f.create_group('g1')
+        g1Uuid = str(uuid.uuid1())
+        g1Addr = h5py.h5o.get_info(g1.id).addr
+        index.addObject("groups", g1Uuid, g1, g1Addr)  # not through the cache
+        self.assertEqual(cache.getUUID(g1Addr), g1Uuid)
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.getUUID(g1Addr), g1Uuid)
+        self.assertEqual(cache.getObject("groups", g1Uuid), g1)
+        self.assertEqual(cache.getCollectionType(g1Uuid), "groups")
+        self.assertEqual(cache.getObject("datasets", g1Uuid), None)
+        self.assertEqual(cache.hits, 3)
+        self.assertEqual(cache.misses, 2)
+
+        g2 = f.create_group('g2')
+        g2Uuid = str(uuid.uuid1())
+        g2Addr = h5py.h5o.get_info(g2.id).addr
+        cache.addObject("groups", g2Uuid, g2, g2Addr)
+        self.assertEqual(cache.getUUID(g2Addr), g2Uuid)
+        self.assertEqual(cache.getObject("groups", g2Uuid), g2)
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(index.getUUID(g2Addr), g2Uuid)  # written through
+
+        self.assertTrue(cache.removeObject("groups", g2Uuid, g2Addr))
+        self.assertEqual(cache.getUUID(g2Addr), None)
+        self.assertEqual(cache.getObject("groups", g2Uuid), None)
+
+        # a size limit clears the cache when exceeded
+        cache = IndexCache(index, maxEntries=2)
+        cache.getUUID(g1Addr)
+        cache.getEntry(g1Uuid)
+        self.assertEqual(len(cache.uuidMap) + len(cache.addrMap), 2)
+        cache.getEntry(g1Uuid)
+        cache.clear()
+        self.assertEqual(len(cache.uuidMap), 0)
+        f.close()
+
+    def testMigrate(self):
+        (f, index) = self.createFile('index_migrate.h5', 'attrs')
+        self.assertEqual(index.format, "attrs")
+        dbGrp = f['__db__']
+        g1 = f.create_group('g1')
+        g1Uuid = str(uuid.uuid1())
+        index.addObject("groups", g1Uuid, g1, h5py.h5o.get_info(g1.id).addr)
+        dset = dbGrp["{datasets}"].create_dataset("anon", (10,), dtype='i4')
+        dsetUuid = str(uuid.uuid1())
+        # anonymous objects are hard linked by uuid
+        dbGrp["{datasets}"][dsetUuid] = dset
+        del dbGrp["{datasets}"]["anon"]
+        dsetAddr = h5py.h5o.get_info(dset.id).addr
+        index.addObject("datasets", dsetUuid, dset, dsetAddr, anonymous=True)
+
+        index = migrateIndex(dbGrp, f, False, self.logger)
+        self.assertEqual(index.format, "table")
+        self.assertTrue("{addr}" not in dbGrp)
+        self.assertEqual(len(dbGrp["{groups}"].attrs), 0)
+        self.assertEqual(index.getObject("groups", g1Uuid), g1)
+        self.assertEqual(index.getUUID(dsetAddr), dsetUuid)
+        self.assertEqual(index.getObject("datasets", dsetUuid), dset)
+        self.assertTrue(dsetUuid in dbGrp["{datasets}"])  # still hard linked
+        f.close()
+
+
+if __name__ == '__main__':
+    #setup test files
+
+    unittest.main()
@@ -0,0 +1,232 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import sys
+import os
+import time
+import os.path as op
+import stat
+import logging
+import shutil
+import threading
+import subprocess
+
+sys.path.append('../../server')
+from dbPool import DbPool, FileLock
+import config
+
+
+def getFile(name, tgt=None):
+    src = config.get('testfiledir') + name
+    if not tgt:
+        tgt = name
+    if op.isfile(tgt):
+        # make sure it's writable, before we copy over it
+        os.chmod(tgt, stat.S_IWRITE|stat.S_IREAD)
+    shutil.copyfile(src, tgt)
+
+
+class DbPoolTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(DbPoolTest, self).__init__(*args, **kwargs)
+        # main
+        getFile('tall.h5', 'tall_pool.h5')
+        getFile('tall.h5', 'tall_pool2.h5')
+        getFile('tall.h5', 'tall_pool3.h5')
+        self.logger = logging.getLogger()
+        self.logger.setLevel(logging.INFO)
+
+    def testReuse(self):
+        pool = DbPool(maxOpen=4, idleTimeout=0)
+        with pool.getDb('tall_pool.h5') as db:
+            db1 = db
+            rootUuid = db.getUUIDByPath('/')
+        with pool.getDb('tall_pool.h5') as db:
+            self.assertTrue(db is db1)  # same instance
+            self.assertEqual(db.getUUIDByPath('/'), rootUuid)
+        self.assertEqual(pool.getNumOpen(), 1)
+        pool.closeAll()
+        self.assertEqual(pool.getNumOpen(), 0)
+
+    def testEviction(self):
+        pool = DbPool(maxOpen=2, idleTimeout=0)
+        for name in ('tall_pool.h5', 'tall_pool2.h5', 'tall_pool3.h5'):
+            with pool.getDb(name) as db:
+                db.getUUIDByPath('/')
+        self.assertEqual(pool.getNumOpen(), 2)
+        # least recently used file should have been closed
+        self.assertTrue(pool.getKey('tall_pool.h5') not in pool.entries)
+        pool.closeAll()
+
+    def testIdleTimeout(self):
+        pool = DbPool(maxOpen=4, idleTimeout=1)
+        with pool.getDb('tall_pool.h5') as db:
+            db.getUUIDByPath('/')
+        self.assertEqual(pool.getNumOpen(), 1)
+        time.sleep(1.5)
+        pool.evict()
+        self.assertEqual(pool.getNumOpen(), 0)
+
+    def testInvalidate(self):
+        pool = DbPool(maxOpen=4, idleTimeout=0)
+        with pool.getDb('tall_pool.h5') as db:
+            db1 = db
+            # invalidate while in use - should be closed on release
+            pool.invalidate('tall_pool.h5')
+            self.assertEqual(pool.getNumOpen(), 0)
+            db.getUUIDByPath('/g1')  # still usable
+        with pool.getDb('tall_pool.h5') as db:
+            self.assertTrue(db is not db1)
+        pool.closeAll()
+
+    def testExternalModification(self):
+        pool = DbPool(maxOpen=4, idleTimeout=0)
+        with pool.getDb('tall_pool2.h5') as db:
+            db1 = db
+            g1Uuid = db.getUUIDByPath('/g1')
+        # update modification time as if another process wrote the file
+        now = time.time()
+        os.utime('tall_pool2.h5', (now + 10, now + 10))
+        with pool.getDb('tall_pool2.h5') as db:
+            self.assertTrue(db is not db1)   # re-opened
+            self.assertEqual(db.getUUIDByPath('/g1'), g1Uuid)
+        pool.closeAll()
+
+    def testPoolUpdates(self):
+        # changes made through the pool should not cause a re-open
+        pool = DbPool(maxOpen=4, idleTimeout=0)
+        with pool.getDb('tall_pool3.h5') as db:
+            db1 = db
+            grpUuid = db.createGroup()
+        with pool.getDb('tall_pool3.h5') as db:
+            self.assertTrue(db is db1)
+            self.assertNotEqual(db.getGroupObjByUuid(grpUuid), None)
+        pool.closeAll()
+
+    def testThreads(self):
+        # calls for the same file from different threads are serialized
+        pool = DbPool(maxOpen=4, idleTimeout=0)
+        state = {'inUse': 0, 'overlap': False, 'count': 0}
+        def worker():
+            for i in range(20):
+                with pool.getDb('tall_pool.h5') as db:
+                    state['inUse'] += 1
+                    if state['inUse'] > 1:
+                        state['overlap'] = True
+                    db.getUUIDByPath('/g1')
+                    time.sleep(0.001)
+                    state['count'] += 1
+                    state['inUse'] -= 1
+        threads = [threading.Thread(target=worker) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertFalse(state['overlap'])
+        self.assertEqual(state['count'], 80)
+        self.assertEqual(pool.getNumOpen(), 1)
+        pool.closeAll()
+
+    def testMultiProcess(self):
+        getFile('tall.h5', 'tall_pool3.h5')
+        if op.isfile('.tall_pool3.h5.lock'):
+            os.remove('.tall_pool3.h5.lock')
+        pool = DbPool(maxOpen=4, idleTimeout=0, multiProcess=True)
+        with pool.getDb('tall_pool3.h5') as db:
+            g1Uuid = db.getUUIDByPath('/g1')  # initializes the file
+        self.assertTrue(op.isfile('.tall_pool3.h5.lock'))
+        # files aren't kept open, other processes may modify them
+        self.assertEqual(pool.getNumOpen(), 0)
+        self.assertTrue(pool.isUpdateFree('tall_pool3.h5'))
+        with pool.getDb('tall_pool3.h5', update=False) as db:
+            # reads use a shared lock
+            fileLock = FileLock('tall_pool3.h5')
+            self.assertEqual(fileLock.acquire(shared=True), 1)
+            fileLock.release()
+            self.assertEqual(db.getUUIDByPath('/g1'), g1Uuid)
+        with pool.getDb('tall_pool3.h5') as db:
+            db.createGroup()
+        fileLock = FileLock('tall_pool3.h5')
+        self.assertEqual(fileLock.acquire(), 2)
+        fileLock.release()
+        pool.closeAll()
+
+    def runProcess(self, lines):
+        # run the code in another (server) process, returns its output
+        script = '\n'.join(["import sys", "sys.path.append('../../server')",
+            "from dbPool import DbPool",
+            "pool = DbPool(multiProcess=True)"] + lines)
+        proc = subprocess.Popen([sys.executable, '-c', script],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        (out, err) = proc.communicate()
+        self.assertEqual(proc.returncode, 0, err)
+        return out.split()
+
+    def testSecondProcess(self):
+        getFile('tall.h5', 'tall_pool5.h5')
+        if op.isfile('.tall_pool5.h5.lock'):
+            os.remove('.tall_pool5.h5.lock')
+        pool = DbPool(maxOpen=4, idleTimeout=0, multiProcess=True)
+        with pool.getDb('tall_pool5.h5') as db:
+            g1Uuid = db.getUUIDByPath('/g1')  # initializes the file
+        with pool.getDb('tall_pool5.h5', update=False) as db:
+            # another process can read the file while we have it open
+            out = self.runProcess(["from hdf5db import Hdf5db",
+                "with Hdf5db('tall_pool5.h5') as db:",
+                "    print db.getUUIDByPath('/g1')"])
+            self.assertEqual(out, [g1Uuid])
+        # and update it when we're done
+        out = self.runProcess(["with pool.getDb('tall_pool5.h5') as db:",
+            "    print db.createGroup()"])
+        grpUuid = out[0]
+        with pool.getDb('tall_pool5.h5', update=False) as db:
+            self.assertEqual(db.getGroupItemByUuid(grpUuid)['id'], grpUuid)
+            self.assertEqual(db.getUUIDByPath('/g1'), g1Uuid)
+        fileLock = FileLock('tall_pool5.h5')
+        self.assertEqual(fileLock.acquire(), 2)
+        fileLock.release()
+        pool.closeAll()
+
+    def testChunkCacheSettings(self):
+        getFile('resizable.h5', 'resizable_pool.h5')
+        with open('.resizable_pool.h5.json', 'w') as f:
+            f.write('{"chunk_cache": {"size": 4194304, ' + 
+                '"datasets": {"/resizable_2d": {"size": 2097152, "slots": 521}}}}')
+        pool = DbPool(maxOpen=4, idleTimeout=0, datasetCacheSize=4,
+            chunkCache={'size': 1048576, 'slots': 1009, 'w0': 0.5})
+        with pool.getDb('resizable_pool.h5') as db:
+            # file default from the pool, size from the settings file
+            (mdc, nslots, nbytes, w0) = db.f.id.get_access_plist().get_cache()
+            self.assertEqual(nslots, 1009)
+            self.assertEqual(nbytes, 4194304)
+            self.assertEqual(w0, 0.5)
+            dsetUuid = db.getUUIDByPath('/resizable_2d')  # chunked dataset
+            dset = db.getDatasetObjByUuid(dsetUuid)
+            (nslots, nbytes, w0) = dset.id.get_access_plist().get_chunk_cache()
+            self.assertEqual(nslots, 521)
+            self.assertEqual(nbytes, 2097152)
+            # dataset is kept open
+            self.assertTrue(db.getDatasetObjByUuid(dsetUuid) is dset)
+            stats = db.getCacheStats()
+            self.assertEqual(stats['datasetHits'], 1)
+            self.assertEqual(stats['datasetMisses'], 1)
+        stats = pool.getCacheStats()[pool.getKey('resizable_pool.h5')]
+        self.assertEqual(stats['datasetHits'], 1)
+        self.assertEqual(stats['datasetReuseRatio'], 0.5)
+        pool.closeAll()
+        os.remove('.resizable_pool.h5.json')
+
+
+if __name__ == '__main__':
+    #setup test files
+
+    unittest.main()
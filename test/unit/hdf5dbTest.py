@@ -13,10 +13,12 @@ import unittest
 import sys
 import os
 import errno
+import uuid
 import os.path as op
 import stat
 import logging
 import shutil
+import numpy as np
 
 sys.path.append('../../server')
 from hdf5db import Hdf5db
@@ -74,6 +76,50 @@ class Hdf5dbTest(unittest.TestCase):
             g1 = db.getObjByPath('/g1')
             self.failUnlessEqual(obj, g1)
             
+    def testLazyIndex(self):
+        getFile('tall.h5', 'tall_lazy.h5')
+        g1Uuid = None
+        with Hdf5db('tall_lazy.h5', lazyIndex=True) as db:
+            g1Uuid = db.getUUIDByPath('/g1')
+            self.failUnlessEqual(len(g1Uuid), config.get('uuidlen'))
+            self.assertFalse(db.isIndexComplete())
+            g1links = db.getLinkItems(g1Uuid)
+            self.failUnlessEqual(len(g1links), 2)
+            for item in g1links:
+                self.failUnlessEqual(len(item['uuid']), config.get('uuidlen'))
+            # index one more object, then stop
+            self.assertFalse(db.completeIndex(maxItems=1))
+
+        # re-open and finish the index
+        with Hdf5db('tall_lazy.h5', lazyIndex=True) as db:
+            self.assertFalse(db.isIndexComplete())
+            self.assertEqual(db.getUUIDByPath('/g1'), g1Uuid)
+            self.assertTrue(db.completeIndex())
+            self.assertTrue(db.isIndexComplete())
+            self.failUnlessEqual(db.getNumberOfGroups(), 6)
+            self.failUnlessEqual(db.getNumberOfDatasets(), 4)
+
+        # uuids should be the same when opened without lazyIndex
+        with Hdf5db('tall_lazy.h5') as db:
+            self.assertEqual(db.getUUIDByPath('/g1'), g1Uuid)
+
+    def testAttrsIndexFormat(self):
+        getFile('tall.h5', 'tall_attrs.h5')
+        g1Uuid = None
+        with Hdf5db('tall_attrs.h5', indexFormat="attrs") as db:
+            g1Uuid = db.getUUIDByPath('/g1')
+            self.assertEqual(db.index.format, "attrs")
+            self.failUnlessEqual(db.getNumberOfGroups(), 6)
+            grpUuid = db.createGroup()
+            db.linkObject(g1Uuid, grpUuid, 'g1.3')
+            self.failUnlessEqual(db.getNumberOfGroups(), 7)
+
+        # existing files keep their layout
+        with Hdf5db('tall_attrs.h5') as db:
+            self.assertEqual(db.getUUIDByPath('/g1'), g1Uuid)  # inits the db
+            self.assertEqual(db.index.format, "attrs")
+            self.assertEqual(db.getUUIDByPath('/g1/g1.3'), grpUuid)
+
     def testGetCounts(self):
         with Hdf5db('tall.h5') as db:
             cnt = db.getNumberOfGroups()
@@ -98,7 +144,18 @@ class Hdf5dbTest(unittest.TestCase):
             g1Links = db.getLinkItems(g1uuid)
             self.failUnlessEqual(len(g1Links), 2)
             g11uuid = db.getUUIDByPath("/g1/g1.1")
+            self.assertTrue(db.getObjectModifiedTime("groups", g11uuid) > 0)
             db.deleteObjectByUuid("group", g11uuid)
+            try:
+                db.getObjectModifiedTime("groups", g11uuid)
+                self.assertTrue(False)  # expected exception
+            except IOError as e:
+                self.assertEqual(e.errno, errno.EIDRM)
+            try:
+                db.getObjectModifiedTime("groups", str(uuid.uuid1()))
+                self.assertTrue(False)  # expected exception
+            except IOError as e:
+                self.assertEqual(e.errno, errno.ENXIO)
             
     def testCreateGroup(self):
         # get test file
@@ -116,6 +173,49 @@ class Hdf5dbTest(unittest.TestCase):
             # verify linkObject can be called idempotent-ly 
             db.linkObject(rootUuid, newGrpUuid, 'g3')
             
+    def testMultipleLinks(self):
+        # get test file
+        getFile('tall.h5', 'tall_multilink.h5')
+        with Hdf5db('tall_multilink.h5') as db:
+            rootUuid = db.getUUIDByPath('/')
+            g1Uuid = db.getUUIDByPath('/g1')
+            newGrpUuid = db.createGroup()
+            newGrp = db.getGroupObjByUuid(newGrpUuid)
+            self.assertEqual(db.getNumLinksToObject(newGrp), 0)
+            db.linkObject(rootUuid, newGrpUuid, 'g3')
+            db.linkObject(g1Uuid, newGrpUuid, 'g3')
+            self.assertEqual(db.getNumLinksToObject(newGrp), 2)
+            db.unlinkItem(rootUuid, 'g3')
+            self.assertEqual(db.getNumLinksToObject(newGrp), 1)
+            db.linkObject(rootUuid, newGrpUuid, 'g4')
+            db.deleteObjectByUuid("group", newGrpUuid)
+            self.assertEqual(db.getGroupObjByUuid(newGrpUuid), None)
+            self.assertEqual(len(db.getLinkItems(rootUuid)), 2)
+            self.assertEqual(len(db.getLinkItems(g1Uuid)), 2)
+            
+    def testLinkTable(self):
+        # reverse link index is stored in the file and kept up to date
+        getFile('tall.h5', 'tall_linktable.h5')
+        with Hdf5db('tall_linktable.h5') as db:
+            rootUuid = db.getUUIDByPath('/')
+            newGrpUuid = db.createGroup()
+            newGrp = db.getGroupObjByUuid(newGrpUuid)
+            self.assertEqual(db.getNumLinksToObject(newGrp), 0)
+            self.assertTrue("{links}" in db.dbGrp)
+            db.linkObject(rootUuid, newGrpUuid, 'g3')
+            db.linkObject(rootUuid, newGrpUuid, 'g4')
+        with Hdf5db('tall_linktable.h5') as db:
+            newGrp = db.getGroupObjByUuid(newGrpUuid)
+            self.assertEqual(db.getNumLinksToObject(newGrp), 2)
+            g1 = db.getObjByPath('/g1')
+            self.assertEqual(db.getNumLinksToObject(g1), 1)
+            db.unlinkItem(rootUuid, 'g3')
+        with Hdf5db('tall_linktable.h5') as db:
+            newGrp = db.getGroupObjByUuid(newGrpUuid)
+            self.assertEqual(db.getNumLinksToObject(newGrp), 1)
+            db.deleteObjectByUuid("group", newGrpUuid)
+            self.assertEqual(len(db.getLinkItems(rootUuid)), 2)
+            
     def testGetLinkItemsBatch(self):
         # get test file
         getFile('group100.h5')
@@ -133,6 +233,34 @@ class Hdf5dbTest(unittest.TestCase):
                 marker = lastItem['title']
         self.assertEqual(count, 100)
         
+    def testGetLinkItemsCursor(self):
+        # get test file
+        getFile('group100.h5', 'group100_cursor.h5')
+        cursor = None
+        titles = []
+        with Hdf5db('group100_cursor.h5') as db:
+            rootUuid = db.getUUIDByPath('/')
+            while True:
+                (batch, cursor) = db.getLinkItemsPage(rootUuid, cursor=cursor, limit=13)
+                titles.extend([item['title'] for item in batch])
+                if cursor is None:
+                    break   # done!
+            self.assertEqual(len(titles), 100)
+            self.assertEqual(len(set(titles)), 100)
+            
+            # cursor is still valid after a link is removed from a previous page
+            (batch, cursor) = db.getLinkItemsPage(rootUuid, limit=10)
+            db.unlinkItem(rootUuid, batch[0]['title'])
+            (batch, cursor) = db.getLinkItemsPage(rootUuid, cursor=cursor, limit=10)
+            self.assertEqual(batch[0]['title'], titles[10])
+            
+            # collections
+            grpUuids = db.getCollection("groups")
+            (uuids, cursor) = db.getCollectionPage("groups", limit=7)
+            self.assertEqual(uuids, grpUuids[:7])
+            (uuids, cursor) = db.getCollectionPage("groups", cursor=cursor, limit=7)
+            self.assertEqual(uuids, grpUuids[7:14])
+        
     def testGetItemHardLink(self):
         with Hdf5db('tall.h5') as db:
             grpUuid = db.getUUIDByPath('/g1/g1.1')
@@ -211,6 +339,71 @@ class Hdf5dbTest(unittest.TestCase):
         self.assertEqual(externalLink['file'], 'somefile')
         
             
+    def testGetLinkTree(self):
+        getFile('tall.h5', 'tall_linktree.h5')
+        with Hdf5db('tall_linktree.h5') as db:
+            rootUuid = db.getUUIDByPath('/')
+            (items, truncated) = db.getLinkTree(rootUuid)
+            self.assertEqual(len(items), 2)
+            self.assertFalse(truncated)
+            (items, truncated) = db.getLinkTree(rootUuid, maxDepth=10)
+            self.assertEqual(len(items), 11)
+            self.assertEqual(items[-1]['title'], 'slink')
+            self.assertEqual(items[-1]['depth'], 4)
+            self.assertEqual(items[-1]['parent'], db.getUUIDByPath('/g1/g1.2/g1.2.1'))
+            (items, truncated) = db.getLinkTree(rootUuid, maxDepth=10, limit=5)
+            self.assertEqual(len(items), 5)
+            self.assertTrue(truncated)
+            
+            # a link back to the root group is returned but not followed
+            g121Uuid = db.getUUIDByPath('/g1/g1.2/g1.2.1')
+            db.linkObject(g121Uuid, rootUuid, 'back')
+            (items, truncated) = db.getLinkTree(rootUuid, maxDepth=10)
+            self.assertEqual(len(items), 12)
+            backLinks = [item for item in items if item['title'] == 'back']
+            self.assertEqual(len(backLinks), 1)
+            self.assertEqual(backLinks[0]['uuid'], rootUuid)
+            item = db.getLinkItemByUuid(g121Uuid, 'back')
+            self.assertEqual(item['uuid'], rootUuid)
+            self.assertEqual(item['collection'], 'groups')
+            
+    def testGetObjectItemByPath(self):
+        getFile('tall.h5', 'tall_pathlookup.h5')
+        with Hdf5db('tall_pathlookup.h5', pathCacheSize=10) as db:
+            rootUuid = db.getUUIDByPath('/')
+            g11Uuid = db.getUUIDByPath('/g1/g1.1')
+            item = db.getObjectItemByPath('/')
+            self.assertEqual(item['id'], rootUuid)
+            self.assertEqual(item['collection'], 'groups')
+            item = db.getObjectItemByPath('/g1/g1.1/dset1.1.1')
+            self.assertEqual(item['collection'], 'datasets')
+            self.assertEqual(item['id'], db.getUUIDByPath('/g1/g1.1/dset1.1.1'))
+            self.assertEqual(db.pathCacheMisses, 2)
+            item = db.getObjectItemByPath('/g1/g1.1/dset1.1.1')
+            self.assertEqual(db.pathCacheHits, 1)
+            for h5path in ('/nosuch', '/__db__', '/g1/g1.2/g1.2.1/slink'):
+                try:
+                    db.getObjectItemByPath(h5path)
+                    self.assertTrue(False)  # expected exception
+                except IOError as e:
+                    self.assertEqual(e.errno, errno.ENXIO)
+            try:
+                db.getObjectItemByPath('g1')
+                self.assertTrue(False)  # expected exception
+            except IOError as e:
+                self.assertEqual(e.errno, errno.EBADMSG)
+                
+            # soft links are followed, and the cache is cleared when links change
+            db.createSoftLink(rootUuid, '/g1/g1.1', 'sl')
+            item = db.getObjectItemByPath('/sl')
+            self.assertEqual(item['id'], g11Uuid)
+            db.unlinkItem(rootUuid, 'sl')
+            try:
+                db.getObjectItemByPath('/sl')
+                self.assertTrue(False)  # expected exception
+            except IOError as e:
+                self.assertEqual(e.errno, errno.ENXIO)
+            
     def testDeleteLink(self): 
         # get test file
         getFile('tall.h5', 'tall_grpdelete.h5')
@@ -286,6 +479,45 @@ class Hdf5dbTest(unittest.TestCase):
             for i in range(20):
                 self.assertEqual(d112_values[i], i)
                 
+    def testReadPointSelection(self):
+        getFile('tall.h5')
+        with Hdf5db('tall.h5') as db:
+            d111Uuid = db.getUUIDByPath('/g1/g1.1/dset1.1.1')
+            points = [[9, 9], [2, 3], [0, 0], [2, 3], [7, 1]]
+            values = db.getDatasetPointSelectionByUuid(d111Uuid, points)
+            # values should be in request order (including duplicates)
+            self.assertEqual(values, [81, 6, 0, 6, 7])
+            
+            d112Uuid = db.getUUIDByPath('/g1/g1.1/dset1.1.2')
+            values = db.getDatasetPointSelectionByUuid(d112Uuid, [19, 2, 11])
+            self.assertEqual(values, [19, 2, 11])
+            self.assertEqual(db.getDatasetPointSelectionByUuid(d112Uuid, []), [])
+            
+            for points in ([20,], [-1,], [[1, 2]]):
+                try:
+                    db.getDatasetPointSelectionByUuid(d112Uuid, points)
+                    self.assertTrue(False)  # expected exception
+                except IOError as e:
+                    self.assertEqual(e.errno, errno.EBADMSG)
+                
+    def testWritePointSelection(self):
+        getFile('tall.h5', 'tall_points.h5')
+        with Hdf5db('tall_points.h5') as db:
+            d112Uuid = db.getUUIDByPath('/g1/g1.1/dset1.1.2')
+            self.assertEqual(db.getModifyCount(d112Uuid), 0)
+            db.setDatasetPointSelectionByUuid(d112Uuid, [19, 0, 7], [-1, -2, -3])
+            self.assertEqual(db.getModifyCount(d112Uuid), 1)
+            values = db.getDatasetValuesByUuid(d112Uuid)
+            self.assertEqual(values[19], -1)
+            self.assertEqual(values[0], -2)
+            self.assertEqual(values[7], -3)
+            self.assertEqual(values[1], 1)
+            try:
+                db.setDatasetPointSelectionByUuid(d112Uuid, [1, 2], [5])
+                self.assertTrue(False)  # expected exception
+            except IOError as e:
+                self.assertEqual(e.errno, errno.EBADMSG)
+                
     def testReadZeroDimDataset(self):
          getFile('zerodim.h5')
          d111_values = None
@@ -297,6 +529,93 @@ class Hdf5dbTest(unittest.TestCase):
             self.assertEqual(type(dset_value), int)
             self.assertEqual(dset_value, 42)
             
+    def testCreateDatasetCreationProperties(self):
+        getFile('tall.h5', 'tall_dsetprops.h5')
+        with Hdf5db('tall_dsetprops.h5') as db:
+            creationProps = {'layout': {'class': 'H5D_CHUNKED', 'dims': [10, 25]},
+                'filters': [{'class': 'H5Z_FILTER_SHUFFLE'}, 
+                            {'class': 'H5Z_FILTER_DEFLATE', 'level': 7},
+                            {'class': 'H5Z_FILTER_FLETCHER32'}]}
+            dsetUuid = db.createDataset('H5T_STD_I32LE', (100, 100), max_shape=(None, 100),
+                creation_props=creationProps)
+            dset = db.getDatasetObjByUuid(dsetUuid)
+            self.assertEqual(dset.chunks, (10, 25))
+            self.assertEqual(dset.compression, 'gzip')
+            self.assertEqual(dset.compression_opts, 7)
+            self.assertTrue(dset.shuffle)
+            self.assertTrue(dset.fletcher32)
+            item = db.getDatasetItemByUuid(dsetUuid)
+            props = item['creationProperties']
+            self.assertEqual(props['layout'], {'class': 'H5D_CHUNKED', 'dims': [10, 25]})
+            filterClasses = [f['class'] for f in props['filters']]
+            self.assertEqual(filterClasses, ['H5Z_FILTER_SHUFFLE', 'H5Z_FILTER_DEFLATE',
+                'H5Z_FILTER_FLETCHER32'])
+            self.assertEqual(props['filters'][1]['level'], 7)
+            
+            # default is contiguous with no filters
+            dsetUuid = db.createDataset('H5T_STD_I32LE', (10,))
+            props = db.getDatasetItemByUuid(dsetUuid)['creationProperties']
+            self.assertEqual(props, {'layout': {'class': 'H5D_CONTIGUOUS'}})
+            
+            for badProps in ({'layout': {'class': 'H5D_CHUNKED', 'dims': [10]}},
+                    {'layout': {'class': 'H5D_CHUNKED', 'dims': [0, 10]}},
+                    {'layout': {'class': 'H5D_VIRTUAL'}},
+                    {'filters': [{'class': 'H5Z_FILTER_DEFLATE', 'level': 10}]},
+                    {'filters': [{'class': 'H5Z_FILTER_BOGUS'}]}):
+                try:
+                    db.createDataset('H5T_STD_I32LE', (100, 100), creation_props=badProps)
+                    self.assertTrue(False)  # expected exception
+                except IOError as e:
+                    self.assertEqual(e.errno, errno.EBADMSG)
+            
+    def testReadDatasetSelection(self):
+        getFile('tall.h5', 'tall_readsel.h5')
+        with Hdf5db('tall_readsel.h5') as db:
+            creationProps = {'layout': {'class': 'H5D_CHUNKED', 'dims': [10, 8]},
+                'filters': [{'class': 'H5Z_FILTER_DEFLATE', 'level': 1}]}
+            dsetUuid = db.createDataset('H5T_STD_I32LE', (95, 60), creation_props=creationProps)
+            dset = db.getDatasetObjByUuid(dsetUuid)
+            dset[...] = np.arange(95 * 60).reshape((95, 60))
+            selections = ((slice(0, 95, 3), slice(0, 60, 2)),
+                          (slice(7, 90, 4), slice(5, 59, 1)),
+                          (slice(1, 95, 1), slice(3, 60, 5)),
+                          (slice(2, 95, 25), slice(0, 60, 3)),  # larger step than chunk
+                          (slice(5, 6, 2), slice(0, 60, 7)),
+                          (slice(0, 95, 1), slice(0, 60, 1)))
+            for slices in selections:
+                expected = dset[slices]
+                values = db.readDatasetSelection(dset, slices)
+                self.assertEqual(values.shape, expected.shape)
+                self.assertTrue(np.array_equal(values, expected))
+            values = db.getDatasetValuesByUuid(dsetUuid, selections[0])
+            self.assertEqual(values, dset[selections[0]].tolist())
+            
+    def testGetAttributeItemsWithValues(self):
+        getFile('tall.h5')
+        with Hdf5db('tall.h5') as db:
+            rootUuid = db.getUUIDByPath('/')
+            items = db.getAttributeItems("groups", rootUuid)
+            self.assertEqual(len(items), 2)
+            self.assertTrue('value' not in items[0])
+            items = db.getAttributeItems("groups", rootUuid, includeData=True)
+            self.assertEqual(items[0]['name'], 'attr1')
+            self.assertEqual(len(items[0]['value']), 10)
+            # attr1 is 10 bytes
+            items = db.getAttributeItems("groups", rootUuid, includeData=True, maxDataSize=8)
+            self.assertTrue('value' not in items[0])
+            self.assertEqual(items[0]['shape']['dims'], (10,))
+            
+        getFile('vlen_attr.h5')
+        with Hdf5db('vlen_attr.h5') as db:
+            dsetUuid = db.getUUIDByPath('/DS1')
+            # 60 bytes of data, the attribute storage only holds the vlen
+            # descriptors (32 bytes)
+            items = db.getAttributeItems("datasets", dsetUuid, includeData=True, maxDataSize=40)
+            self.assertTrue('value' not in items[0])
+            items = db.getAttributeItems("datasets", dsetUuid, includeData=True, maxDataSize=60)
+            self.assertEqual(items[0]['value'], [[3, 2, 1], 
+                [1, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144]])
+            
     def testReadAttribute(self):
         # getAttributeItemByUuid
         item = None
@@ -11,6 +11,7 @@
 ##############################################################################
 import unittest
 import logging
+import json
 import numpy as np
 import sys
 from h5py import special_dtype
@@ -246,6 +247,14 @@ class Hdf5dtypeTest(unittest.TestCase):
         self.assertEqual(dt.name, 'void960')
         self.assertEqual(dt.kind, 'V')
         
+    def testGetDtypeDescription(self):
+        self.assertEqual(hdf5dtype.getDtypeDescription(np.dtype('<i4')), '<i4')
+        # h5py tags fixed length strings with their encoding
+        strType = np.dtype('S6', metadata={'h5py_encoding': 'ascii'})
+        dt = np.dtype([('date', '<i4'), ('time', strType), ('pos', '<f8', (2,))])
+        descr = json.loads(hdf5dtype.getDtypeDescription(dt))
+        self.assertEqual(np.dtype([tuple(field) for field in descr]), dt)
+        
 if __name__ == '__main__':
     #setup test files
     
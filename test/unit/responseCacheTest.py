@@ -0,0 +1,90 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import sys
+import os
+import shutil
+import logging
+
+sys.path.append('../../server')
+from responseCache import ResponseCache, ENTRY_OVERHEAD, getFileId
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(ResponseCacheTest, self).__init__(*args, **kwargs)
+        self.logger = logging.getLogger()
+        self.logger.setLevel(logging.INFO)
+
+    def testLRU(self):
+        headers = [('Content-Type', 'application/json')]
+        cache = ResponseCache(3 * (100 + ENTRY_OVERHEAD), app_logger=self.logger)
+        for i in range(3):
+            cache.put(('host', '/groups/' + str(i)), headers, 'x' * 100)
+        self.assertEqual(len(cache.entries), 3)
+        self.assertEqual(cache.get(('host', '/groups/0')), (headers, 'x' * 100))
+        self.assertEqual(cache.hits, 1)
+        # least recently used entry (1) is evicted
+        cache.put(('host', '/groups/3'), headers, 'y' * 100)
+        self.assertEqual(len(cache.entries), 3)
+        self.assertEqual(cache.get(('host', '/groups/1')), None)
+        self.assertEqual(cache.misses, 1)
+        self.assertTrue(cache.get(('host', '/groups/0')) is not None)
+        self.assertTrue(cache.get(('host', '/groups/3')) is not None)
+        # entries larger than the cache are not added
+        cache.put(('host', '/big'), headers, 'z' * 1000)
+        self.assertEqual(cache.get(('host', '/big')), None)
+        self.assertEqual(len(cache.entries), 3)
+
+    def testFileId(self):
+        # identifies the file version used in cache keys
+        with open('.fileid.h5', 'w') as f:
+            f.write('x')
+        fileId = getFileId('.fileid.h5')
+        self.assertTrue(fileId is not None)
+        with open('.fileid.h5', 'a') as f:
+            f.write('y')
+        self.assertNotEqual(getFileId('.fileid.h5'), fileId)
+        os.remove('.fileid.h5')
+        self.assertEqual(getFileId('.fileid.h5'), None)
+
+    def testDiskCache(self):
+        cacheDir = 'response_cache'
+        if os.path.isdir(cacheDir):
+            shutil.rmtree(cacheDir)
+        os.mkdir(cacheDir)
+        headers = [('Content-Type', 'application/json'), ('Etag', '"abc"')]
+        cache = ResponseCache(100 + ENTRY_OVERHEAD, cacheDir=cacheDir, 
+            maxDiskSize=1024*1024, app_logger=self.logger)
+        cache.put('k1', headers, 'a' * 100)
+        cache.put('k2', headers, 'b' * 100)  # k1 is evicted to disk
+        self.assertEqual(len(os.listdir(cacheDir)), 1)
+        self.assertEqual(cache.get('k1'), (headers, 'a' * 100))
+        self.assertEqual(cache.hits, 1)
+        # a new cache (e.g. in another process) reads the file
+        cache = ResponseCache(100 + ENTRY_OVERHEAD, cacheDir=cacheDir, 
+            maxDiskSize=1024*1024, app_logger=self.logger)
+        self.assertEqual(cache.get('k1'), (headers, 'a' * 100))
+        self.assertEqual(cache.get('k3'), None)
+        
+        # oldest files are removed when the disk size is exceeded
+        cache.maxDiskSize = 250
+        cache.writeEntry('k4', (headers, 'c' * 100))
+        cache.trimDisk()
+        self.assertEqual(len(os.listdir(cacheDir)), 1)
+        shutil.rmtree(cacheDir)
+
+
+if __name__ == '__main__':
+    #setup test files
+
+    unittest.main()
@@ -0,0 +1,81 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import unittest
+import sys
+import os
+import logging
+import h5py
+
+sys.path.append('../../server')
+from timeStamps import createTimeStamps, openTimeStamps, migrateTimeStamps
+import timeStamps
+
+
+class TimeStampsTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TimeStampsTest, self).__init__(*args, **kwargs)
+        self.logger = logging.getLogger()
+        self.logger.setLevel(logging.INFO)
+
+    def createFile(self, filePath, timeFormat):
+        f = h5py.File(filePath, 'w')
+        dbGrp = f.create_group("__db__")
+        times = createTimeStamps(dbGrp, self.logger, timeFormat)
+        return (f, times)
+
+    def testTableTimeStamps(self):
+        (f, times) = self.createFile('times_table.h5', 'table')
+        keys = ['obj' + str(i) for i in range(2000)]
+        for i in range(len(keys)):
+            times.setCreateTime(keys[i], 1000 + i)
+        times.setModifiedTime(keys[5], 5000)
+        result = times.getTimes([keys[0], keys[5], 'unknown', keys[1999]])
+        self.assertEqual(result, [(1000, None), (1005, 5000), (None, None), (2999, None)])
+        f.close()
+
+        # re-open
+        f = h5py.File('times_table.h5', 'r+')
+        times = openTimeStamps(f['__db__'], self.logger)
+        self.assertEqual(times.format, "table")
+        self.assertEqual(times.getTimes([keys[5]]), [(1005, 5000)])
+
+        # deleted items keep their modified time until compacted
+        times.setDeleted(keys[6], 6000)
+        self.assertEqual(times.getTimes([keys[6]]), [(1006, 6000)])
+        times.setCreateTime(keys[6], 7000)  # re-created
+        self.assertEqual(times.getTimes([keys[6]]), [(7000, None)])
+        self.assertEqual(times.numDeleted, 0)
+        for i in range(timeStamps.COMPACT_MIN_DELETED):
+            times.setDeleted(keys[i + 1000], 8000)
+        self.assertEqual(times.numDeleted, 0)   # compacted
+        self.assertEqual(times.numRows, 1000)
+        self.assertEqual(times.getTimes([keys[1000], keys[999]]), [(None, None), (1999, None)])
+        f.close()
+
+    def testMigrate(self):
+        (f, times) = self.createFile('times_migrate.h5', 'attrs')
+        self.assertEqual(times.format, "attrs")
+        times.setCreateTime('obj1', 1000)
+        times.setModifiedTime('obj1', 2000)
+        times.setModifiedTime('obj2_attr:[a1]', 3000)
+        times = migrateTimeStamps(f['__db__'], self.logger)
+        self.assertEqual(times.format, "table")
+        self.assertTrue("{ctime}" not in f['__db__'])
+        self.assertEqual(times.getTimes(['obj1', 'obj2_attr:[a1]']), 
+            [(1000, 2000), (None, 3000)])
+        f.close()
+
+
+if __name__ == '__main__':
+    #setup test files
+
+    unittest.main()
@@ -33,6 +33,16 @@ def dumpCol(col):
         addr = h5py.h5o.get_info(g.id).addr
         print '\t\t' + uuid + ': ' + g.__class__.__name__ + ' addr: ' + str(addr)
     
+def dumpIndex(grp):
+    print '\t{index}'
+    numRows = grp.attrs['numRows']
+    colNames = ('groups', 'datasets', 'datatypes')
+    for i in range(numRows):
+        col = grp['col'][i]
+        if col < 0:
+            continue  # removed object
+        print '\t\t' + grp['uuid'][i] + ': ' + colNames[col] + ' addr: ' + str(grp['addr'][i])
+    
 def dumpFile(filePath):
     print "db info for: ", filePath
     f = h5py.File(filePath, 'r')
@@ -48,7 +58,10 @@ def dumpFile(filePath):
     dumpCol(dbGrp['{groups}'])
     dumpCol(dbGrp['{datasets}'])
     dumpCol(dbGrp['{datatypes}'])
-    dumpCol(dbGrp['{addr}'])
+    if '{addr}' in dbGrp:
+        dumpCol(dbGrp['{addr}'])
+    if '{index}' in dbGrp:
+        dumpIndex(dbGrp['{index}'])
     
     f.close()
 
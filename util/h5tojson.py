@@ -15,7 +15,7 @@ import argparse
 
 sys.path.append('../server')
 from hdf5db import Hdf5db
-import hdf5dtype 
+from domainExport import DomainExport
 
 
 """
@@ -27,56 +27,12 @@ class DumpJson:
         self.options = options
         self.db = db
         self.json = {}
-        
-    def dumpAttribute(self, col_name, uuid, attr_name):
-        item = self.db.getAttributeItem(col_name, uuid, attr_name)
-        response = { 'name': attr_name }
-        typeItem = item['type']
-        response['type'] = hdf5dtype.getTypeResponse(typeItem)
-        response['shape'] = item['shape']
-        if not self.options.D:
-            response['value'] = item['value']   # dump values unless header -D was passed
-        return response
-     
-        
-    def dumpAttributes(self, col_name, uuid):
-        attr_list = self.db.getAttributeItems(col_name, uuid)
-        items = []
-        for attr in attr_list:
-            item = self.dumpAttribute(col_name, uuid, attr['name'])
-            items.append(item)
-                   
-        return items    
-        
-    def dumpLink(self, uuid, name):
-        item = self.db.getLinkItemByUuid(uuid, name)
-        for key in ('ctime', 'mtime', 'href'):
-            if key in item:
-                del item[key]
-        return item
-        
-    
-    def dumpLinks(self, uuid):
-        link_list = self.db.getLinkItems(uuid)
-        items = []
-        for link in link_list:
-            item = self.dumpLink(uuid, link['title'])
-            items.append(item)
-        return items
-       
+        # dump values unless a header flag was passed
+        self.exporter = DomainExport(attributeValues=not options.D, 
+            datasetValues=not (options.D or options.d))
         
     def dumpGroup(self, uuid):
-        item = self.db.getGroupItemByUuid(uuid)
-        for key in ('ctime', 'mtime', 'linkCount', 'attributeCount', 'id'):
-            if key in item:
-                del item[key]
-        attributes = self.dumpAttributes('groups', uuid)
-        if attributes:
-            item['attributes'] = attributes
-        links = self.dumpLinks(uuid)
-        if links:
-            item['links'] = links
-        return item
+        return self.exporter.getGroup(self.db, uuid)
         
         
     def dumpGroups(self):
@@ -92,33 +48,7 @@ class DumpJson:
         
         
     def dumpDataset(self, uuid):
-        response = { }
-        item = self.db.getDatasetItemByUuid(uuid)
-        response['alias'] = item['alias']
-        typeItem = item['type']
-        response['type'] = hdf5dtype.getTypeResponse(typeItem)
-        shapeItem = item['shape']
-        response['shape'] = shapeItem
-        if 'dims' in shapeItem and 'maxdims' in shapeItem:
-            extensible = False
-            dims = shapeItem['dims']
-            maxdims = shapeItem['maxdims']
-            for i in range(len(dims)):
-                if dims[i] < maxdims[i]:
-                    extensible = True
-                    break
-            # dump the fill value
-            if extensible and 'fillvalue' in item:
-                response['fillvalue'] = item['fillvalue']
-        
-        attributes = self.dumpAttributes('datasets', uuid)
-        if attributes:
-            response['attributes'] = attributes
-        value = self.db.getDatasetValuesByUuid(uuid)
-        
-        if not (self.options.D or self.options.d):
-            response['value'] = value   # dump values unless header flag was passed
-        return response
+        return self.exporter.getDataset(self.db, uuid)
         
     def dumpDatasets(self):
         uuids = self.db.getCollection("datasets") 
@@ -131,15 +61,7 @@ class DumpJson:
             self.json['datasets'] = datasets
         
     def dumpDatatype(self, uuid):
-        response = { }
-        item = self.db.getCommittedTypeItemByUuid(uuid)
-        response['alias'] = item['alias']
-        typeItem = item['type']
-        response['type'] = hdf5dtype.getTypeResponse(typeItem)
-        attributes = self.dumpAttributes('datatypes', uuid)
-        if attributes:
-            response['attributes'] = attributes
-        return response
+        return self.exporter.getDatatype(self.db, uuid)
          
         
     def dumpDatatypes(self):    
@@ -0,0 +1,84 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import sys
+import os
+import time
+import uuid
+import random
+import logging
+import argparse
+import h5py
+
+sys.path.append('../server')
+from dbIndex import createIndex
+
+"""
+indexbench - compare uuid index layouts ("attrs" and "table").
+
+ For each object count, an index is populated with synthetic entries (all
+ referring to one real group) and then timed for address->uuid lookups and
+ uuid->object lookups of randomly chosen entries.
+"""
+
+def runBench(filePath, indexFormat, count, numLookups, log):
+    f = h5py.File(filePath, 'w')
+    dbGrp = f.create_group("__db__")
+    for col_name in ("{groups}", "{datasets}", "{datatypes}"):
+        dbGrp.create_group(col_name)
+    index = createIndex(dbGrp, f, False, log, indexFormat)
+    target = f.create_group("target")
+    ids = []
+    start = time.time()
+    for i in range(count):
+        obj_uuid = str(uuid.uuid1())
+        ids.append(obj_uuid)
+        index.addObject("groups", obj_uuid, target, i + 1)
+    insertTime = time.time() - start
+    
+    samples = [random.randint(0, count - 1) for i in range(numLookups)]
+    start = time.time()
+    for i in samples:
+        if index.getUUID(i + 1) != ids[i]:
+            raise ValueError("unexpected lookup result")
+    addrTime = time.time() - start
+    start = time.time()
+    for i in samples:
+        index.getObject("groups", ids[i])
+    uuidTime = time.time() - start
+    f.close()
+    fileSize = os.stat(filePath).st_size
+    os.remove(filePath)
+    
+    print "%-6s %9d  insert: %8.1f us  addr lookup: %8.1f us  uuid lookup: %8.1f us  size: %d" % (
+        indexFormat, count, insertTime * 1.0e6 / count, addrTime * 1.0e6 / numLookups,
+        uuidTime * 1.0e6 / numLookups, fileSize)
+    
+
+def main():
+    parser = argparse.ArgumentParser(usage='%(prog)s [-h] [-f attrs|table] [-n lookups] [count ...]')
+    parser.add_argument('-f', choices=('attrs', 'table'), action='append',
+        help='index format to test (default is both)')
+    parser.add_argument('-n', type=int, default=1000, help='number of lookups to time')
+    parser.add_argument('count', type=int, nargs='*', default=[1000, 100000, 1000000],
+        help='number of objects in the index')
+    args = parser.parse_args()
+    
+    log = logging.getLogger()
+    formats = args.f
+    if not formats:
+        formats = ('attrs', 'table')
+    for count in args.count:
+        for indexFormat in formats:
+            runBench('indexbench.h5', indexFormat, count, args.n, log)
+    
+
+main()
